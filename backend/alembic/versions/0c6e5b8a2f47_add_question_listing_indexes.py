@@ -0,0 +1,39 @@
+"""add_question_listing_indexes
+
+Revision ID: 0c6e5b8a2f47
+Revises: f7c3a9e2d815
+Create Date: 2026-10-18 19:37:12.448106
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c6e5b8a2f47'
+down_revision: Union[str, None] = 'f7c3a9e2d815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyset pagination needs a total order on (created_at, id)
+    op.execute("UPDATE questions SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    op.execute("UPDATE questions SET is_generated = false WHERE is_generated IS NULL")
+    op.alter_column('questions', 'created_at', existing_type=sa.DateTime(), nullable=False, server_default=sa.func.now())
+    op.create_index('ix_questions_created_at_id', 'questions', ['created_at', 'id'], unique=False)
+    op.create_index('ix_questions_category_created_at_id', 'questions', ['category', 'created_at', 'id'], unique=False)
+    op.create_index('ix_questions_job_title_created_at_id', 'questions', ['job_title', 'created_at', 'id'], unique=False)
+    op.create_index('ix_questions_is_generated_created_at_id', 'questions', ['is_generated', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_questions_is_generated_created_at_id', table_name='questions')
+    op.drop_index('ix_questions_job_title_created_at_id', table_name='questions')
+    op.drop_index('ix_questions_category_created_at_id', table_name='questions')
+    op.drop_index('ix_questions_created_at_id', table_name='questions')
+    op.alter_column('questions', 'created_at', existing_type=sa.DateTime(), nullable=True, server_default=None)
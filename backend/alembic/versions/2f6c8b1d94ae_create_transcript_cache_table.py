@@ -0,0 +1,33 @@
+"""create_transcript_cache_table
+
+Revision ID: 2f6c8b1d94ae
+Revises: e8a3f05c6d17
+Create Date: 2026-10-18 12:08:34.651207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f6c8b1d94ae'
+down_revision: Union[str, None] = 'e8a3f05c6d17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('transcript_cache',
+        sa.Column('audio_sha256', sa.String(length=64), nullable=False),
+        sa.Column('transcript', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('audio_sha256')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('transcript_cache')
@@ -0,0 +1,28 @@
+"""add_recording_audio_segments
+
+Revision ID: 5b0e9c4d7a21
+Revises: a93d4e7b51f0
+Create Date: 2026-10-18 14:05:31.226817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b0e9c4d7a21'
+down_revision: Union[str, None] = 'a93d4e7b51f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('recordings', sa.Column('audio_segments', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('recordings', 'audio_segments')
@@ -0,0 +1,35 @@
+"""add_question_search_vector
+
+Revision ID: 6e2d4b9a1c73
+Revises: 0c6e5b8a2f47
+Create Date: 2026-10-18 21:04:51.203117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e2d4b9a1c73'
+down_revision: Union[str, None] = '0c6e5b8a2f47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Generated column, so Postgres keeps it in step with text and job_title
+    # (same definition as QUESTION_SEARCH_DDL in app/models/models.py)
+    op.execute(
+        "ALTER TABLE questions ADD COLUMN search_vector tsvector GENERATED ALWAYS AS "
+        "(to_tsvector('english', coalesce(text, '') || ' ' || coalesce(job_title, ''))) STORED"
+    )
+    op.create_index('ix_questions_search_vector', 'questions', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_questions_search_vector', table_name='questions', postgresql_using='gin')
+    op.drop_column('questions', 'search_vector')
@@ -0,0 +1,30 @@
+"""add_recording_transcript_id
+
+Revision ID: 7d2b9e41a0c3
+Revises: c51e0a7f2b94
+Create Date: 2026-10-18 10:03:17.228914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2b9e41a0c3'
+down_revision: Union[str, None] = 'c51e0a7f2b94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('recordings', sa.Column('transcript_id', sa.String(), nullable=True))
+    op.create_index(op.f('ix_recordings_transcript_id'), 'recordings', ['transcript_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_recordings_transcript_id'), table_name='recordings')
+    op.drop_column('recordings', 'transcript_id')
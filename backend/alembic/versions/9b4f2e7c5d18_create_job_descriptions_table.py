@@ -0,0 +1,133 @@
+"""create_job_descriptions_table
+
+Revision ID: 9b4f2e7c5d18
+Revises: 6e2d4b9a1c73
+Create Date: 2026-10-18 22:15:37.806241
+
+"""
+import hashlib
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4f2e7c5d18'
+down_revision: Union[str, None] = '6e2d4b9a1c73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+job_descriptions = sa.table(
+    'job_descriptions',
+    sa.column('sha256', sa.String),
+    sa.column('job_title', sa.String),
+    sa.column('description', sa.Text),
+    sa.column('summary', sa.Text),
+    sa.column('created_at', sa.DateTime),
+)
+
+
+# Copies of app.utils.job_descriptions as of this revision, so the backfill
+# keeps producing the same keys and summaries whatever the app does later
+def description_sha256(description: str) -> str:
+    return hashlib.sha256(" ".join(description.split()).encode()).hexdigest()
+
+
+def create_job_summary(job_description: str) -> str:
+    words = job_description.lower().split()
+    tech_keywords = ['python', 'javascript', 'react', 'node', 'java', 'sql', 'aws', 'docker', 'kubernetes']
+    role_keywords = ['developer', 'engineer', 'manager', 'analyst', 'designer', 'architect']
+    found_tech = [word for word in words if word in tech_keywords]
+    found_roles = [word for word in words if word in role_keywords]
+
+    summary_parts = []
+    if found_roles:
+        summary_parts.append(f"Role: {', '.join(sorted(set(found_roles)))}")
+    if found_tech:
+        summary_parts.append(f"Technologies: {', '.join(sorted(set(found_tech)))}")
+    return " | ".join(summary_parts) if summary_parts else "General position"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Give up rather than queue every other query behind a lock we wait for
+    op.execute("SET lock_timeout = '10s'")
+    op.create_table(
+        'job_descriptions',
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('job_title', sa.String(), nullable=True),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('summary', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('sha256'),
+    )
+    op.add_column('questions', sa.Column('job_description_sha256', sa.String(length=64), nullable=True))
+    # NOT VALID: checked for new rows only, no scan while the table is locked
+    op.execute(
+        "ALTER TABLE questions ADD CONSTRAINT fk_questions_job_description_sha256 "
+        "FOREIGN KEY (job_description_sha256) REFERENCES job_descriptions (sha256) NOT VALID"
+    )
+
+    # Each batch commits on its own, so row locks are held for one batch
+    # and writers to questions are never blocked for long
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_questions_job_description_sha256', 'questions', ['job_description_sha256'],
+            unique=False, postgresql_concurrently=True,
+        )
+        conn = op.get_bind()
+        last_id = 0
+        while True:
+            rows = conn.execute(sa.text(
+                "SELECT id, job_title, job_description FROM questions "
+                "WHERE id > :last_id AND job_description IS NOT NULL ORDER BY id LIMIT :limit"
+            ), {"last_id": last_id, "limit": BATCH_SIZE}).all()
+            if not rows:
+                break
+            first_seen = {}
+            for row in rows:
+                first_seen.setdefault(description_sha256(row.job_description), row)
+            now = datetime.now(timezone.utc)
+            conn.execute(insert(job_descriptions).values([
+                {"sha256": sha256, "job_title": row.job_title, "description": row.job_description,
+                 "summary": create_job_summary(row.job_description), "created_at": now}
+                for sha256, row in first_seen.items()
+            ]).on_conflict_do_nothing(index_elements=['sha256']))
+            conn.execute(
+                sa.text("UPDATE questions SET job_description_sha256 = :sha256 WHERE id = :id"),
+                [{"sha256": description_sha256(row.job_description), "id": row.id} for row in rows],
+            )
+            last_id = rows[-1].id
+        # Scans without blocking writes (SHARE UPDATE EXCLUSIVE)
+        op.execute("ALTER TABLE questions VALIDATE CONSTRAINT fk_questions_job_description_sha256")
+
+    # Only touches the catalog; the space is reclaimed as rows are rewritten
+    op.drop_column('questions', 'job_description')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('questions', sa.Column('job_description', sa.Text(), nullable=True))
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        last_id = 0
+        while True:
+            last = conn.execute(sa.text(
+                "SELECT max(id) FROM (SELECT id FROM questions WHERE id > :last_id ORDER BY id LIMIT :limit) AS batch"
+            ), {"last_id": last_id, "limit": BATCH_SIZE}).scalar()
+            if last is None:
+                break
+            conn.execute(sa.text(
+                "UPDATE questions SET job_description = job_descriptions.description FROM job_descriptions "
+                "WHERE questions.job_description_sha256 = job_descriptions.sha256 AND questions.id > :last_id AND questions.id <= :last"
+            ), {"last_id": last_id, "last": last})
+            last_id = last
+        op.drop_index('ix_questions_job_description_sha256', table_name='questions', postgresql_concurrently=True)
+    op.drop_constraint('fk_questions_job_description_sha256', 'questions', type_='foreignkey')
+    op.drop_column('questions', 'job_description_sha256')
+    op.drop_table('job_descriptions')
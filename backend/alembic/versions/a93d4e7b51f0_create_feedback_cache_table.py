@@ -0,0 +1,35 @@
+"""create_feedback_cache_table
+
+Revision ID: a93d4e7b51f0
+Revises: 2f6c8b1d94ae
+Create Date: 2026-10-18 12:47:09.384521
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a93d4e7b51f0'
+down_revision: Union[str, None] = '2f6c8b1d94ae'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('feedback_cache',
+        sa.Column('transcript_sha256', sa.String(length=64), nullable=False),
+        sa.Column('prompt_version', sa.String(), nullable=False),
+        sa.Column('model', sa.String(), nullable=False),
+        sa.Column('feedback_json', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('transcript_sha256', 'prompt_version', 'model')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('feedback_cache')
@@ -0,0 +1,33 @@
+"""add_recording_pipeline_status
+
+Revision ID: c51e0a7f2b94
+Revises: 493437d275ab
+Create Date: 2026-10-18 09:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c51e0a7f2b94'
+down_revision: Union[str, None] = '493437d275ab'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Recordings created before the pipeline existed were processed inline,
+    # so they are backfilled as done.
+    op.add_column('recordings', sa.Column('status', sa.String(), nullable=False, server_default='done'))
+    op.add_column('recordings', sa.Column('error', sa.Text(), nullable=True))
+    op.alter_column('recordings', 'status', server_default=None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('recordings', 'error')
+    op.drop_column('recordings', 'status')
@@ -0,0 +1,33 @@
+"""recording_url_storage_keys
+
+Revision ID: d2f81c6a4b39
+Revises: 5b0e9c4d7a21
+Create Date: 2026-10-18 16:42:08.513920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f81c6a4b39'
+down_revision: Union[str, None] = '5b0e9c4d7a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # recording_url holds a storage key relative to UPLOAD_DIR; existing
+    # files stay where they are, as unsharded keys
+    op.execute(
+        "UPDATE recordings SET recording_url = substr(recording_url, 9) "
+        "WHERE recording_url LIKE 'uploads/%'"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("UPDATE recordings SET recording_url = 'uploads/' || recording_url")
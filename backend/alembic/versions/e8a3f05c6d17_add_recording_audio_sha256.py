@@ -0,0 +1,30 @@
+"""add_recording_audio_sha256
+
+Revision ID: e8a3f05c6d17
+Revises: 7d2b9e41a0c3
+Create Date: 2026-10-18 11:26:50.917342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8a3f05c6d17'
+down_revision: Union[str, None] = '7d2b9e41a0c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('recordings', sa.Column('audio_sha256', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_recordings_audio_sha256'), 'recordings', ['audio_sha256'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_recordings_audio_sha256'), table_name='recordings')
+    op.drop_column('recordings', 'audio_sha256')
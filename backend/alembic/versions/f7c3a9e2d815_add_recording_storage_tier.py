@@ -0,0 +1,30 @@
+"""add_recording_storage_tier
+
+Revision ID: f7c3a9e2d815
+Revises: d2f81c6a4b39
+Create Date: 2026-10-18 18:20:47.061352
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7c3a9e2d815'
+down_revision: Union[str, None] = 'd2f81c6a4b39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('recordings', sa.Column('storage_tier', sa.String(), nullable=False, server_default='hot'))
+    op.add_column('recordings', sa.Column('archived_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('recordings', 'archived_at')
+    op.drop_column('recordings', 'storage_tier')
@@ -1,8 +1,8 @@
 from fastapi_users import FastAPIUsers
-from fastapi import Depends
+from fastapi import Depends, Query, WebSocketException, status
 from app.models.user import User
 from app.db.user_db import get_user_db
-from app.auth.jwt import auth_backend
+from app.auth.jwt import auth_backend, get_jwt_strategy
 from app.auth.user_manager import UserManager
 import uuid
 
@@ -13,3 +13,12 @@ fastapi_users = FastAPIUsers[User, uuid.UUID](get_user_manager, [auth_backend])
 
 current_active_user = fastapi_users.current_user(active=True)
 
+async def current_active_user_ws(token: str = Query(...), user_manager=Depends(get_user_manager)) -> User:
+    """current_active_user for WebSockets, which browsers cannot send headers on.
+
+    The JWT is passed as the `token` query parameter instead.
+    """
+    user = await get_jwt_strategy().read_token(token, user_manager)
+    if user is None or not user.is_active:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid token")
+    return user
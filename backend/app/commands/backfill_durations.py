@@ -0,0 +1,71 @@
+"""Fill Recording.duration_seconds for recordings stored before it was set at ingest.
+
+    cd backend && python -m app.commands.backfill_durations [--batch-size 500]
+"""
+import asyncio
+import argparse
+from app.db.session import SessionLocal
+from app.models import models
+from app.utils.audio_duration import audio_duration
+from app.utils.storage import Storage, get_storage
+
+
+async def stored_durations(storage: Storage, keys, workers: int) -> list:
+    """Durations of the stored keys, workers at a time (None when missing)."""
+    limit = asyncio.Semaphore(workers)
+
+    async def duration(key: str):
+        async with limit:
+            try:
+                async with storage.local_path(key) as path:
+                    return await asyncio.to_thread(audio_duration, path)
+            except FileNotFoundError:
+                return None
+
+    return await asyncio.gather(*(duration(key) for key in keys))
+
+
+async def backfill_durations(db, batch_size: int = 500, workers: int = 8, storage: Storage = None) -> int:
+    """Parse durations in batches of batch_size and bulk-update them; returns
+    how many recordings were filled. Files that are missing or unparseable
+    stay NULL and are not retried within the run.
+    """
+    storage = storage or get_storage()
+    filled = 0
+    last_id = None
+    while True:
+        query = db.query(models.Recording.id, models.Recording.recording_url).filter(
+            models.Recording.duration_seconds.is_(None),
+        )
+        if last_id is not None:
+            query = query.filter(models.Recording.id > last_id)
+        batch = query.order_by(models.Recording.id).limit(batch_size).all()
+        if not batch:
+            return filled
+        last_id = batch[-1].id
+        durations = await stored_durations(storage, [row.recording_url for row in batch], workers)
+        updates = [
+            {"id": row.id, "duration_seconds": duration}
+            for row, duration in zip(batch, durations)
+            if duration is not None
+        ]
+        if updates:
+            db.bulk_update_mappings(models.Recording, updates)
+            db.commit()
+            filled += len(updates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    db = SessionLocal()
+    try:
+        filled = asyncio.run(backfill_durations(db, args.batch_size))
+        print(f"Filled duration_seconds for {filled} recordings")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Compact recordings older than the retention window, and move them to cold
+storage when COLD_STORAGE_BACKEND is configured.
+
+    cd backend && python -m app.commands.retention [--days 30] [--batch-size 100]
+
+Meant to run from cron; every run reports the bytes it reclaimed.
+"""
+import os
+import shutil
+import asyncio
+import argparse
+import tempfile
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import case, func, or_
+from app.db.session import SessionLocal
+from app.enums.recording_status import RecordingStatus
+from app.enums.storage_tier import StorageTier
+from app.models import models
+from app.utils.audio import archive_audio, shutdown_executor
+from app.utils.storage import get_cold_storage, get_storage
+
+RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", "30"))
+# Recordings the pipeline is done with; a file any other recording uses is left alone
+FINISHED_STATUSES = (RecordingStatus.DONE.value, RecordingStatus.FAILED.value)
+
+
+@dataclass
+class RetentionReport:
+    files: int = 0
+    recordings: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    # Freed on the hot tier: everything that moved to cold storage, or the
+    # difference the re-encode made
+    bytes_reclaimed: int = 0
+    failed: int = 0
+    # Picked up again (or still processing) by the time they were archived
+    skipped: int = 0
+
+
+def archived_key(key: str, archived_path: str) -> str:
+    return os.path.join(os.path.dirname(key), os.path.basename(archived_path))
+
+
+def is_archivable(db, key: str, cutoff: datetime) -> bool:
+    """No recording using key is newer than cutoff or still being processed.
+
+    Takes row locks on the recordings (on databases that have them) until
+    the transaction ends, so they cannot change before they are repointed.
+    """
+    recordings = models.Recording.recording_url == key
+    db.query(models.Recording.id).filter(recordings).with_for_update().all()
+    return db.query(models.Recording.id).filter(recordings, or_(
+        models.Recording.created_at >= cutoff,
+        models.Recording.status.notin_(FINISHED_STATUSES),
+    )).first() is None
+
+
+async def archive_key(db, key: str, cutoff: datetime, report: RetentionReport):
+    """Re-encode one stored file and repoint every recording that uses it.
+
+    The new object is written first, the rows are updated in one commit,
+    and only then is the old object deleted, so a failure at any step
+    leaves recordings pointing at audio that exists. The recordings are
+    checked again within that commit, and the file is left in place if one
+    was added or started processing after the scan picked it.
+    """
+    hot = get_storage()
+    cold = get_cold_storage()
+    target = cold or hot
+    # Spooled where the target commits from, so the commit is a rename on
+    # its filesystem and the archive never shows up half written
+    os.makedirs(target.spool_dir, exist_ok=True)
+    workdir = tempfile.mkdtemp(dir=target.spool_dir)
+    try:
+        async with hot.local_path(key) as path:
+            size_before = os.path.getsize(path)
+            archived = await archive_audio(path, workdir)
+            new_key = archived_key(key, archived)
+            size_after = os.path.getsize(archived)
+            if archived == path and cold is not None:
+                # Moving as is: commit a copy, the original stays until the rows point elsewhere
+                copy = os.path.join(workdir, os.path.basename(path))
+                await asyncio.to_thread(shutil.copyfile, path, copy)
+                archived = copy
+            if archived != path:
+                await target.commit(archived, new_key)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    now = datetime.now(timezone.utc)
+    try:
+        if not is_archivable(db, key, cutoff):
+            db.rollback()
+            if target is not hot or new_key != key:
+                await target.delete(new_key)
+            report.skipped += 1
+            return
+        updated = db.query(models.Recording).filter(
+            models.Recording.recording_url == key,
+            models.Recording.storage_tier == StorageTier.HOT.value,
+            models.Recording.status.in_(FINISHED_STATUSES),
+        ).update({
+            models.Recording.recording_url: new_key,
+            models.Recording.storage_tier: StorageTier.COLD.value if cold is not None else StorageTier.HOT.value,
+            models.Recording.archived_at: now,
+        }, synchronize_session=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+        if target is not hot or new_key != key:
+            await target.delete(new_key)
+        raise
+
+    in_use = db.query(models.Recording.id).filter(models.Recording.recording_url == key).first() is not None
+    if (cold is not None or new_key != key) and not in_use:
+        await hot.delete(key)
+    report.files += 1
+    report.recordings += updated
+    report.bytes_before += size_before
+    report.bytes_after += size_after
+    report.bytes_reclaimed += size_before if cold is not None else size_before - size_after
+
+
+async def apply_retention(db, days: int = RETENTION_DAYS, batch_size: int = 100) -> RetentionReport:
+    """Archive every stored file whose recordings are all older than `days`
+    and finished (done or failed).
+
+    Identical uploads share a file, so files rather than recordings are
+    scanned: in batches of batch_size keys, keyset-paginated by key.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    report = RetentionReport()
+    last_key = None
+    while True:
+        query = db.query(models.Recording.recording_url).filter(
+            models.Recording.storage_tier == StorageTier.HOT.value,
+            models.Recording.archived_at.is_(None),
+        )
+        if last_key is not None:
+            query = query.filter(models.Recording.recording_url > last_key)
+        unfinished = func.sum(case((models.Recording.status.notin_(FINISHED_STATUSES), 1), else_=0))
+        keys = [row.recording_url for row in query.group_by(models.Recording.recording_url).having(
+            func.max(models.Recording.created_at) < cutoff,
+            unfinished == 0,
+        ).order_by(models.Recording.recording_url).limit(batch_size)]
+        if not keys:
+            return report
+        last_key = keys[-1]
+        for key in keys:
+            try:
+                await archive_key(db, key, cutoff, report)
+            except Exception as e:
+                report.failed += 1
+                print(f"Could not archive {key}: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+    db = SessionLocal()
+    try:
+        report = asyncio.run(apply_retention(db, args.days, args.batch_size))
+    finally:
+        db.close()
+        shutdown_executor()
+    print(", ".join(f"{name}={value}" for name, value in asdict(report).items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -18,3 +18,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_session_factory():
+    return SessionLocal
@@ -0,0 +1,9 @@
+from enum import Enum
+
+class RecordingStatus(Enum):
+    QUEUED = "queued"
+    UPLOADING = "uploading"
+    TRANSCRIBING = "transcribing"
+    SCORING = "scoring"
+    DONE = "done"
+    FAILED = "failed"
@@ -0,0 +1,5 @@
+from enum import Enum
+
+class StorageTier(Enum):
+    HOT = "hot"
+    COLD = "cold"
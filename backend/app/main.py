@@ -1,9 +1,23 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import question, recording, users
+from app.routers import metrics, question, recording, users
+from app.utils.transcript_poller import poller
+from app.utils.http_client import start_client, close_client
+from app.utils.audio import shutdown_executor
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_client()
+    poller.start()
+    yield
+    await poller.stop()
+    await close_client()
+    shutdown_executor()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -12,8 +26,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(question.router)
 app.include_router(recording.router)
-app.include_router(users.router)
\ No newline at end of file
+app.include_router(users.router)
+app.include_router(metrics.router)
\ No newline at end of file
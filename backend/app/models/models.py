@@ -1,9 +1,23 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON, Float
-from sqlalchemy import ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON, Float, Index
+from sqlalchemy import ForeignKey, DDL, event
 from sqlalchemy.orm import relationship
+from sqlalchemy.ext.associationproxy import association_proxy
 from app.db.session import Base
 import uuid
+from datetime import datetime
 from sqlalchemy.dialects.postgresql import UUID
+from app.enums.recording_status import RecordingStatus
+from app.enums.storage_tier import StorageTier
+
+class JobDescription(Base):
+    __tablename__ = "job_descriptions"
+    # sha256 of the whitespace-normalized description (description_sha256())
+    sha256 = Column(String(64), primary_key=True)
+    job_title = Column(String, nullable=True)
+    description = Column(Text, nullable=False)
+    summary = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+
 
 class Question(Base):
     __tablename__ = "questions"
@@ -11,9 +25,49 @@ class Question(Base):
     text = Column(String, nullable=False)
     category = Column(String, nullable=True)
     job_title = Column(String, nullable=True)
-    job_description = Column(Text, nullable=True)
+    # Questions generated from one posting share its (deduplicated) description
+    job_description_sha256 = Column(String(64), ForeignKey("job_descriptions.sha256"), nullable=True, index=True)
+    job_description_record = relationship("JobDescription")
+    job_description = association_proxy("job_description_record", "description")
+    job_summary = association_proxy("job_description_record", "summary")
     is_generated = Column(Boolean, default=False)
-    created_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # Keyset pagination reads (created_at, id) newest first, optionally
+    # within one filter value
+    __table_args__ = (
+        Index("ix_questions_created_at_id", "created_at", "id"),
+        Index("ix_questions_category_created_at_id", "category", "created_at", "id"),
+        Index("ix_questions_job_title_created_at_id", "job_title", "created_at", "id"),
+        Index("ix_questions_is_generated_created_at_id", "is_generated", "created_at", "id"),
+    )
+
+
+# Full-text search over text and job_title (GET /questions/search): a
+# generated tsvector column under a GIN index on Postgres, an FTS5 index kept
+# in sync by triggers on SQLite (tests). Migrations do the same for Postgres.
+QUESTION_SEARCH_DDL = {
+    "postgresql": [
+        "ALTER TABLE questions ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS "
+        "(to_tsvector('english', coalesce(text, '') || ' ' || coalesce(job_title, ''))) STORED",
+        "CREATE INDEX IF NOT EXISTS ix_questions_search_vector ON questions USING gin (search_vector)",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5("
+        "text, job_title, content='questions', content_rowid='id', tokenize='porter unicode61')",
+        "CREATE TRIGGER IF NOT EXISTS questions_fts_insert AFTER INSERT ON questions BEGIN "
+        "INSERT INTO questions_fts(rowid, text, job_title) VALUES (new.id, new.text, new.job_title); END",
+        "CREATE TRIGGER IF NOT EXISTS questions_fts_delete AFTER DELETE ON questions BEGIN "
+        "INSERT INTO questions_fts(questions_fts, rowid, text, job_title) VALUES ('delete', old.id, old.text, old.job_title); END",
+        "CREATE TRIGGER IF NOT EXISTS questions_fts_update AFTER UPDATE OF text, job_title ON questions BEGIN "
+        "INSERT INTO questions_fts(questions_fts, rowid, text, job_title) VALUES ('delete', old.id, old.text, old.job_title); "
+        "INSERT INTO questions_fts(rowid, text, job_title) VALUES (new.id, new.text, new.job_title); END",
+    ],
+}
+for dialect, statements in QUESTION_SEARCH_DDL.items():
+    for statement in statements:
+        event.listen(Question.__table__, "after_create", DDL(statement).execute_if(dialect=dialect))
+event.listen(Question.__table__, "before_drop", DDL("DROP TABLE IF EXISTS questions_fts").execute_if(dialect="sqlite"))
 
 
 class Recording(Base):
@@ -23,12 +77,34 @@ class Recording(Base):
     user = relationship("User", back_populates="recordings")
     question_id = Column(Integer, ForeignKey("questions.id"), nullable=False)
     recording_url = Column(String, nullable=False)
+    # Storage backend recording_url is a key in; archived_at is set once the
+    # retention job has compacted (and possibly moved) the audio
+    storage_tier = Column(String, nullable=False, default=StorageTier.HOT.value)
+    archived_at = Column(DateTime, nullable=True)
+    audio_sha256 = Column(String(64), nullable=True, index=True)
     created_at = Column(DateTime, nullable=False)
     updated_at = Column(DateTime, nullable=False)
     transcript = Column(Text, nullable=True)
+    transcript_id = Column(String, nullable=True, index=True)
     duration_seconds = Column(Float, nullable=True)
+    # [start, end] seconds of the original audio kept after silence trimming
+    audio_segments = Column(JSON, nullable=True)
     feedback_json = Column(JSON, nullable=True)
+    status = Column(String, nullable=False, default=RecordingStatus.QUEUED.value)
+    error = Column(Text, nullable=True)
 
 
+class TranscriptCache(Base):
+    __tablename__ = "transcript_cache"
+    audio_sha256 = Column(String(64), primary_key=True)
+    transcript = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False)
 
 
+class FeedbackCache(Base):
+    __tablename__ = "feedback_cache"
+    transcript_sha256 = Column(String(64), primary_key=True)
+    prompt_version = Column(String, primary_key=True)
+    model = Column(String, primary_key=True)
+    feedback_json = Column(JSON, nullable=False)
+    created_at = Column(DateTime, nullable=False)
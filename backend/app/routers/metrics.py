@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from app.utils.http_client import pool_stats
+from app.utils.bulkhead import bulkhead_stats
+from app.utils.resilience import provider_stats
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/")
+def get_metrics():
+    return {"http_pool": pool_stats(), "bulkheads": bulkhead_stats(), "providers": provider_stats()}
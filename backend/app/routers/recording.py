@@ -1,18 +1,57 @@
-import os, shutil, json
-from fastapi import APIRouter, Depends, UploadFile, File, Form
+import os, uuid, hmac, json, asyncio
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote
+from contextlib import aclosing
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, UploadFile, File, Form, WebSocket, WebSocketDisconnect, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, RedirectResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
 from app.models import models
-from app.db.session import get_db
-from app.schemas.recording import RecordingResponse, RecordingCreate
+from app.db.session import get_db, get_session_factory
+from app.schemas.recording import RecordingResponse, RecordingCreate, RecordingStatusResponse, TranscriptionCallback
+from app.enums.recording_status import RecordingStatus
+from app.enums.storage_tier import StorageTier
 from datetime import datetime, timezone
-from app.utils.transcription import upload_file, transcribe_audio
-from app.utils.feedback import generate_feedback
-from app.auth.users import current_active_user
+from app.utils.pipeline import process_recording, complete_transcription, start_processing
+from app.utils.audio import decodes_extension
+from app.utils.ingest import ingest_audio, iter_upload_file, UploadTooLarge, MAX_UPLOAD_BYTES
+from app.utils.storage import get_storage
+from app.utils import transcription
+from app.utils.feedback_stream import feedback_broadcast
+from app.utils.streaming_transcription import get_streaming_transcriber
+from app.auth.users import current_active_user, current_active_user_ws
 from app.models.user import User
 
 router = APIRouter(prefix="/recordings", tags=["recordings"])
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+SSE_KEEPALIVE_SECONDS = 15
+# Path prefix of an nginx `internal` location aliasing UPLOAD_DIR. When set,
+# audio playback is handed to nginx with X-Accel-Redirect so it is sent with
+# sendfile (zero-copy) instead of through the app.
+AUDIO_ACCEL_REDIRECT_PREFIX = os.getenv("AUDIO_ACCEL_REDIRECT_PREFIX", "")
+# The same for a local cold tier (COLD_UPLOAD_DIR); without it cold
+# recordings are served by the app
+COLD_AUDIO_ACCEL_REDIRECT_PREFIX = os.getenv("COLD_AUDIO_ACCEL_REDIRECT_PREFIX", "")
+AUDIO_MEDIA_TYPES = {
+    ".webm": "audio/webm",
+    ".ogg": "audio/ogg",
+    ".opus": "audio/ogg",
+    ".wav": "audio/wav",
+    ".mp3": "audio/mpeg",
+    ".m4a": "audio/mp4",
+}
+# Revalidate on every play: normalization can swap the file behind the URL
+AUDIO_CACHE_CONTROL = "private, no-cache"
+
+
+def get_user_recording(recording_id: uuid.UUID, db: Session, user: User) -> models.Recording:
+    recording = db.query(models.Recording).filter(
+        models.Recording.id == recording_id,
+        models.Recording.user_id == user.id,
+    ).first()
+    if recording is None:
+        raise HTTPException(status_code=404, detail="Recording not found")
+    return recording
 
 
 @router.get("/", response_model=list[RecordingResponse])
@@ -21,30 +60,304 @@ def get_recordings(db: Session = Depends(get_db), user: User = Depends(current_a
     return recordings
 
 
-@router.post("/", response_model=RecordingResponse)
-def create_recording(question_id: int = Form(...), file: UploadFile = File(...), db: Session = Depends(get_db), user: User = Depends(current_active_user)):
-    timestamp = datetime.now(timezone.utc).timestamp()
-    filename = f"{timestamp}_{file.filename}"
-    filepath = os.path.join(UPLOAD_DIR, filename)
+def upload_extension(filename: str) -> str:
+    return os.path.splitext(os.path.basename(filename or ""))[1].lower()
+
 
-    with open(filepath, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+def add_recording(db: Session, audio, question_id: int, user: User, recording_id: Optional[uuid.UUID] = None) -> models.Recording:
     now = datetime.now(timezone.utc)
     recording = models.Recording(
+        id=recording_id or uuid.uuid4(),
         question_id=question_id,
-        recording_url=filepath,
+        recording_url=audio.key,
         user_id=user.id,
+        audio_sha256=audio.sha256,
+        duration_seconds=audio.duration_seconds,
+        status=RecordingStatus.QUEUED.value,
         created_at=now,
         updated_at=now,
     )
-    upload_url = upload_file(filepath)
-    transcript = transcribe_audio(upload_url)
-    recording.transcript = transcript
-    feedback = generate_feedback(transcript)
-    recording.feedback_json = json.loads(feedback)
     db.add(recording)
     db.commit()
     db.refresh(recording)
-    feedback = generate_feedback(transcript)
     return recording
 
+
+async def store_live_recording(recording_id: uuid.UUID, session_factory, audio, question_id: int, user: User, transcript: Optional[str]) -> models.Recording:
+    """Add a live recording, in a session of its own, and start processing it."""
+    def add():
+        db = session_factory()
+        try:
+            return add_recording(db, audio, question_id, user, recording_id)
+        finally:
+            db.close()
+
+    recording = await asyncio.to_thread(add)
+    start_processing(recording.id, session_factory, audio.provider_upload, transcript)
+    return recording
+
+
+def reject_when_overloaded():
+    # Shed load at the door instead of accepting audio that cannot be transcribed
+    # Uploads have a bulkhead of their own; either one full fails the recording
+    if transcription.assemblyai_bulkhead.is_full() or transcription.assemblyai_upload_bulkhead.is_full():
+        raise HTTPException(status_code=503, detail="Transcription is overloaded, try again shortly", headers={"Retry-After": "5"})
+
+
+async def ingest_recording(chunks, filename: str, question_id: int, db: Session, user: User, session_factory, background_tasks: BackgroundTasks):
+    reject_when_overloaded()
+    try:
+        extension = upload_extension(filename)
+        # Audio that gets normalized is uploaded after re-encoding, not while it arrives
+        audio = await ingest_audio(chunks, get_storage(), extension, forward=not decodes_extension(extension))
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    # The session is synchronous: keep its queries off the event loop
+    recording = await asyncio.to_thread(add_recording, db, audio, question_id, user)
+    # Transcription and scoring happen after the response is sent; clients
+    # follow progress through GET /recordings/{id}/status.
+    background_tasks.add_task(process_recording, recording.id, session_factory, audio.provider_upload)
+    return recording
+
+
+def reject_oversized(request: Request):
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Recording exceeds the {MAX_UPLOAD_BYTES} byte limit")
+
+
+@router.post("/", response_model=RecordingResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_recording(background_tasks: BackgroundTasks, question_id: int = Form(...), file: UploadFile = File(...), db: Session = Depends(get_db), user: User = Depends(current_active_user), session_factory=Depends(get_session_factory)):
+    return await ingest_recording(iter_upload_file(file), file.filename, question_id, db, user, session_factory, background_tasks)
+
+
+@router.post("/stream", response_model=RecordingResponse, status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(reject_oversized)])
+async def stream_recording(request: Request, background_tasks: BackgroundTasks, question_id: int, filename: str = "recording.webm", db: Session = Depends(get_db), user: User = Depends(current_active_user), session_factory=Depends(get_session_factory)):
+    """Ingest a raw audio body as it arrives, without multipart buffering.
+
+    The upload to the transcription provider starts with the first chunk,
+    so it overlaps with the client upload.
+    """
+    return await ingest_recording(request.stream(), filename, question_id, db, user, session_factory, background_tasks)
+
+
+@router.websocket("/live")
+async def live_recording(websocket: WebSocket, question_id: int, filename: str = "recording.webm", user: User = Depends(current_active_user_ws), session_factory=Depends(get_session_factory), transcriber=Depends(get_streaming_transcriber)):
+    """Ingest an answer while it is being spoken.
+
+    The client sends audio as binary frames and ends the answer with a
+    {"type": "end"} text frame or by closing the socket; processing starts
+    right away. Server messages are {"event", "data"} objects:
+    `partial` ({"text"}) while a streaming transcriber is configured, then
+    `recording` once the answer is stored, then the feedback events of
+    /feedback/stream (`section`, `done` or `error`) before the server closes.
+    """
+    await websocket.accept()
+    connected = True
+
+    async def send(event: str, data):
+        nonlocal connected
+        if not connected:
+            return
+        try:
+            await websocket.send_json({"event": event, "data": data})
+        except (WebSocketDisconnect, RuntimeError):
+            connected = False
+
+    async def audio_chunks():
+        nonlocal connected
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                connected = False
+                return
+            if message.get("bytes"):
+                if session is not None:
+                    await session.send(message["bytes"])
+                yield message["bytes"]
+            elif message.get("text") and parse_live_message(message["text"]).get("type") == "end":
+                return
+
+    session = None
+    transcript = None
+    try:
+        if transcriber is not None:
+            session = await transcriber.open(lambda text: send("partial", {"text": text}))
+        try:
+            # With partial transcripts there is nothing to send the provider
+            extension = upload_extension(filename)
+            audio = await ingest_audio(audio_chunks(), get_storage(), extension, forward=session is None and not decodes_extension(extension))
+        except UploadTooLarge as e:
+            if connected:
+                await websocket.close(code=status.WS_1009_MESSAGE_TOO_BIG, reason=str(e))
+            return
+        if session is not None:
+            try:
+                transcript = await session.finish()
+            except Exception:
+                transcript = None  # the pipeline transcribes the stored audio instead
+    finally:
+        if session is not None:
+            await session.close()
+
+    recording_id = uuid.uuid4()
+    # Subscribe before processing starts so scoring streams to this socket
+    events = feedback_broadcast.subscribe(recording_id) if connected else None
+    try:
+        # Shielded: the answer is kept and processed even when the handler
+        # is cancelled because the client went away
+        recording = await asyncio.shield(store_live_recording(recording_id, session_factory, audio, question_id, user, transcript))
+    except BaseException:
+        if events is not None:
+            feedback_broadcast.unsubscribe(recording_id, events)
+        raise
+    if events is None:
+        return
+    await send("recording", jsonable_encoder(RecordingResponse.model_validate(recording, from_attributes=True)))
+    async with aclosing(feedback_updates(recording.id, events)) as updates:
+        async for event, data in updates:
+            if event != "keepalive":
+                await send(event, data)
+            if not connected:
+                break
+    if connected:
+        await websocket.close()
+
+
+def parse_live_message(text: str) -> dict:
+    try:
+        message = json.loads(text)
+    except ValueError:
+        return {}
+    return message if isinstance(message, dict) else {}
+
+
+@router.post("/transcription-callback")
+def transcription_callback(event: TranscriptionCallback, request: Request, background_tasks: BackgroundTasks, session_factory=Depends(get_session_factory)):
+    secret = transcription.TRANSCRIPTION_WEBHOOK_SECRET
+    if secret and not hmac.compare_digest(request.headers.get(transcription.WEBHOOK_AUTH_HEADER, ""), secret):
+        raise HTTPException(status_code=401, detail="Invalid webhook secret")
+    if event.status in ("completed", "error"):
+        background_tasks.add_task(complete_transcription, event.transcript_id, session_factory)
+    return {"received": True}
+
+
+@router.get("/{recording_id}", response_model=RecordingResponse)
+def get_recording(recording_id: uuid.UUID, db: Session = Depends(get_db), user: User = Depends(current_active_user)):
+    return get_user_recording(recording_id, db, user)
+
+
+@router.get("/{recording_id}/status", response_model=RecordingStatusResponse)
+def get_recording_status(recording_id: uuid.UUID, db: Session = Depends(get_db), user: User = Depends(current_active_user)):
+    return get_user_recording(recording_id, db, user)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: float) -> bool:
+    """Conditional GET: If-None-Match wins over If-Modified-Since (RFC 9110)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag.removeprefix("W/") in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+@router.api_route("/{recording_id}/audio", methods=["GET", "HEAD"])
+async def get_recording_audio(recording_id: uuid.UUID, request: Request, db: Session = Depends(get_db), user: User = Depends(current_active_user)):
+    """Play back a recording, with Range requests for seeking and
+    ETag/Last-Modified for conditional GETs.
+
+    Recordings in S3 redirect to a presigned URL, so the bucket serves the
+    bytes and the ranges.
+    """
+    recording = await asyncio.to_thread(get_user_recording, recording_id, db, user)
+    key = recording.recording_url
+    storage = get_storage(recording.storage_tier)
+    url = storage.download_url(key)
+    if url is not None:
+        return RedirectResponse(url, status_code=307, headers={"cache-control": "private, no-store"})
+
+    media_type = AUDIO_MEDIA_TYPES.get(os.path.splitext(key)[1].lower(), "application/octet-stream")
+    accel_prefix = COLD_AUDIO_ACCEL_REDIRECT_PREFIX if recording.storage_tier == StorageTier.COLD.value else AUDIO_ACCEL_REDIRECT_PREFIX
+    if accel_prefix:
+        # nginx answers ranges and conditional requests itself
+        return Response(media_type=media_type, headers={"x-accel-redirect": accel_prefix + quote(key), "cache-control": AUDIO_CACHE_CONTROL})
+    try:
+        path = storage.path(key)
+        stat_result = await asyncio.to_thread(os.stat, path)
+    except (FileNotFoundError, ValueError):
+        raise HTTPException(status_code=404, detail="Recording audio not found")
+
+    response = FileResponse(path, media_type=media_type, stat_result=stat_result, headers={"cache-control": AUDIO_CACHE_CONTROL})
+    if is_not_modified(request, response.headers["etag"], stat_result.st_mtime):
+        return Response(status_code=304, headers={name: response.headers[name] for name in ("etag", "last-modified", "cache-control")})
+    return response
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def feedback_updates(recording_id: uuid.UUID, events: asyncio.Queue):
+    """(event, data) pairs for a feedback subscriber, ending with "done" or "error".
+
+    Yields ("keepalive", None) after SSE_KEEPALIVE_SECONDS without events.
+    """
+    sent = set()
+    try:
+        while True:
+            try:
+                event, data = await asyncio.wait_for(events.get(), SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield "keepalive", None
+                continue
+            if event == "section":
+                sent.add(data["section"])
+                yield "section", data
+            elif event == "done":
+                # Subscribers that joined late get the sections they missed
+                for section, content in data.items():
+                    if section not in sent:
+                        yield "section", {"section": section, "content": content}
+                yield "done", data
+                return
+            else:
+                yield "error", data
+                return
+    finally:
+        feedback_broadcast.unsubscribe(recording_id, events)
+
+
+async def feedback_events(recording_id: uuid.UUID, events: asyncio.Queue):
+    async for event, data in feedback_updates(recording_id, events):
+        yield ": keepalive\n\n" if event == "keepalive" else sse_event(event, data)
+
+
+@router.get("/{recording_id}/feedback/stream")
+async def stream_recording_feedback(recording_id: uuid.UUID, db: Session = Depends(get_db), user: User = Depends(current_active_user)):
+    """Server-sent events with each feedback section as soon as it is generated.
+
+    Emits `section` events ({"section", "content"}) followed by one `done`
+    event carrying the full feedback, or an `error` event.
+    """
+    # Subscribe before reading the recording so no pipeline event is missed
+    events = feedback_broadcast.subscribe(recording_id)
+    try:
+        recording = await asyncio.to_thread(get_user_recording, recording_id, db, user)
+    except HTTPException:
+        feedback_broadcast.unsubscribe(recording_id, events)
+        raise
+    if recording.feedback_json is not None:
+        events.put_nowait(("done", recording.feedback_json))
+    elif recording.status == RecordingStatus.FAILED.value:
+        events.put_nowait(("error", {"detail": recording.error}))
+    return StreamingResponse(
+        feedback_events(recording_id, events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 from app.enums.question_category import QuestionCategory
 
@@ -13,10 +13,43 @@ class QuestionBase(BaseModel):
 
 class QuestionResponse(QuestionBase):
     id: int
+    job_summary: Optional[str] = None
     created_at: Optional[datetime] = None
 
     class Config:
         orm_mode = True  
 
+class QuestionSummary(BaseModel):
+    """A question in a listing: everything but the job description, which
+    can be kilobytes long and repeats across questions generated together.
+    """
+    id: int
+    text: str
+    category: Optional[QuestionCategory] = None
+    job_title: Optional[str] = None
+    is_generated: Optional[bool] = False
+    created_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
 class QuestionCreate(QuestionBase):
     category: QuestionCategory
+
+class QuestionGenerationRequest(BaseModel):
+    job_description: str
+    question_types: List[Literal["technical", "behavioral", "cultural"]]
+    num_questions_per_type: int = 5
+    job_title: Optional[str] = None
+
+class GeneratedQuestion(BaseModel):
+    text: str
+    category: str
+    reasoning: str = ""
+
+class QuestionGenerationResponse(BaseModel):
+    questions: List[GeneratedQuestion]
+    job_summary: str
+    job_title: str
+    # Question types that could not be generated in time; retrying may fill them in
+    failed_types: List[str] = []
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 import uuid
 
@@ -10,12 +10,31 @@ class RecordingResponse(BaseModel):
     id: uuid.UUID
     question_id: int
     recording_url: str
+    storage_tier: str = "hot"
+    archived_at: Optional[datetime] = None
+    audio_sha256: Optional[str] = None
     created_at: datetime
     updated_at: datetime
     transcript: Optional[str] = None
     duration_seconds: Optional[float] = None
+    audio_segments: Optional[List[List[float]]] = None
     user_id: Optional[uuid.UUID] = None
     feedback_json: Optional[dict] = None
+    status: str
+    error: Optional[str] = None
 
     class Config:
         orm_mode = True
+
+class RecordingStatusResponse(BaseModel):
+    id: uuid.UUID
+    status: str
+    error: Optional[str] = None
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
+
+class TranscriptionCallback(BaseModel):
+    transcript_id: str
+    status: str
@@ -0,0 +1,249 @@
+import os
+import wave
+import shutil
+import asyncio
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+
+# Re-encode uploads to mono 16 kHz before they are sent for transcription
+NORMALIZE_AUDIO = os.getenv("NORMALIZE_AUDIO", "true").lower() in ("1", "true", "yes")
+NORMALIZE_WORKERS = int(os.getenv("NORMALIZE_WORKERS", "2"))
+TARGET_SAMPLE_RATE = 16000
+OPUS_BITRATE = os.getenv("NORMALIZE_OPUS_BITRATE", "24k")
+# Without ffmpeg only WAV can be decoded; it is rewritten as 16 kHz mono PCM
+FFMPEG = shutil.which("ffmpeg")
+NORMALIZED_SUFFIX = "-16k"
+
+# Re-encode applied by the retention job to old recordings
+ARCHIVE_OPUS_BITRATE = os.getenv("ARCHIVE_OPUS_BITRATE", "12k")
+ARCHIVED_SUFFIX = "-archive"
+
+# Voice activity detection used to trim silence from normalized audio
+TRIM_SILENCE = os.getenv("TRIM_SILENCE", "true").lower() in ("1", "true", "yes")
+VAD_FRAME_MS = 30
+VAD_THRESHOLD_DB = float(os.getenv("VAD_THRESHOLD_DB", "12"))
+VAD_MIN_SPEECH_DB = float(os.getenv("VAD_MIN_SPEECH_DB", "-50"))
+VAD_DYNAMIC_RANGE_DB = 35
+VAD_PADDING = float(os.getenv("VAD_PADDING_SECONDS", "0.25"))
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def decodes_extension(extension: str) -> bool:
+    """Whether uploads with this extension will be normalized."""
+    return NORMALIZE_AUDIO and (FFMPEG is not None or extension.lower() == ".wav")
+
+
+def can_normalize(path: str) -> bool:
+    stem, extension = os.path.splitext(path)
+    return not stem.endswith(NORMALIZED_SUFFIX) and decodes_extension(extension)
+
+
+@dataclass
+class NormalizedAudio:
+    path: str
+    # Kept [start, end] ranges of the original audio in seconds; the
+    # normalized file is these ranges back to back. None if nothing was cut.
+    segments: Optional[list] = None
+
+
+def read_wav(path: str):
+    """Samples of a PCM WAV file as float32 (frames x channels), its rate and sample width."""
+    with wave.open(path, "rb") as f:
+        channels, width, rate = f.getnchannels(), f.getsampwidth(), f.getframerate()
+        raw = f.readframes(f.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(raw, np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(raw, "<i2").astype(np.float32) / 32768
+    elif width == 3:
+        triplets = np.frombuffer(raw, np.uint8).reshape(-1, 3).astype(np.int32)
+        values = triplets[:, 0] | (triplets[:, 1] << 8) | (triplets[:, 2] << 16)
+        samples = np.where(values >= 1 << 23, values - (1 << 24), values).astype(np.float32) / (1 << 23)
+    elif width == 4:
+        samples = np.frombuffer(raw, "<i4").astype(np.float32) / 2147483648
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width}")
+    return samples.reshape(-1, channels), rate, width
+
+
+def resample(mono: np.ndarray, rate: int, target: int) -> np.ndarray:
+    """Low-pass with a moving average, then resample by interpolation."""
+    if rate == target or len(mono) == 0:
+        return mono
+    factor = rate / target
+    if factor > 1:
+        width = int(np.ceil(factor))
+        mono = np.convolve(mono, np.full(width, 1 / width, dtype=np.float32), mode="same")
+    if factor.is_integer():
+        return mono[::int(factor)]
+    positions = np.arange(0, len(mono) - 1, factor)
+    return np.interp(positions, np.arange(len(mono)), mono).astype(np.float32)
+
+
+def decode(path: str):
+    """Mono float32 samples at TARGET_SAMPLE_RATE, and whether the file already is that."""
+    if FFMPEG is not None:
+        result = subprocess.run(
+            [FFMPEG, "-nostdin", "-loglevel", "error", "-i", path, "-f", "f32le", "-ac", "1", "-ar", str(TARGET_SAMPLE_RATE), "-"],
+            check=True,
+            capture_output=True,
+        )
+        return np.frombuffer(result.stdout, "<f4"), False
+    samples, rate, width = read_wav(path)
+    compact = samples.shape[1] == 1 and rate == TARGET_SAMPLE_RATE and width <= 2
+    return resample(samples.mean(axis=1), rate, TARGET_SAMPLE_RATE), compact
+
+
+def encode(samples: np.ndarray, path: str, suffix: str = NORMALIZED_SUFFIX, bitrate: str = OPUS_BITRATE,
+           output_dir: Optional[str] = None) -> str:
+    """Write samples next to path (or in output_dir) as Opus (ffmpeg) or
+    16-bit WAV; returns the new path.
+    """
+    stem = os.path.join(output_dir or os.path.dirname(path), os.path.splitext(os.path.basename(path))[0] + suffix)
+    if FFMPEG is not None:
+        output = stem + ".ogg"
+        try:
+            subprocess.run(
+                [FFMPEG, "-nostdin", "-loglevel", "error", "-y", "-f", "f32le", "-ac", "1", "-ar", str(TARGET_SAMPLE_RATE), "-i", "-",
+                 "-c:a", "libopus", "-b:a", bitrate, "-application", "voip", output],
+                input=samples.astype("<f4").tobytes(),
+                check=True,
+                capture_output=True,
+            )
+        except subprocess.CalledProcessError:
+            if os.path.exists(output):
+                os.remove(output)
+            raise
+        return output
+    output = stem + ".wav"
+    pcm = np.clip(samples * 32768, -32768, 32767).astype("<i2")
+    with wave.open(output, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(TARGET_SAMPLE_RATE)
+        f.writeframes(pcm.tobytes())
+    return output
+
+
+def speech_segments(samples: np.ndarray, rate: int = TARGET_SAMPLE_RATE) -> list:
+    """[start, end] sample ranges to keep, from a frame-energy voice activity pass.
+
+    Frames VAD_FRAME_MS long count as speech when their energy is
+    VAD_THRESHOLD_DB above the noise floor (the 10th percentile frame).
+    Speech is padded by VAD_PADDING seconds on both sides, so leading and
+    trailing silence shrinks to the padding, and internal pauses longer
+    than twice the padding are cut down to it.
+    """
+    frame = int(rate * VAD_FRAME_MS / 1000)
+    n_frames = len(samples) // frame
+    if n_frames == 0:
+        return [[0, len(samples)]]
+    frames = samples[:n_frames * frame].reshape(n_frames, frame)
+    energy = 10 * np.log10(np.einsum("ij,ij->i", frames, frames) / frame + 1e-10)
+    floor, peak = np.percentile(energy, [10, 99])
+    # Never call anything within VAD_DYNAMIC_RANGE_DB of the loudest speech
+    # silence, so answers without pauses are left whole
+    threshold = min(max(floor + VAD_THRESHOLD_DB, VAD_MIN_SPEECH_DB), peak - VAD_DYNAMIC_RANGE_DB)
+    speech = energy > threshold
+    if not speech.any():
+        return [[0, len(samples)]]  # nothing we can tell apart; keep it all
+
+    pad = int(np.ceil(VAD_PADDING * 1000 / VAD_FRAME_MS))
+    kept = np.convolve(speech.astype(np.int32), np.ones(2 * pad + 1, dtype=np.int32), mode="same") > 0
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], kept.astype(np.int8), [0]))))
+    starts, ends = edges[::2] * frame, edges[1::2] * frame
+    ends[-1] = len(samples) if edges[-1] == n_frames else ends[-1]
+    return [[int(start), int(end)] for start, end in zip(starts, ends)]
+
+
+def trim_silence(samples: np.ndarray, rate: int = TARGET_SAMPLE_RATE):
+    """Samples without the silence speech_segments() leaves out, and the kept
+    ranges in seconds (None if nothing was cut).
+    """
+    segments = speech_segments(samples, rate)
+    if segments == [[0, len(samples)]]:
+        return samples, None
+    trimmed = np.concatenate([samples[start:end] for start, end in segments])
+    return trimmed, [[start / rate, end / rate] for start, end in segments]
+
+
+def original_time(seconds: float, segments: Optional[list]) -> float:
+    """Map a timestamp in the trimmed audio (e.g. a transcript word) back to the original."""
+    if not segments:
+        return seconds
+    offset = 0.0
+    for start, end in segments:
+        if seconds <= offset + (end - start):
+            return start + seconds - offset
+        offset += end - start
+    return segments[-1][1]
+
+
+def normalize_file(path: str, output_dir: Optional[str] = None) -> NormalizedAudio:
+    """Downmix to mono, resample to 16 kHz, trim silence and re-encode.
+
+    Opus in Ogg when ffmpeg is installed, 16-bit PCM WAV otherwise, written
+    next to path unless output_dir is given. Keeps the input path when the
+    file cannot be decoded or would not shrink. Runs in a worker process.
+    """
+    try:
+        samples, compact = decode(path)
+    except (subprocess.CalledProcessError, wave.Error, EOFError, ValueError):
+        return NormalizedAudio(path)
+    segments = None
+    if TRIM_SILENCE:
+        samples, segments = trim_silence(samples)
+    if compact and segments is None:
+        return NormalizedAudio(path)
+    try:
+        return NormalizedAudio(encode(samples, path, output_dir=output_dir), segments)
+    except subprocess.CalledProcessError:
+        return NormalizedAudio(path)
+
+
+def archive_file(path: str, output_dir: Optional[str] = None) -> str:
+    """Re-encode audio for long-term storage: low-bitrate Opus with ffmpeg,
+    16 kHz mono WAV otherwise, keeping the timeline (and so audio_segments)
+    as is. Written next to path unless output_dir is given. Returns the
+    input path when it cannot be decoded or would not shrink. Runs in a
+    worker process.
+    """
+    try:
+        samples, _ = decode(path)
+        output = encode(samples, path, ARCHIVED_SUFFIX, ARCHIVE_OPUS_BITRATE, output_dir)
+    except (subprocess.CalledProcessError, wave.Error, EOFError, ValueError):
+        return path
+    if os.path.getsize(output) >= os.path.getsize(path):
+        os.remove(output)
+        return path
+    return output
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: the server process has threads, which fork does not copy safely
+        _executor = ProcessPoolExecutor(NORMALIZE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def normalize_audio(path: str, output_dir: Optional[str] = None) -> NormalizedAudio:
+    """normalize_file in the worker pool, keeping the event loop free."""
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), normalize_file, path, output_dir)
+
+
+async def archive_audio(path: str, output_dir: Optional[str] = None) -> str:
+    """archive_file in the worker pool."""
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), archive_file, path, output_dir)
@@ -0,0 +1,161 @@
+import mmap
+import struct
+from typing import Optional
+
+# Matroska / WebM element ids
+EBML_SEGMENT = 0x18538067
+EBML_INFO = 0x1549A966
+EBML_TIMECODE_SCALE = 0x2AD7B1
+EBML_DURATION = 0x4489
+EBML_CLUSTER = 0x1F43B675
+EBML_CLUSTER_TIMECODE = 0xE7
+EBML_BLOCK_GROUP = 0xA0
+EBML_BLOCK = 0xA1
+EBML_SIMPLE_BLOCK = 0xA3
+CLUSTER_ID = EBML_CLUSTER.to_bytes(4, "big")
+
+
+def audio_duration(path: str) -> Optional[float]:
+    """Duration in seconds from the container headers, without decoding audio.
+
+    Reads WAV (RIFF), WebM/Matroska and Ogg (Opus, Vorbis) through a
+    memory-mapped view, so only the pages holding headers are touched.
+    Returns None for other formats and for files it cannot make sense of.
+    """
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+                return wav_duration(data)
+            if data[:4] == b"\x1a\x45\xdf\xa3":
+                return matroska_duration(data)
+            if data[:4] == b"OggS":
+                return ogg_duration(data)
+    except (OSError, ValueError, struct.error, IndexError):
+        pass  # empty (cannot be mapped), truncated or corrupt
+    return None
+
+
+def wav_duration(data) -> Optional[float]:
+    byte_rate = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id = data[pos:pos + 4]
+        size = struct.unpack_from("<I", data, pos + 4)[0]
+        if chunk_id == b"fmt ":
+            byte_rate = struct.unpack_from("<I", data, pos + 16)[0]
+        elif chunk_id == b"data":
+            if not byte_rate:
+                return None
+            # Streaming writers leave the size at 0 or 0xFFFFFFFF
+            available = len(data) - pos - 8
+            if size == 0 or size > available:
+                size = available
+            return size / byte_rate
+        pos += 8 + size + (size & 1)
+    return None
+
+
+def read_vint(data, pos: int, strip_marker: bool):
+    """EBML variable-length integer at pos: (value, length, all_ones)."""
+    first = data[pos]
+    length = 1
+    while length <= 8 and not first & (0x80 >> (length - 1)):
+        length += 1
+    if length > 8:
+        raise ValueError("Invalid EBML variable-length integer")
+    value = first & (0xFF >> length) if strip_marker else first
+    for i in range(1, length):
+        value = (value << 8) | data[pos + i]
+    all_ones = strip_marker and value == (1 << (7 * length)) - 1
+    return value, length, all_ones
+
+
+def read_element(data, pos: int):
+    """EBML element header at pos: (id, size, unknown_size, body offset)."""
+    element_id, id_length, _ = read_vint(data, pos, strip_marker=False)
+    size, size_length, unknown_size = read_vint(data, pos + id_length, strip_marker=True)
+    return element_id, size, unknown_size, pos + id_length + size_length
+
+
+def matroska_duration(data) -> Optional[float]:
+    """Info/Duration when the muxer wrote it; otherwise the timestamp of the
+    last block, which is what browsers' MediaRecorder output needs.
+    """
+    timecode_scale = 1_000_000
+    pos = 0
+    while pos < len(data):
+        element_id, size, unknown_size, body = read_element(data, pos)
+        if element_id == EBML_CLUSTER:
+            break
+        if element_id in (EBML_SEGMENT, EBML_INFO):
+            pos = body  # read the children in place; unknown sizes are fine
+            continue
+        if element_id == EBML_TIMECODE_SCALE:
+            timecode_scale = int.from_bytes(data[body:body + size], "big")
+        elif element_id == EBML_DURATION:
+            duration = struct.unpack(">f" if size == 4 else ">d", data[body:body + size])[0]
+            if duration > 0:
+                return duration * timecode_scale / 1e9
+        if unknown_size:
+            return None
+        pos = body + size
+    else:
+        return None  # no audio at all
+
+    # Only the last cluster matters: find it from the end rather than walking
+    # every block of a long recording
+    cluster = len(data)
+    while True:
+        cluster = data.rfind(CLUSTER_ID, pos, cluster)
+        if cluster < 0:
+            return None
+        last_block = last_block_timecode(data, cluster)
+        if last_block is not None:
+            return last_block * timecode_scale / 1e9
+
+
+def last_block_timecode(data, cluster: int) -> Optional[int]:
+    """Timecode of the last block in the cluster at `cluster`, or None if it
+    is not a cluster (the id bytes also occur inside audio payloads).
+    """
+    _, size, unknown_size, pos = read_element(data, cluster)
+    end = len(data) if unknown_size else min(len(data), pos + size)
+    element_id, size, _, body = read_element(data, pos)
+    if element_id != EBML_CLUSTER_TIMECODE or size > 8:
+        return None
+    cluster_timecode = int.from_bytes(data[body:body + size], "big")
+    last_block = None
+    pos = body + size
+    try:
+        while pos < end:
+            element_id, size, _, body = read_element(data, pos)
+            if element_id == EBML_BLOCK_GROUP:
+                pos = body
+                continue
+            if element_id in (EBML_SIMPLE_BLOCK, EBML_BLOCK):
+                _, track_length, _ = read_vint(data, body, strip_marker=True)
+                relative = struct.unpack_from(">h", data, body + track_length)[0]
+                last_block = max(last_block or 0, cluster_timecode + relative)
+            elif element_id == EBML_CLUSTER:
+                break
+            pos = body + size
+    except (ValueError, struct.error, IndexError):
+        pass  # recording cut off mid-block; keep what was read
+    return last_block
+
+
+def ogg_duration(data) -> Optional[float]:
+    """Granule position of the last page over the stream's sample rate."""
+    header = 27 + data[26]  # first packet, after the page's segment table
+    if data[header:header + 8] == b"OpusHead":
+        pre_skip = struct.unpack_from("<H", data, header + 10)[0]
+        rate, offset = 48000, pre_skip  # Opus granules always count 48 kHz samples
+    elif data[header:header + 7] == b"\x01vorbis":
+        rate, offset = struct.unpack_from("<I", data, header + 12)[0], 0
+    else:
+        return None
+    last_page = data.rfind(b"OggS")
+    granule = struct.unpack_from("<q", data, last_page + 6)[0]
+    if granule < 0 or not rate:
+        return None
+    return max(0, granule - offset) / rate
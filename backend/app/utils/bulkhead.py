@@ -0,0 +1,182 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional
+
+# Every bulkhead by name, for /metrics
+bulkheads = {}
+
+
+class BulkheadFull(Exception):
+    """Raised when a call cannot get a slot: the wait queue is full or the wait timed out."""
+
+
+def is_rate_limited(exc: Exception) -> bool:
+    """True for a 429 from httpx (HTTPStatusError) or the OpenAI SDK (APIStatusError)."""
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None) == 429
+
+
+def retry_after(exc: Exception) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    value = getattr(response, "headers", {}).get("retry-after")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Bulkhead:
+    """Caps concurrent calls to one provider, with a bounded FIFO wait queue.
+
+    The concurrency limit adapts with AIMD: every call that finishes within
+    latency_target adds 1/limit (about +1 per round of calls), while a 429 or
+    a slow call multiplies it by decrease_factor, at most once per cooldown.
+    Callers past the limit wait in line; past max_queue, or after waiting
+    queue_timeout seconds, they get BulkheadFull instead of piling onto the
+    provider.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 50,
+        max_queue: int = 100,
+        queue_timeout: float = 30,
+        latency_target: Optional[float] = None,
+        decrease_factor: float = 0.5,
+        cooldown: float = 1.0,
+        retries: int = 2,
+        retry_delay: float = 1.0,
+    ):
+        self.name = name
+        self.limit = float(limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.in_flight = 0
+        self._waiters = deque()
+        self._last_decrease = float("-inf")
+        self.stats = {"calls": 0, "queued": 0, "rejected": 0, "rate_limited": 0, "wait_seconds_total": 0.0, "max_wait_seconds": 0.0}
+        bulkheads[name] = self
+
+    @property
+    def current_limit(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    def is_full(self) -> bool:
+        """No free slot and no room left in the wait queue."""
+        return self.in_flight >= self.current_limit and len(self._waiters) >= self.max_queue
+
+    async def _acquire(self):
+        if self.in_flight < self.current_limit and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.stats["rejected"] += 1
+            raise BulkheadFull(f"{self.name} is overloaded: {len(self._waiters)} calls already waiting")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.stats["queued"] += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                return  # handed a slot just as the wait timed out
+            self._waiters.remove(waiter)
+            self.stats["rejected"] += 1
+            raise BulkheadFull(f"{self.name} is overloaded: waited {self.queue_timeout}s for a slot")
+        except asyncio.CancelledError:
+            if waiter.done():
+                self._release()  # pass the slot on
+            else:
+                self._waiters.remove(waiter)
+            raise
+        finally:
+            waited = time.monotonic() - started
+            self.stats["wait_seconds_total"] += waited
+            self.stats["max_wait_seconds"] = max(self.stats["max_wait_seconds"], waited)
+
+    def _release(self):
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < self.current_limit:
+            self.in_flight += 1
+            self._waiters.popleft().set_result(None)
+
+    def _increase(self):
+        self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def _decrease(self):
+        now = time.monotonic()
+        if now - self._last_decrease >= self.cooldown:
+            self._last_decrease = now
+            self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+
+    @asynccontextmanager
+    async def slot(self, measure_latency: bool = True):
+        """Hold one concurrency slot for the duration of the block.
+
+        Pass measure_latency=False for calls whose duration depends on the
+        payload or the client (uploads, streamed responses): they say nothing
+        about the provider's capacity, so the limit is left alone.
+        """
+        await self._acquire()
+        self.stats["calls"] += 1
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            if is_rate_limited(e):
+                self.stats["rate_limited"] += 1
+                if measure_latency:
+                    self._decrease()
+            raise
+        else:
+            if measure_latency:
+                elapsed = time.monotonic() - started
+                if self.latency_target is not None and elapsed > self.latency_target:
+                    self._decrease()
+                else:
+                    self._increase()
+        finally:
+            self._release()
+
+    async def call(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) in a slot, waiting and retrying on 429s."""
+        for attempt in range(self.retries + 1):
+            try:
+                async with self.slot():
+                    return await fn(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limited(e) or attempt == self.retries:
+                    raise
+                delay = retry_after(e)
+                if delay is None:
+                    delay = self.retry_delay * 2 ** attempt
+                await asyncio.sleep(min(delay, self.queue_timeout))
+
+    def snapshot(self) -> dict:
+        waited = self.stats["queued"]
+        return {
+            "limit": self.current_limit,
+            "in_flight": self.in_flight,
+            "queue_depth": len(self._waiters),
+            "max_queue": self.max_queue,
+            **self.stats,
+            "avg_wait_seconds": self.stats["wait_seconds_total"] / waited if waited else 0.0,
+        }
+
+
+def bulkhead_stats() -> dict:
+    return {name: bulkhead.snapshot() for name, bulkhead in bulkheads.items()}
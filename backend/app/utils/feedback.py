@@ -1,39 +1,201 @@
 import os
-from openai import OpenAI
+import json
+import asyncio
+import hashlib
+from datetime import datetime, timezone
+from typing import List, Optional
+from openai import APIConnectionError, AsyncOpenAI
 from dotenv import load_dotenv
+from sqlalchemy.exc import IntegrityError
+from app.models import models
+from app.utils.cache import TTLCache
+from app.utils.http_client import get_client
+from app.utils.bulkhead import Bulkhead
+from app.utils.resilience import CircuitOpen, ResilientProvider, is_provider_failure
+from app.utils.feedback_batcher import FeedbackBatcher
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-def generate_feedback(transcript: str) -> dict:
-    prompt = (
-        "You are a senior technical interviewer with 15+ years of experience. You are known for being brutally honest and direct. "
-        "Your job is to give candidates the harsh reality they need to improve. Do NOT sugar-coat weak responses.\n\n"
-        
-        "CRITICAL FEEDBACK RULES:\n"
-        "- Be BRUTALLY HONEST - if the answer is weak, call it WEAK\n"
-        "- If the answer is average, call it AVERAGE and explain what's missing\n"
-        "- Only say 'good' if the response is genuinely strong\n"
-        "- Point out SPECIFIC technical gaps, missing details, poor structure\n"
-        "- Be direct about what would make them fail in a real interview\n"
-        "- Give actionable, specific improvements\n\n"
-        
-        f"Candidate Response: {transcript}\n\n"
-        
-        "Analyze this response critically and provide honest feedback in these five areas:\n"
-        "- Clarity: Is the message clear and easy to understand? Point out vagueness or confusion.\n"
-        "- Structure: Is the response well-organized? Highlight poor organization or missing structure.\n"
-        "- Tone: Does the tone sound confident and professional? Note any unprofessional or uncertain language.\n"
-        "- Language: Is the vocabulary appropriate and technical? Point out weak or inappropriate word choices.\n"
-        "- Suggested improvements: Give SPECIFIC, actionable advice on exactly what to fix.\n\n"
-        
-        "Respond as a JSON object using these exact keys: Clarity, Structure, Tone, Language, Suggested improvements."
-    )
-    completion = client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[{"role": "user", "content": prompt}],
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# Point at any OpenAI-compatible server (a local fake in tests)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+
+FEEDBACK_MODEL = "gpt-3.5-turbo"
+# Bump whenever the prompt changes so cached feedback is not reused
+PROMPT_VERSION = "2"
+FEEDBACK_KEYS = ["Clarity", "Structure", "Tone", "Language", "Suggested improvements"]
+
+# Concurrent chat completions; 429s are retried by the bulkhead, not the SDK,
+# so they also shrink the limit
+openai_bulkhead = Bulkhead(
+    "openai",
+    limit=int(os.getenv("OPENAI_CONCURRENCY", "10")),
+    max_limit=int(os.getenv("OPENAI_MAX_CONCURRENCY", "50")),
+    max_queue=int(os.getenv("OPENAI_MAX_QUEUE", "100")),
+    queue_timeout=float(os.getenv("OPENAI_QUEUE_TIMEOUT", "30")),
+    latency_target=float(os.getenv("OPENAI_LATENCY_TARGET", "30")),
+)
+openai_provider = ResilientProvider(
+    "openai",
+    openai_bulkhead,
+    deadline=float(os.getenv("OPENAI_DEADLINE", "60")),
+    failure_threshold=int(os.getenv("OPENAI_BREAKER_FAILURES", "5")),
+    reset_timeout=float(os.getenv("OPENAI_BREAKER_RESET", "30")),
+    # The SDK wraps transport errors and timeouts in APIConnectionError
+    is_failure=lambda e: isinstance(e, APIConnectionError) or is_provider_failure(e),
+)
+# Hedging duplicates a (billed) completion for the slowest ~5% of batches
+FEEDBACK_HEDGE = os.getenv("FEEDBACK_HEDGE", "true").lower() in ("1", "true", "yes")
+
+feedback_cache = TTLCache(
+    maxsize=int(os.getenv("FEEDBACK_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("FEEDBACK_CACHE_TTL", "3600")),
+)
+
+RUBRIC = (
+    "You are a senior technical interviewer with 15+ years of experience. You are known for being brutally honest and direct. "
+    "Your job is to give candidates the harsh reality they need to improve. Do NOT sugar-coat weak responses.\n\n"
+
+    "CRITICAL FEEDBACK RULES:\n"
+    "- Be BRUTALLY HONEST - if the answer is weak, call it WEAK\n"
+    "- If the answer is average, call it AVERAGE and explain what's missing\n"
+    "- Only say 'good' if the response is genuinely strong\n"
+    "- Point out SPECIFIC technical gaps, missing details, poor structure\n"
+    "- Be direct about what would make them fail in a real interview\n"
+    "- Give actionable, specific improvements\n\n"
+
+    "Analyze each candidate response critically and provide honest feedback in these five areas:\n"
+    "- Clarity: Is the message clear and easy to understand? Point out vagueness or confusion.\n"
+    "- Structure: Is the response well-organized? Highlight poor organization or missing structure.\n"
+    "- Tone: Does the tone sound confident and professional? Note any unprofessional or uncertain language.\n"
+    "- Language: Is the vocabulary appropriate and technical? Point out weak or inappropriate word choices.\n"
+    "- Suggested improvements: Give SPECIFIC, actionable advice on exactly what to fix.\n\n"
+)
+
+BATCH_SYSTEM_PROMPT = RUBRIC + (
+    "The user message is a JSON array of candidate responses, each with an id. Judge every response on its own. "
+    'Respond with a JSON object {"results": [...]} holding one object per response, with its id and these exact keys: '
+    "Clarity, Structure, Tone, Language, Suggested improvements."
+)
+
+SINGLE_SYSTEM_PROMPT = RUBRIC + (
+    "The user message is the candidate response. "
+    "Respond as a JSON object using these exact keys: Clarity, Structure, Tone, Language, Suggested improvements."
+)
+
+_llm = None
+
+
+def get_llm_client() -> AsyncOpenAI:
+    """OpenAI client on top of the shared pooled HTTP client."""
+    global _llm
+    http = get_client()
+    if _llm is None or _llm[0] is not http:
+        _llm = (http, AsyncOpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL, http_client=http, max_retries=0))
+    return _llm[1]
+
+
+async def generate_feedback_batch(transcripts: List[str]) -> List[dict]:
+    """Score several transcripts with one chat completion."""
+    items = [{"id": i, "transcript": transcript} for i, transcript in enumerate(transcripts)]
+    completion = await openai_provider.call(
+        get_llm_client().chat.completions.create,
+        hedge=FEEDBACK_HEDGE,
+        model=FEEDBACK_MODEL,
+        messages=[
+            {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": json.dumps(items)},
+        ],
+        response_format={"type": "json_object"},
         temperature=0.7,
     )
 
-    feedback_text = completion.choices[0].message.content
-    return feedback_text 
+    results = json.loads(completion.choices[0].message.content)["results"]
+    by_id = {result.pop("id"): result for result in results if "id" in result}
+    return [by_id.get(i) for i in range(len(transcripts))]
+
+
+async def generate_feedback_stream(transcript: str):
+    """Yield the model output for one transcript as it is generated."""
+    async with openai_provider.guard():
+        stream = await get_llm_client().chat.completions.create(
+            model=FEEDBACK_MODEL,
+            messages=[
+                {"role": "system", "content": SINGLE_SYSTEM_PROMPT},
+                {"role": "user", "content": transcript},
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.7,
+            stream=True,
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+feedback_batcher = FeedbackBatcher(
+    generate_feedback_batch,
+    max_batch_size=int(os.getenv("FEEDBACK_BATCH_SIZE", "8")),
+    max_wait=float(os.getenv("FEEDBACK_BATCH_WINDOW_MS", "50")) / 1000,
+)
+
+
+def feedback_key(transcript: str) -> tuple:
+    normalized = " ".join(transcript.split())
+    return (hashlib.sha256(normalized.encode()).hexdigest(), PROMPT_VERSION, FEEDBACK_MODEL)
+
+
+async def lookup_feedback(db, transcript: str) -> Optional[dict]:
+    """Cached feedback for a transcript: in-process LRU first, then the DB."""
+    key = feedback_key(transcript)
+    feedback = feedback_cache.get(key)
+    if feedback is None:
+        # The session is synchronous: keep its queries off the event loop
+        row = await asyncio.to_thread(db.get, models.FeedbackCache, key)
+        if row is not None:
+            feedback = row.feedback_json
+            feedback_cache.set(key, feedback)
+    return feedback
+
+
+async def store_feedback(db, transcript: str, feedback: dict):
+    key = feedback_key(transcript)
+    feedback_cache.set(key, feedback)
+    transcript_sha256, prompt_version, model = key
+
+    def save():
+        try:
+            db.merge(models.FeedbackCache(
+                transcript_sha256=transcript_sha256,
+                prompt_version=prompt_version,
+                model=model,
+                feedback_json=feedback,
+                created_at=datetime.now(timezone.utc),
+            ))
+            db.commit()
+        except IntegrityError:
+            db.rollback()  # stored concurrently for an identical transcript
+
+    await asyncio.to_thread(save)
+
+
+def stale_feedback(db, transcript: str) -> Optional[dict]:
+    """Newest feedback for the transcript from any prompt version or model."""
+    row = db.query(models.FeedbackCache).filter(
+        models.FeedbackCache.transcript_sha256 == feedback_key(transcript)[0],
+    ).order_by(models.FeedbackCache.created_at.desc()).first()
+    return row.feedback_json if row else None
+
+
+async def get_feedback(db, transcript: str) -> dict:
+    feedback = await lookup_feedback(db, transcript)
+    if feedback is None:
+        try:
+            feedback = await feedback_batcher.submit(transcript)
+        except CircuitOpen:
+            # The model is down: older feedback beats none, but is not re-cached
+            feedback = await asyncio.to_thread(stale_feedback, db, transcript)
+            if feedback is None:
+                raise
+            return feedback
+        await store_feedback(db, transcript, feedback)
+    return feedback
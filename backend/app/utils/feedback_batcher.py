@@ -0,0 +1,64 @@
+import asyncio
+from typing import Awaitable, Callable, List, Optional
+
+
+class FeedbackBatcher:
+    """Collects transcripts for a short window and scores them in one call.
+
+    The first submission opens a window of max_wait seconds; the batch is
+    sent when the window closes or max_batch_size transcripts are waiting,
+    whichever comes first. Each caller gets its own result back, and
+    identical transcripts in a batch are scored once.
+    """
+
+    def __init__(
+        self,
+        score_batch: Callable[[List[str]], Awaitable[List[Optional[dict]]]],
+        max_batch_size: int = 8,
+        max_wait: float = 0.05,
+    ):
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending = {}
+        self._timer = None
+        self._flushes = set()
+
+    async def submit(self, transcript: str) -> dict:
+        waiter = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(transcript, []).append(waiter)
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+        return await waiter
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.create_task(self._score(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _score(self, batch: dict):
+        transcripts = list(batch)
+        try:
+            results = await self.score_batch(transcripts)
+        except Exception as e:
+            for waiters in batch.values():
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(e)
+            return
+        for i, transcript in enumerate(transcripts):
+            result = results[i] if i < len(results) else None
+            for waiter in batch[transcript]:
+                if waiter.done():
+                    continue
+                if result is None:
+                    waiter.set_exception(RuntimeError("No feedback returned for transcript"))
+                else:
+                    waiter.set_result(result)
@@ -0,0 +1,124 @@
+import json
+import asyncio
+from collections import defaultdict
+from app.utils.feedback import generate_feedback_stream, lookup_feedback, store_feedback, stale_feedback
+from app.utils.resilience import CircuitOpen
+
+
+class FeedbackSectionParser:
+    """Incremental parser for a JSON object that arrives in pieces.
+
+    feed() takes raw text deltas and returns the (key, value) pairs of the
+    top-level object that became complete, so each feedback section can be
+    shown as soon as the model has finished writing it.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key = None
+        self._token_start = None
+
+    def feed(self, delta: str) -> list:
+        self.text += delta
+        sections = []
+        while self._pos < len(self.text):
+            ch = self.text[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._end_token(self._pos + 1, sections)
+            elif ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._token_start is None:
+                    self._token_start = self._pos
+            elif ch in "{[":
+                if self._depth == 1 and self._token_start is None:
+                    self._token_start = self._pos
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 1:
+                    self._end_token(self._pos + 1, sections)  # nested value closed
+                elif self._depth == 0 and self._token_start is not None:
+                    self._end_token(self._pos, sections)  # last value was a number/literal
+            elif self._depth == 1:
+                if ch == "," and self._token_start is not None:
+                    self._end_token(self._pos, sections)
+                elif not ch.isspace() and ch not in ":," and self._token_start is None:
+                    self._token_start = self._pos
+            self._pos += 1
+        return sections
+
+    def _end_token(self, end: int, sections: list):
+        token = json.loads(self.text[self._token_start:end])
+        self._token_start = None
+        if self._key is None:
+            self._key = token
+        else:
+            sections.append((self._key, token))
+            self._key = None
+
+
+class FeedbackBroadcast:
+    """Fans pipeline events for a recording out to its SSE subscribers."""
+
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+
+    def subscribe(self, recording_id) -> asyncio.Queue:
+        queue = asyncio.Queue()
+        self.subscribers[recording_id].add(queue)
+        return queue
+
+    def unsubscribe(self, recording_id, queue: asyncio.Queue):
+        queues = self.subscribers.get(recording_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[recording_id]
+
+    def has_subscribers(self, recording_id) -> bool:
+        return bool(self.subscribers.get(recording_id))
+
+    def publish(self, recording_id, event: str, data: dict):
+        for queue in self.subscribers.get(recording_id, ()):
+            queue.put_nowait((event, data))
+
+
+feedback_broadcast = FeedbackBroadcast()
+
+
+async def stream_feedback_sections(transcript: str):
+    """Yield (section, content) pairs while the model generates feedback."""
+    parser = FeedbackSectionParser()
+    async for delta in generate_feedback_stream(transcript):
+        for section in parser.feed(delta):
+            yield section
+    json.loads(parser.text)  # raise if the model stopped mid-object
+
+
+async def stream_feedback(db, recording_id, transcript: str) -> dict:
+    """Generate feedback, publishing each section to the recording's subscribers."""
+    feedback = await lookup_feedback(db, transcript)
+    if feedback is None:
+        feedback = {}
+        try:
+            async for section, content in stream_feedback_sections(transcript):
+                feedback[section] = content
+                feedback_broadcast.publish(recording_id, "section", {"section": section, "content": content})
+        except CircuitOpen:
+            feedback = await asyncio.to_thread(stale_feedback, db, transcript)
+            if feedback is None:
+                raise
+            return feedback
+        await store_feedback(db, transcript, feedback)
+    return feedback
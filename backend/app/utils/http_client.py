@@ -0,0 +1,75 @@
+import os
+import importlib.util
+from typing import Optional
+import httpx
+
+# Pool tuning for outbound provider calls
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+# HTTP/2 needs the optional `h2` package (pip install httpx[http2])
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Custom transport used instead of the network, e.g. an httpx.MockTransport in tests
+TRANSPORT: Optional[httpx.AsyncBaseTransport] = None
+
+metrics = {"requests": 0, "connections_opened": 0}
+_client: Optional[httpx.AsyncClient] = None
+
+
+async def _trace(event_name: str, info: dict):
+    if event_name == "connection.connect_tcp.complete":
+        metrics["connections_opened"] += 1
+
+
+async def _on_request(request: httpx.Request):
+    metrics["requests"] += 1
+    request.extensions["trace"] = _trace
+
+
+def start_client() -> httpx.AsyncClient:
+    global _client
+    _client = httpx.AsyncClient(
+        http2=HTTP2_ENABLED and importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        transport=TRANSPORT,
+        event_hooks={"request": [_on_request]},
+    )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Shared client, created on first use outside the app lifespan (scripts)."""
+    if _client is None or _client.is_closed:
+        return start_client()
+    return _client
+
+
+def pool_stats() -> dict:
+    stats = {
+        "requests": metrics["requests"],
+        "connections_opened": metrics["connections_opened"],
+        "requests_on_reused_connections": max(0, metrics["requests"] - metrics["connections_opened"]),
+        "open_connections": 0,
+        "idle_connections": 0,
+    }
+    pool = getattr(getattr(_client, "_transport", None), "_pool", None)
+    for connection in getattr(pool, "connections", []):
+        stats["open_connections"] += 1
+        if connection.is_idle():
+            stats["idle_connections"] += 1
+    return stats
@@ -0,0 +1,99 @@
+import os
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from typing import Optional
+from app.utils.transcription import upload_stream
+from app.utils.audio_duration import audio_duration
+from app.utils.storage import Storage, storage_key
+
+# Uploads larger than this are rejected with 413
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(100 * 1024 * 1024)))
+INGEST_CHUNK_SIZE = 256 * 1024
+# Chunks read ahead of the forwarded upload. When the provider falls this far
+# behind, forwarding stops and the audio is uploaded from storage instead.
+FORWARD_QUEUE_CHUNKS = int(os.getenv("FORWARD_QUEUE_CHUNKS", "64"))
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+@dataclass
+class IngestedAudio:
+    key: str
+    size: int
+    sha256: str
+    duration_seconds: Optional[float]
+    # Resolves to the provider upload URL once the forwarded upload finishes;
+    # None when the audio was not forwarded
+    provider_upload: Optional[asyncio.Task]
+
+
+async def iter_upload_file(file, chunk_size: int = INGEST_CHUNK_SIZE):
+    while chunk := await file.read(chunk_size):
+        yield chunk
+
+
+async def ingest_audio(chunks, storage: Storage, extension: str = "", forward: bool = True) -> IngestedAudio:
+    """Store incoming chunks in storage while forwarding them to the provider.
+
+    Each chunk is read once: it is hashed, written to disk and queued for
+    the provider upload, which runs concurrently and keeps going after the
+    request returns. The queue holds at most FORWARD_QUEUE_CHUNKS chunks; if
+    it fills up, the upload is cancelled and provider_upload is None, as
+    with forward=False, rather than buffering the rest in memory or holding
+    the client to the provider's pace.
+
+    Audio is spooled to a local file and committed to storage once complete,
+    under a content-addressed key (storage_key()), so resubmitting the same
+    audio reuses the same object. With forward=False the audio is only
+    stored.
+    """
+    queue = asyncio.Queue(maxsize=FORWARD_QUEUE_CHUNKS)
+
+    async def forwarded():
+        while (chunk := await queue.get()) is not None:
+            yield chunk
+
+    provider_upload = asyncio.create_task(upload_stream(forwarded())) if forward else None
+
+    def forward_chunk(chunk: Optional[bytes]):
+        nonlocal provider_upload
+        try:
+            queue.put_nowait(chunk)
+        except asyncio.QueueFull:
+            provider_upload.cancel()
+            provider_upload = None
+    digest = hashlib.sha256()
+    size = 0
+    incoming_path = storage.incoming_path()
+    try:
+        with open(incoming_path, "wb") as out:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise UploadTooLarge(f"Recording exceeds the {MAX_UPLOAD_BYTES} byte limit")
+                digest.update(chunk)
+                if provider_upload is not None:
+                    forward_chunk(chunk)
+                await asyncio.to_thread(out.write, chunk)
+    except BaseException:
+        if provider_upload is not None:
+            provider_upload.cancel()
+        if os.path.exists(incoming_path):
+            os.remove(incoming_path)
+        raise
+    if provider_upload is not None:
+        forward_chunk(None)
+
+    sha256 = digest.hexdigest()
+    key = storage_key(sha256, extension)
+    duration_seconds = audio_duration(incoming_path)
+    try:
+        await storage.commit(incoming_path, key)
+    except BaseException:
+        if os.path.exists(incoming_path):
+            os.remove(incoming_path)
+        raise
+    return IngestedAudio(key=key, size=size, sha256=sha256, duration_seconds=duration_seconds, provider_upload=provider_upload)
@@ -0,0 +1,52 @@
+import hashlib
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy.exc import IntegrityError
+from app.models import models
+
+
+def description_sha256(description: str) -> str:
+    """Key of a job description: postings that differ only in whitespace share it."""
+    return hashlib.sha256(" ".join(description.split()).encode()).hexdigest()
+
+
+def create_job_summary(job_description: str) -> str:
+    """Create a summary of the job description"""
+    # Simple extraction of key terms (in a real implementation, this would use NLP)
+    words = job_description.lower().split()
+
+    # Look for common job-related keywords
+    tech_keywords = ['python', 'javascript', 'react', 'node', 'java', 'sql', 'aws', 'docker', 'kubernetes']
+    role_keywords = ['developer', 'engineer', 'manager', 'analyst', 'designer', 'architect']
+
+    found_tech = [word for word in words if word in tech_keywords]
+    found_roles = [word for word in words if word in role_keywords]
+
+    summary_parts = []
+    if found_roles:
+        summary_parts.append(f"Role: {', '.join(sorted(set(found_roles)))}")
+    if found_tech:
+        summary_parts.append(f"Technologies: {', '.join(sorted(set(found_tech)))}")
+
+    return " | ".join(summary_parts) if summary_parts else "General position"
+
+
+def store_job_description(db, description: str, job_title: Optional[str] = None) -> str:
+    """Key of the job_descriptions row holding description, inserted (with
+    its summary) the first time the description is seen. Flushed in a
+    savepoint, so the caller's transaction carries on and commits it.
+    """
+    sha256 = description_sha256(description)
+    if db.get(models.JobDescription, sha256) is None:
+        try:
+            with db.begin_nested():
+                db.add(models.JobDescription(
+                    sha256=sha256,
+                    job_title=job_title,
+                    description=description,
+                    summary=create_job_summary(description),
+                    created_at=datetime.now(timezone.utc),
+                ))
+        except IntegrityError:
+            pass  # stored concurrently for an identical posting
+    return sha256
@@ -0,0 +1,25 @@
+import json
+import base64
+from datetime import datetime
+
+
+def encode_cursor(*values) -> str:
+    """Opaque cursor for keyset pagination: the sort key of the last row sent."""
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types) -> tuple:
+    """The values of an encode_cursor() cursor, converted with `types`
+    (datetime, int, float...); ValueError if it was tampered with.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if len(values) != len(types):
+            raise ValueError("wrong number of values")
+        return tuple(
+            datetime.fromisoformat(value) if kind is datetime else kind(value)
+            for kind, value in zip(types, values)
+        )
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
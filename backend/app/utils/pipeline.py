@@ -0,0 +1,286 @@
+import os
+import shutil
+import asyncio
+import tempfile
+import uuid
+from typing import Optional
+from datetime import datetime, timezone
+from sqlalchemy.exc import IntegrityError
+from app.models import models
+from app.enums.recording_status import RecordingStatus
+from app.enums.storage_tier import StorageTier
+from app.utils.cache import SingleFlight
+from app.utils.transcription import upload_stream, request_transcript, get_transcript, transcript_text, webhook_enabled
+from app.utils.transcript_poller import poller
+from app.utils.audio import can_normalize, normalize_audio
+from app.utils.storage import get_storage
+from app.utils.feedback import get_feedback
+from app.utils.feedback_stream import feedback_broadcast, stream_feedback
+
+# In webhook mode, poll a transcript ourselves if no callback arrived after
+# this many seconds. 0 disables the fallback.
+WEBHOOK_FALLBACK_SECONDS = float(os.getenv("TRANSCRIPTION_WEBHOOK_FALLBACK_SECONDS", "300"))
+fallback_tasks = set()
+processing_tasks = set()
+# Identical uploads share a key: each is normalized by one pipeline at a time
+normalize_flight = SingleFlight()
+
+
+async def set_status(db, recording: models.Recording, status: RecordingStatus, **fields):
+    def save():
+        recording.status = status.value
+        for name, value in fields.items():
+            setattr(recording, name, value)
+        recording.updated_at = datetime.now(timezone.utc)
+        db.commit()
+        return recording.id, recording.feedback_json, recording.error
+
+    # The session is synchronous: keep its queries off the event loop
+    recording_id, feedback, error = await asyncio.to_thread(save)
+    if status == RecordingStatus.DONE:
+        feedback_broadcast.publish(recording_id, "done", feedback)
+    elif status == RecordingStatus.FAILED:
+        feedback_broadcast.publish(recording_id, "error", {"detail": error})
+
+
+async def score_recording(db, recording: models.Recording, transcript: str):
+    await set_status(db, recording, RecordingStatus.SCORING, transcript=transcript)
+    # A client watching /feedback/stream gets the feedback token by token;
+    # otherwise the recording joins the next feedback batch.
+    if feedback_broadcast.has_subscribers(recording.id):
+        feedback = await stream_feedback(db, recording.id, transcript)
+    else:
+        feedback = await get_feedback(db, transcript)
+    await set_status(db, recording, RecordingStatus.DONE, feedback_json=feedback)
+
+
+async def provider_upload_url(recording: models.Recording, provider_upload: Optional[asyncio.Task]) -> str:
+    if provider_upload is not None:
+        try:
+            return await provider_upload
+        except Exception:
+            pass  # the forwarded upload failed; send the stored file instead
+    return await upload_stream(get_storage().read_chunks(recording.recording_url))
+
+
+async def normalize_key(original: str):
+    """Normalize the stored audio and commit the re-encode next to it:
+    (key, kept segments), or None when the original is kept as is.
+    FileNotFoundError once the original is gone.
+
+    The re-encode is written to a directory of its own, so a concurrent
+    run elsewhere never sees it half written.
+    """
+    storage = get_storage()
+    os.makedirs(storage.spool_dir, exist_ok=True)
+    workdir = tempfile.mkdtemp(dir=storage.spool_dir)
+    try:
+        async with storage.local_path(original) as path:
+            normalized = await normalize_audio(path, workdir)
+            if normalized.path == path:
+                return None
+            # Same shard as the original, new suffix
+            key = os.path.join(os.path.dirname(original), os.path.basename(normalized.path))
+            await storage.commit(normalized.path, key)
+        return key, normalized.segments
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def reuse_normalized_twin(db, recording: models.Recording) -> bool:
+    """Point the recording at the audio of an identical upload that was
+    already moved off the original key; False if there is none.
+    """
+    if not recording.audio_sha256:
+        return False
+    twin = db.query(models.Recording).filter(
+        models.Recording.audio_sha256 == recording.audio_sha256,
+        models.Recording.recording_url != recording.recording_url,
+        models.Recording.storage_tier == StorageTier.HOT.value,
+    ).order_by(models.Recording.created_at.desc()).first()
+    if twin is None:
+        return False
+    recording.recording_url = twin.recording_url
+    recording.audio_segments = twin.audio_segments
+    db.commit()
+    return True
+
+
+async def normalize_recording(db, recording: models.Recording):
+    """Swap the stored audio for its mono 16 kHz, silence-trimmed re-encode
+    before uploading it. audio_segments records which parts of the original
+    were kept, to map transcript timestamps back.
+
+    Identical uploads share one object. Concurrent pipelines for it share
+    one normalization. Every recording pointing at the original is moved to
+    the normalized key, and the original is removed only if no row
+    references it afterwards. An upload that stored the original again
+    meanwhile, and finds it removed, reuses the re-encode.
+    """
+    original = recording.recording_url
+    if not can_normalize(original):
+        return
+    storage = get_storage()
+    try:
+        normalized = await normalize_flight.do(original, lambda: normalize_key(original))
+    except FileNotFoundError:
+        if await asyncio.to_thread(reuse_normalized_twin, db, recording):
+            return
+        raise
+    if normalized is None:
+        return
+    key, segments = normalized
+
+    def repoint() -> bool:
+        db.query(models.Recording).filter(models.Recording.recording_url == original).update(
+            {models.Recording.recording_url: key, models.Recording.audio_segments: segments},
+            synchronize_session="fetch",
+        )
+        db.commit()
+        return db.query(models.Recording.id).filter(models.Recording.recording_url == original).first() is not None
+
+    if not await asyncio.to_thread(repoint):
+        await storage.delete(original)
+
+
+def cache_transcript(db, audio_sha256: Optional[str], transcript: str):
+    if not audio_sha256:
+        return
+    try:
+        db.merge(models.TranscriptCache(audio_sha256=audio_sha256, transcript=transcript, created_at=datetime.now(timezone.utc)))
+        db.commit()
+    except IntegrityError:
+        db.rollback()  # cached concurrently by an identical upload
+
+
+def in_flight_transcript_id(db, recording: models.Recording) -> Optional[str]:
+    """Transcript id of an identical upload that is still being transcribed."""
+    if not recording.audio_sha256:
+        return None
+    twin = db.query(models.Recording.transcript_id).filter(
+        models.Recording.audio_sha256 == recording.audio_sha256,
+        models.Recording.status == RecordingStatus.TRANSCRIBING.value,
+        models.Recording.transcript_id.isnot(None),
+        models.Recording.id != recording.id,
+    ).first()
+    return twin.transcript_id if twin else None
+
+
+async def process_recording(recording_id: uuid.UUID, session_factory, provider_upload: Optional[asyncio.Task] = None, transcript: Optional[str] = None):
+    """Run upload -> transcription -> scoring for a queued recording.
+
+    provider_upload is the upload started while the request was streaming in,
+    and transcript one produced while the answer was being recorded; with it
+    the recording goes straight to scoring. Audio that was transcribed before
+    comes from the transcript cache, and audio that is being transcribed
+    right now shares that transcript job.
+
+    With a transcription webhook configured this stops once the transcript is
+    requested; complete_transcription picks the recording up from the callback.
+    """
+    # The session is synchronous: its queries run in threads, and loaded
+    # attributes survive commits so reading them here never queries
+    db = session_factory(expire_on_commit=False)
+    try:
+        recording = await asyncio.to_thread(db.get, models.Recording, recording_id)
+        if recording is None:
+            return
+        try:
+            if transcript is not None:
+                await asyncio.to_thread(cache_transcript, db, recording.audio_sha256, transcript)
+            elif recording.audio_sha256:
+                cached = await asyncio.to_thread(db.get, models.TranscriptCache, recording.audio_sha256)
+                transcript = cached.transcript if cached else None
+            if transcript is None:
+                transcript_id = await asyncio.to_thread(in_flight_transcript_id, db, recording)
+            else:
+                transcript_id = None
+            if (transcript is not None or transcript_id) and provider_upload is not None:
+                provider_upload.cancel()
+            if transcript is not None:
+                await score_recording(db, recording, transcript)
+                return
+
+            if transcript_id is None:
+                await set_status(db, recording, RecordingStatus.UPLOADING)
+                if provider_upload is None:
+                    await normalize_recording(db, recording)
+                upload_url = await provider_upload_url(recording, provider_upload)
+                transcript_id = await request_transcript(upload_url)
+            await set_status(db, recording, RecordingStatus.TRANSCRIBING, transcript_id=transcript_id)
+            if webhook_enabled():
+                schedule_fallback_poll(transcript_id, session_factory)
+                return
+
+            transcript = await poller.wait(transcript_id, recording.duration_seconds)
+            await asyncio.to_thread(cache_transcript, db, recording.audio_sha256, transcript)
+            await score_recording(db, recording, transcript)
+        except Exception as e:
+            await asyncio.to_thread(db.rollback)
+            await set_status(db, recording, RecordingStatus.FAILED, error=str(e))
+    finally:
+        db.close()
+
+
+def start_processing(recording_id: uuid.UUID, session_factory, provider_upload: Optional[asyncio.Task] = None, transcript: Optional[str] = None) -> asyncio.Task:
+    """Run process_recording in the background where there are no BackgroundTasks (WebSockets)."""
+    task = asyncio.create_task(process_recording(recording_id, session_factory, provider_upload, transcript))
+    processing_tasks.add(task)
+    task.add_done_callback(processing_tasks.discard)
+    return task
+
+
+async def complete_transcription(transcript_id: str, session_factory, poll: bool = False):
+    """Finish the recordings waiting on a transcript that is ready.
+
+    Safe to call more than once: recordings that already left the
+    transcribing state are ignored, so duplicate callbacks are harmless.
+    With poll=True it waits on the shared poller until the transcript finishes.
+    """
+    def waiting():
+        return db.query(models.Recording).filter(
+            models.Recording.transcript_id == transcript_id,
+            models.Recording.status == RecordingStatus.TRANSCRIBING.value,
+        ).all()
+
+    # As in process_recording: queries in threads, attributes kept over commits
+    db = session_factory(expire_on_commit=False)
+    try:
+        recordings = await asyncio.to_thread(waiting)
+        if not recordings:
+            return
+        try:
+            if poll:
+                text = await poller.wait(transcript_id, recordings[0].duration_seconds)
+            else:
+                text = transcript_text(await get_transcript(transcript_id))
+                if text is None:
+                    return
+        except Exception as e:
+            await asyncio.to_thread(db.rollback)
+            for recording in recordings:
+                await set_status(db, recording, RecordingStatus.FAILED, error=str(e))
+            return
+
+        await asyncio.to_thread(cache_transcript, db, recordings[0].audio_sha256, text)
+        for recording in recordings:
+            try:
+                await score_recording(db, recording, text)
+            except Exception as e:
+                await asyncio.to_thread(db.rollback)
+                await set_status(db, recording, RecordingStatus.FAILED, error=str(e))
+    finally:
+        db.close()
+
+
+def schedule_fallback_poll(transcript_id: str, session_factory):
+    if WEBHOOK_FALLBACK_SECONDS <= 0:
+        return
+
+    async def poll_if_stalled():
+        await asyncio.sleep(WEBHOOK_FALLBACK_SECONDS)
+        await complete_transcription(transcript_id, session_factory, poll=True)
+
+    task = asyncio.create_task(poll_if_stalled())
+    fallback_tasks.add(task)
+    task.add_done_callback(fallback_tasks.discard)
@@ -0,0 +1,341 @@
+import os
+import json
+import asyncio
+import hashlib
+from abc import ABC, abstractmethod
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+from app.schemas.question import GeneratedQuestion
+from app.utils.cache import SingleFlight, TTLCache
+from app.utils.feedback import get_llm_client, openai_provider
+from app.utils.job_descriptions import create_job_summary
+
+# Bump whenever generation changes so cached questions are not reused
+GENERATOR_VERSION = "1"
+# Where questions come from: "mock" (BASE_QUESTIONS) or "llm" (chat completions)
+QUESTION_GENERATOR = os.getenv("QUESTION_GENERATOR", "mock")
+QUESTION_MODEL = os.getenv("QUESTION_MODEL", "gpt-3.5-turbo")
+QUESTION_TYPES = ("technical", "behavioral", "cultural")
+# Seconds each question type may take; a type that runs over is left out
+# of the response rather than holding up the others
+QUESTION_TYPE_TIMEOUTS = {
+    question_type: float(os.getenv(f"QUESTION_TIMEOUT_{question_type.upper()}", os.getenv("QUESTION_TIMEOUT", "20")))
+    for question_type in QUESTION_TYPES
+}
+
+generation_cache = TTLCache(
+    maxsize=int(os.getenv("QUESTION_GENERATION_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("QUESTION_GENERATION_CACHE_TTL", "3600")),
+)
+# Whole requests, and the question types within them
+generation_flight = SingleFlight()
+type_flight = SingleFlight()
+
+BASE_QUESTIONS = {
+    "technical": [
+        "How would you approach designing a scalable system for this role?",
+        "What programming languages and frameworks are you most comfortable with?",
+        "Describe a challenging technical problem you solved recently.",
+        "How do you ensure code quality and maintainability?",
+        "What's your experience with cloud platforms and DevOps practices?",
+        "How would you optimize database performance for high-traffic applications?",
+        "Describe your experience with microservices architecture.",
+        "How do you handle security vulnerabilities in your code?",
+        "What's your approach to testing and quality assurance?",
+        "How would you design a real-time data processing system?"
+    ],
+    "behavioral": [
+        "Tell me about a time when you had to work under pressure to meet a deadline.",
+        "Describe a situation where you had to collaborate with a difficult team member.",
+        "Give me an example of how you handled a major project failure.",
+        "Tell me about a time when you had to learn a new technology quickly.",
+        "Describe a situation where you had to make a difficult decision with limited information.",
+        "Tell me about a time when you had to lead a team through a challenging project.",
+        "Describe how you handled conflicting priorities from different stakeholders.",
+        "Give me an example of when you had to adapt to a significant change in requirements.",
+        "Tell me about a time when you had to mentor or train a junior colleague.",
+        "Describe a situation where you had to resolve a conflict within your team."
+    ],
+    "cultural": [
+        "What motivates you in your work?",
+        "How do you prefer to receive feedback?",
+        "Describe your ideal work environment.",
+        "How do you stay updated with industry trends?",
+        "What does work-life balance mean to you?",
+        "How do you handle stress and maintain productivity?",
+        "What values are most important to you in a workplace?",
+        "How do you approach continuous learning and professional development?",
+        "Describe your communication style and how you work with others.",
+        "What kind of company culture do you thrive in?"
+    ]
+}
+
+
+_generator = None
+
+
+@dataclass(frozen=True)
+class Generation:
+    questions: tuple
+    job_summary: str
+    # Extracted from the description; a job title in the request overrides it
+    job_title: str
+    # Types that failed or timed out; such a generation is not cached
+    failed_types: tuple = ()
+
+
+class QuestionGenerator(ABC):
+    """Source of interview questions, one question type per call. Calls for
+    the different types of a request run concurrently.
+    """
+
+    name = ""
+
+    @abstractmethod
+    async def generate(self, job_description: str, question_type: str, num_questions: int) -> List[GeneratedQuestion]:
+        """Up to num_questions questions of question_type for the role."""
+
+
+class MockQuestionGenerator(QuestionGenerator):
+    """The first num_questions of BASE_QUESTIONS for the type."""
+
+    name = "mock"
+
+    async def generate(self, job_description: str, question_type: str, num_questions: int) -> List[GeneratedQuestion]:
+        return generate_mock_questions_for_type(job_description, question_type, num_questions)
+
+
+class LLMQuestionGenerator(QuestionGenerator):
+    """Questions from an OpenAI-compatible chat completions API, through the
+    same breaker and bulkhead as feedback.
+    """
+
+    name = "llm"
+    system_prompt = (
+        "You are an experienced interviewer. The user message is a JSON object with a job description, "
+        "a question type (technical, behavioral or cultural) and a number of questions. Write that many "
+        "interview questions of that type for the role. Respond with a JSON object "
+        '{"questions": [{"text": ..., "reasoning": ...}]}, where reasoning says briefly why the question fits the role.'
+    )
+
+    def __init__(self, model: str = QUESTION_MODEL):
+        self.model = model
+
+    async def generate(self, job_description: str, question_type: str, num_questions: int) -> List[GeneratedQuestion]:
+        completion = await openai_provider.call(
+            get_llm_client().chat.completions.create,
+            model=self.model,
+            messages=[
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": json.dumps({
+                    "job_description": job_description, "question_type": question_type, "num_questions": num_questions,
+                })},
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.7,
+        )
+        questions = json.loads(completion.choices[0].message.content)["questions"]
+        return [
+            GeneratedQuestion(text=question["text"], category=question_type, reasoning=question.get("reasoning", ""))
+            for question in questions[:num_questions]
+        ]
+
+
+def create_generator(name: str = QUESTION_GENERATOR) -> QuestionGenerator:
+    if name == "mock":
+        return MockQuestionGenerator()
+    if name == "llm":
+        return LLMQuestionGenerator()
+    raise ValueError(f"Unknown question generator: {name}")
+
+
+def get_generator() -> QuestionGenerator:
+    global _generator
+    if _generator is None:
+        _generator = create_generator()
+    return _generator
+
+
+def normalize_job_description(job_description: str) -> str:
+    """Description with the whitespace within each line collapsed; lines
+    are kept, extract_job_title reads them. Generation only ever sees this
+    form, so descriptions that normalize alike generate alike.
+    """
+    return "\n".join(" ".join(line.split()) for line in job_description.splitlines())
+
+
+def description_digest(job_description: str) -> str:
+    return hashlib.sha256(normalize_job_description(job_description).encode()).hexdigest()
+
+
+def generation_key(job_description: str, question_types: Sequence[str], num_questions_per_type: int,
+                   generator: Optional[QuestionGenerator] = None) -> tuple:
+    generator = generator or get_generator()
+    return (description_digest(job_description), tuple(question_types), num_questions_per_type, generator.name, GENERATOR_VERSION)
+
+
+async def generate_type(generator: QuestionGenerator, job_description: str, question_type: str, num_questions: int) -> List[GeneratedQuestion]:
+    return await asyncio.wait_for(generator.generate(job_description, question_type, num_questions), QUESTION_TYPE_TIMEOUTS[question_type])
+
+
+async def generate_types(generator: QuestionGenerator, job_description: str, question_types: Sequence[str], num_questions: int):
+    """(question_type, questions, error) for every type as soon as it
+    finishes, so in completion order; exactly one of questions and error is
+    None. Every type runs as its own task, single-flighted per (description,
+    type): a request for a type that another request is already generating,
+    streamed or not, waits for that generation instead of starting its own.
+    """
+    digest = description_digest(job_description)
+
+    async def generate(question_type: str):
+        key = (digest, question_type, num_questions, generator.name, GENERATOR_VERSION)
+        try:
+            questions = await type_flight.do(key, lambda: generate_type(generator, job_description, question_type, num_questions))
+            return question_type, questions, None
+        except Exception as e:
+            return question_type, None, e
+
+    tasks = [asyncio.ensure_future(generate(question_type)) for question_type in question_types]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        # Stops waiting only; identical requests may still share the work
+        for task in tasks:
+            task.cancel()
+
+
+def finish_generation(key: tuple, job_description: str, question_types: Sequence[str], results: dict) -> Generation:
+    """The Generation of a finished request, from {question_type: questions
+    or error}, with the questions in request order. Cached unless a type
+    failed.
+    """
+    questions = []
+    failed_types = []
+    for question_type in question_types:
+        result = results[question_type]
+        if isinstance(result, BaseException):
+            failed_types.append(question_type)
+        else:
+            questions.extend(result)
+    generation = Generation(tuple(questions), create_job_summary(job_description), extract_job_title(job_description), tuple(failed_types))
+    if not failed_types:
+        generation_cache.set(key, generation)
+    return generation
+
+
+async def compute_generation(job_description: str, question_types: Sequence[str], num_questions_per_type: int,
+                             generator: Optional[QuestionGenerator] = None) -> Generation:
+    """Every question type generated concurrently, one task each.
+
+    A type that fails or runs past its timeout is reported in failed_types
+    and the others are returned; only when every type fails is the error
+    raised.
+    """
+    generator = generator or get_generator()
+    key = generation_key(job_description, question_types, num_questions_per_type, generator)
+    job_description = normalize_job_description(job_description)
+    results = {}
+    async with aclosing(generate_types(generator, job_description, question_types, num_questions_per_type)) as finished:
+        async for question_type, questions, error in finished:
+            results[question_type] = questions if error is None else error
+    errors = [result for result in results.values() if isinstance(result, BaseException)]
+    if results and len(errors) == len(results):
+        raise errors[0]
+    return finish_generation(key, job_description, question_types, results)
+
+
+async def get_generation(job_description: str, question_types: Sequence[str], num_questions_per_type: int) -> Generation:
+    """Generated questions for a request, from the in-process cache when an
+    identical request was answered within the TTL. Identical requests that
+    arrive while one is being generated wait for it rather than generating
+    again.
+    """
+    generator = get_generator()
+    key = generation_key(job_description, question_types, num_questions_per_type, generator)
+    generation = generation_cache.get(key)
+    if generation is not None:
+        return generation
+    return await generation_flight.do(key, lambda: compute_generation(job_description, question_types, num_questions_per_type, generator))
+
+
+async def stream_generation(job_description: str, question_types: Sequence[str], num_questions_per_type: int):
+    """The records of a generation as soon as each is known, as (kind, data):
+    "header" ({job_summary, job_title}) first, a "question" per question as
+    its type finishes (so in completion order, not request order), an
+    "error" ({question_type, detail}) per type that failed or timed out,
+    and "done" ({failed_types}) last.
+
+    Shares the cache and the per-type generations with get_generation.
+    """
+    generator = get_generator()
+    key = generation_key(job_description, question_types, num_questions_per_type, generator)
+    job_description = normalize_job_description(job_description)
+    yield "header", {"job_summary": create_job_summary(job_description), "job_title": extract_job_title(job_description)}
+    cached = generation_cache.get(key)
+    if cached is not None:
+        for question in cached.questions:
+            yield "question", question.model_dump()
+        yield "done", {"failed_types": []}
+        return
+
+    results = {}
+    # Closed with the stream, so a client that goes away stops waiting at once
+    async with aclosing(generate_types(generator, job_description, question_types, num_questions_per_type)) as finished:
+        async for question_type, questions, error in finished:
+            if error is not None:
+                results[question_type] = error
+                yield "error", {"question_type": question_type, "detail": str(error) or type(error).__name__}
+                continue
+            results[question_type] = questions
+            for question in questions:
+                yield "question", question.model_dump()
+    generation = finish_generation(key, job_description, question_types, results)
+    yield "done", {"failed_types": list(generation.failed_types)}
+
+
+def generate_mock_questions_for_type(job_description: str, question_type: str, num_questions: int) -> List[GeneratedQuestion]:
+    """Generate mock questions for a specific type based on job description"""
+    
+    # Get questions for the specific type
+    type_questions = BASE_QUESTIONS.get(question_type, [])
+    
+    # Select the requested number of questions
+    selected_questions = type_questions[:num_questions]
+    
+    # Create GeneratedQuestion objects
+    generated_questions = []
+    for i, question_text in enumerate(selected_questions):
+        generated_questions.append(GeneratedQuestion(
+            text=question_text,
+            category=question_type,
+            reasoning=f"Generated based on job requirements and {question_type} interview best practices"
+        ))
+    
+    return generated_questions
+
+def extract_job_title(job_description: str) -> str:
+    """Extract job title from job description"""
+    lines = job_description.split('\n')
+    
+    # Look for common patterns that indicate job titles
+    for line in lines[:5]:  # Check first 5 lines
+        line = line.strip()
+        if not line:
+            continue
+            
+        # Look for lines that might be job titles
+        if any(keyword in line.lower() for keyword in ['developer', 'engineer', 'manager', 'analyst', 'designer', 'architect', 'specialist', 'coordinator']):
+            # Clean up the line
+            title = line.replace('*', '').replace('#', '').replace('-', '').strip()
+            if len(title) < 100:  # Reasonable title length
+                return title
+    
+    # Fallback: extract from first meaningful line
+    for line in lines[:3]:
+        line = line.strip()
+        if line and len(line) < 50 and not line.lower().startswith(('we are', 'our company', 'looking for')):
+            return line
+    
+    return "Software Developer"  # Default fallback
@@ -0,0 +1,37 @@
+import re
+from sqlalchemy import Float, cast, func, literal_column, table
+from sqlalchemy.orm import Session
+from app.models import models
+
+SEARCH_LANGUAGE = "english"
+questions_fts = table("questions_fts")
+
+
+def search_terms(text: str) -> list:
+    """Words of a search box query; punctuation and operators are dropped."""
+    return re.findall(r"\w+", text.lower())
+
+
+def search_query(db: Session, text: str):
+    """Questions matching every word of `text`, and their relevance (higher
+    is better), using the index QUESTION_SEARCH_DDL maintains: the tsvector
+    column on Postgres, FTS5 on SQLite. Returns (query, rank) where the
+    query selects (Question, rank), or (None, None) if nothing is searchable.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return None, None
+    if db.get_bind().dialect.name == "sqlite":
+        # Quoted, so FTS5 reads each word as a plain term (still stemmed)
+        match = " ".join(f'"{term}"' for term in terms)
+        rank = -func.bm25(literal_column("questions_fts"))
+        query = db.query(models.Question, rank.label("rank")).join(
+            questions_fts, literal_column("questions_fts.rowid") == models.Question.id,
+        ).filter(literal_column("questions_fts").op("MATCH")(match))
+        return query, rank
+    vector = literal_column("questions.search_vector")
+    tsquery = func.websearch_to_tsquery(SEARCH_LANGUAGE, " ".join(terms))
+    # ts_rank is a real: as double precision the rank the cursor carries
+    # compares equal to the row's own rank on the next page
+    rank = cast(func.ts_rank(vector, tsquery), Float(precision=53))
+    return db.query(models.Question, rank.label("rank")).filter(vector.op("@@")(tsquery)), rank
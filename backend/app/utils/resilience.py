@@ -0,0 +1,235 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Callable, Optional
+import httpx
+from app.utils.bulkhead import Bulkhead, BulkheadFull
+
+# Every provider by name, for /metrics
+providers = {}
+
+
+class CircuitOpen(Exception):
+    """Raised without calling the provider while its circuit is open."""
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    pass
+
+
+def is_provider_failure(exc: Exception) -> bool:
+    """Errors that say the provider is unhealthy, as opposed to a bad request
+    or local overload (BulkheadFull, CircuitOpen).
+    """
+    if isinstance(exc, (TimeoutError, ConnectionError, httpx.TransportError)):
+        return True
+    status_code = getattr(getattr(exc, "response", None), "status_code", None)
+    return status_code is not None and (status_code >= 500 or status_code == 429)
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Errors after which the same call may well succeed later: provider
+    failures, and calls refused locally (CircuitOpen, BulkheadFull) or cut
+    off by their deadline (DeadlineExceeded).
+    """
+    return isinstance(exc, (CircuitOpen, BulkheadFull, DeadlineExceeded)) or is_provider_failure(exc)
+
+
+class CircuitBreaker:
+    """Closed -> open after failure_threshold failures in a row -> half open
+    after reset_timeout, when one trial call decides between closed and open.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self.stats = {"opened": 0, "short_circuited": 0}
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self):
+        state = self.state
+        if state == "open" or (state == "half_open" and self._trial):
+            self.stats["short_circuited"] += 1
+            raise CircuitOpen
+        if state == "half_open":
+            self._trial = True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._trial or self.failures >= self.failure_threshold:
+            if self.opened_at is None or self._trial:
+                self.stats["opened"] += 1
+            self.opened_at = time.monotonic()
+            self._trial = False
+
+    def record_neutral(self):
+        """The call ended without telling us anything about provider health."""
+        self._trial = False
+
+
+class LatencyTracker:
+    """Latencies of the last `window` successful calls."""
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class ResilientProvider:
+    """Deadlines, hedging and a circuit breaker around one provider's calls.
+
+    Every attempt still goes through the provider's bulkhead. A hedged call
+    sends a duplicate once the first attempt has run longer than the recent
+    p95 latency and takes whichever answers first; only use it for
+    idempotent calls. When the circuit is open calls fail fast with
+    CircuitOpen, so callers can fall back to cached or degraded results.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        bulkhead: Bulkhead,
+        deadline: float = 30,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+        hedge_percentile: float = 0.95,
+        min_hedge_samples: int = 20,
+        min_hedge_delay: float = 0.05,
+        is_failure: Callable[[Exception], bool] = is_provider_failure,
+    ):
+        self.name = name
+        self.bulkhead = bulkhead
+        self.deadline = deadline
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.latency = LatencyTracker()
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_samples = min_hedge_samples
+        self.min_hedge_delay = min_hedge_delay
+        self.is_failure = is_failure
+        self.stats = {"calls": 0, "failures": 0, "deadline_exceeded": 0, "hedged": 0, "hedge_wins": 0}
+        providers[name] = self
+
+    def hedge_delay(self) -> Optional[float]:
+        if len(self.latency.samples) < self.min_hedge_samples:
+            return None
+        return max(self.min_hedge_delay, self.latency.percentile(self.hedge_percentile))
+
+    def _before_call(self):
+        try:
+            self.breaker.before_call()
+        except CircuitOpen:
+            raise CircuitOpen(f"{self.name} is unavailable, failing fast") from None
+        self.stats["calls"] += 1
+
+    def _after_failure(self, exc: Exception):
+        if self.is_failure(exc):
+            self.stats["failures"] += 1
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_neutral()
+
+    async def call(self, fn, *args, hedge: bool = False, deadline: Optional[float] = None, **kwargs):
+        """Run fn(*args, **kwargs) within the deadline, hedging it if asked to."""
+        self._before_call()
+        deadline = self.deadline if deadline is None else deadline
+        try:
+            return await asyncio.wait_for(self._attempts(fn, args, kwargs, hedge), deadline)
+        except asyncio.TimeoutError:
+            self.stats["deadline_exceeded"] += 1
+            self._after_failure(asyncio.TimeoutError())
+            raise DeadlineExceeded(f"{self.name} call did not finish within {deadline}s") from None
+        except Exception as e:
+            self._after_failure(e)
+            raise
+        except BaseException:
+            self.breaker.record_neutral()
+            raise
+
+    async def _attempt(self, fn, args, kwargs):
+        started = time.monotonic()
+        result = await self.bulkhead.call(fn, *args, **kwargs)
+        self.latency.add(time.monotonic() - started)
+        return result
+
+    async def _attempts(self, fn, args, kwargs, hedge: bool):
+        delay = self.hedge_delay() if hedge else None
+        primary = asyncio.ensure_future(self._attempt(fn, args, kwargs))
+        tasks = {primary}
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    self.stats["hedged"] += 1
+                    tasks.add(asyncio.ensure_future(self._attempt(fn, args, kwargs)))
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.stats["hedge_wins"] += 1
+                        self.breaker.record_success()
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @asynccontextmanager
+    async def guard(self, bulkhead: Optional[Bulkhead] = None):
+        """Breaker and bulkhead for calls that cannot be retried or hedged
+        (streamed uploads and responses); the body gets no deadline. Pass a
+        separate bulkhead for calls paced by the client, so a slow client
+        does not hold a slot the provider's other calls need.
+        """
+        self._before_call()
+        try:
+            async with (bulkhead or self.bulkhead).slot(measure_latency=False):
+                yield
+        except Exception as e:
+            self._after_failure(e)
+            raise
+        except BaseException:
+            self.breaker.record_neutral()  # cancelled, or the stream was abandoned
+            raise
+        else:
+            self.breaker.record_success()
+
+    def snapshot(self) -> dict:
+        return {
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            **self.breaker.stats,
+            **self.stats,
+            "p95_seconds": self.latency.percentile(0.95),
+            "hedge_delay_seconds": self.hedge_delay(),
+        }
+
+
+def provider_stats() -> dict:
+    return {name: provider.snapshot() for name, provider in providers.items()}
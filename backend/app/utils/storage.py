@@ -0,0 +1,315 @@
+import os
+import hmac
+import errno
+import uuid
+import shutil
+import asyncio
+import hashlib
+import tempfile
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Optional
+from urllib.parse import quote
+import httpx
+from app.utils.http_client import get_client
+from app.enums.storage_tier import StorageTier
+
+# Where recordings are stored: "local" (UPLOAD_DIR) or "s3" (any S3-compatible service)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL", "https://s3.amazonaws.com")
+S3_BUCKET = os.getenv("S3_BUCKET", "recordings")
+S3_REGION = os.getenv("S3_REGION", "us-east-1")
+S3_ACCESS_KEY_ID = os.getenv("S3_ACCESS_KEY_ID", "")
+S3_SECRET_ACCESS_KEY = os.getenv("S3_SECRET_ACCESS_KEY", "")
+# Optional second backend the retention job moves old recordings to
+COLD_STORAGE_BACKEND = os.getenv("COLD_STORAGE_BACKEND", "")
+COLD_UPLOAD_DIR = os.getenv("COLD_UPLOAD_DIR", "archive")
+COLD_S3_BUCKET = os.getenv("COLD_S3_BUCKET", S3_BUCKET)
+# Lifetime of the presigned URLs recordings are played back from
+S3_PRESIGN_EXPIRES = int(os.getenv("S3_PRESIGN_EXPIRES", "900"))
+STORAGE_CHUNK_SIZE = 256 * 1024
+EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+
+_storage = None
+_cold_storage = None
+
+
+def storage_key(sha256: str, extension: str = "") -> str:
+    """Key of content-addressed audio, sharded as ab/cd/abcd...<extension>
+    so no directory (or listing prefix) grows past 65536 entries.
+    """
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}"
+
+
+async def read_file_chunks(path: str, chunk_size: int = STORAGE_CHUNK_SIZE):
+    with open(path, "rb") as f:
+        while chunk := await asyncio.to_thread(f.read, chunk_size):
+            yield chunk
+
+
+class Storage(ABC):
+    """Where recordings live, addressed by key rather than by path.
+
+    Uploads are spooled to a local file first (incoming_path()), then handed
+    over with commit() once complete, so a key never names a partial file.
+    """
+
+    def __init__(self, spool_dir: str):
+        self.spool_dir = spool_dir
+
+    def incoming_path(self) -> str:
+        os.makedirs(self.spool_dir, exist_ok=True)
+        return os.path.join(self.spool_dir, f".incoming-{uuid.uuid4().hex}")
+
+    @abstractmethod
+    async def commit(self, path: str, key: str):
+        """Store the finished local file under key; the file is consumed."""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Whether an object is stored under key."""
+
+    @abstractmethod
+    async def delete(self, key: str):
+        """Remove key if it exists."""
+
+    @abstractmethod
+    def read_chunks(self, key: str):
+        """Async iterator over the stored bytes; FileNotFoundError if missing."""
+
+    @abstractmethod
+    def download_url(self, key: str) -> Optional[str]:
+        """Short-lived URL clients can fetch key from directly, or None when
+        the backend has none and the app serves the bytes itself.
+        """
+
+    @abstractmethod
+    def local_path(self, key: str):
+        """Async context manager: a local file holding key's content for the
+        duration of the block. Files written next to it can be committed
+        before the block ends.
+        """
+
+
+def copy_into_place(path: str, target: str):
+    """Move path to target across filesystems: copy next to target, then
+    rename, so target is never seen half written.
+    """
+    fd, temp = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".incoming-")
+    os.close(fd)
+    try:
+        shutil.copyfile(path, temp)
+        os.replace(temp, target)
+    except BaseException:
+        os.remove(temp)
+        raise
+    os.remove(path)
+
+
+class LocalStorage(Storage):
+    """Files under root, with uploads spooled to root/.incoming and renamed
+    into place, so the same filesystem makes the commit atomic. Files from
+    another filesystem are copied in first.
+    """
+
+    def __init__(self, root: str):
+        super().__init__(os.path.join(root, ".incoming"))
+        self.root = root
+
+    def path(self, key: str) -> str:
+        path = os.path.normpath(os.path.join(self.root, key))
+        if not path.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    async def commit(self, path: str, key: str):
+        target = self.path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            os.replace(path, target)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            await asyncio.to_thread(copy_into_place, path, target)
+
+    async def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    async def delete(self, key: str):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def read_chunks(self, key: str):
+        return read_file_chunks(self.path(key))
+
+    def download_url(self, key: str) -> Optional[str]:
+        return None  # played back through GET /recordings/{id}/audio
+
+    @asynccontextmanager
+    async def local_path(self, key: str):
+        path = self.path(key)
+        if not os.path.exists(path):
+            raise FileNotFoundError(key)
+        yield path
+
+
+def canonical_query(params) -> str:
+    return "&".join(sorted(f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}" for k, v in params))
+
+
+def signature_v4(canonical_request: str, amz_date: str, scope: str, secret_key: str) -> str:
+    string_to_sign = "\n".join(["AWS4-HMAC-SHA256", amz_date, scope, hashlib.sha256(canonical_request.encode()).hexdigest()])
+    key = f"AWS4{secret_key}".encode()
+    for part in scope.split("/"):
+        key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+    return hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+
+def sign_v4(method: str, url: httpx.URL, headers: dict, payload_hash: str, region: str, service: str,
+            access_key: str, secret_key: str, now: Optional[datetime] = None) -> dict:
+    """Headers for an AWS Signature Version 4 signed request (header auth)."""
+    amz_date = (now or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+    signed_headers = {name.lower(): str(value).strip() for name, value in headers.items()}
+    signed_headers["host"] = url.netloc.decode()
+    signed_headers["x-amz-date"] = amz_date
+    names = sorted(signed_headers)
+    canonical_request = "\n".join([
+        method,
+        quote(url.path, safe="/-_.~"),
+        canonical_query(url.params.multi_items()),
+        "".join(f"{name}:{signed_headers[name]}\n" for name in names),
+        ";".join(names),
+        payload_hash,
+    ])
+    scope = f"{amz_date[:8]}/{region}/{service}/aws4_request"
+    signature = signature_v4(canonical_request, amz_date, scope, secret_key)
+    signed_headers["authorization"] = (
+        f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, SignedHeaders={';'.join(names)}, Signature={signature}"
+    )
+    return signed_headers
+
+
+def presign_v4(method: str, url: httpx.URL, expires: int, region: str, service: str,
+               access_key: str, secret_key: str, now: Optional[datetime] = None) -> str:
+    """URL with an AWS Signature Version 4 query string, valid for `expires` seconds."""
+    amz_date = (now or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+    scope = f"{amz_date[:8]}/{region}/{service}/aws4_request"
+    params = [
+        *url.params.multi_items(),
+        ("X-Amz-Algorithm", "AWS4-HMAC-SHA256"),
+        ("X-Amz-Credential", f"{access_key}/{scope}"),
+        ("X-Amz-Date", amz_date),
+        ("X-Amz-Expires", str(expires)),
+        ("X-Amz-SignedHeaders", "host"),
+    ]
+    query = canonical_query(params)
+    canonical_request = "\n".join([
+        method, quote(url.path, safe="/-_.~"), query, f"host:{url.netloc.decode()}\n", "host", "UNSIGNED-PAYLOAD",
+    ])
+    signature = signature_v4(canonical_request, amz_date, scope, secret_key)
+    return str(url.copy_with(query=f"{query}&X-Amz-Signature={signature}".encode()))
+
+
+class S3Storage(Storage):
+    """Objects in an S3-compatible bucket (AWS, MinIO, R2...), addressed
+    path-style as <endpoint>/<bucket>/<key>, so every app node sees the same
+    recordings. Uploads are spooled under spool_dir and sent with one PUT,
+    which S3 applies atomically.
+    """
+
+    def __init__(self, endpoint_url: str, bucket: str, region: str, access_key: str, secret_key: str, spool_dir: str):
+        super().__init__(spool_dir)
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.bucket = bucket
+        self.region = region
+        self.access_key = access_key
+        self.secret_key = secret_key
+
+    def _url(self, key: str) -> httpx.URL:
+        return httpx.URL(f"{self.endpoint_url}/{self.bucket}/{quote(key, safe='/')}")
+
+    async def _send(self, method: str, key: str, content=None, headers: Optional[dict] = None, stream: bool = False) -> httpx.Response:
+        url = self._url(key)
+        # The body of a PUT is streamed from disk, so it is not part of the signature
+        payload_hash = "UNSIGNED-PAYLOAD" if content is not None else EMPTY_SHA256
+        headers = {**(headers or {}), "x-amz-content-sha256": payload_hash}
+        signed = sign_v4(method, url, headers, payload_hash, self.region, "s3", self.access_key, self.secret_key)
+        client = get_client()
+        return await client.send(client.build_request(method, url, headers=signed, content=content), stream=stream)
+
+    def download_url(self, key: str, expires: int = S3_PRESIGN_EXPIRES) -> str:
+        return presign_v4("GET", self._url(key), expires, self.region, "s3", self.access_key, self.secret_key)
+
+    async def commit(self, path: str, key: str):
+        response = await self._send("PUT", key, content=read_file_chunks(path), headers={"content-length": str(os.path.getsize(path))})
+        response.raise_for_status()
+        os.remove(path)
+
+    async def exists(self, key: str) -> bool:
+        response = await self._send("HEAD", key)
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        return True
+
+    async def delete(self, key: str):
+        response = await self._send("DELETE", key)
+        if response.status_code != 404:
+            response.raise_for_status()
+
+    async def read_chunks(self, key: str):
+        response = await self._send("GET", key, stream=True)
+        try:
+            if response.status_code == 404:
+                raise FileNotFoundError(key)
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(STORAGE_CHUNK_SIZE):
+                yield chunk
+        finally:
+            await response.aclose()
+
+    @asynccontextmanager
+    async def local_path(self, key: str):
+        os.makedirs(self.spool_dir, exist_ok=True)
+        directory = tempfile.mkdtemp(dir=self.spool_dir)
+        try:
+            path = os.path.join(directory, os.path.basename(key))
+            with open(path, "wb") as out:
+                async for chunk in self.read_chunks(key):
+                    await asyncio.to_thread(out.write, chunk)
+            yield path
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def create_storage(backend: str = STORAGE_BACKEND, root: str = UPLOAD_DIR, bucket: str = S3_BUCKET) -> Storage:
+    if backend == "s3":
+        return S3Storage(S3_ENDPOINT_URL, bucket, S3_REGION, S3_ACCESS_KEY_ID, S3_SECRET_ACCESS_KEY, spool_dir=UPLOAD_DIR)
+    if backend == "local":
+        return LocalStorage(root)
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def get_cold_storage() -> Optional[Storage]:
+    """The cold tier, or None when COLD_STORAGE_BACKEND is not configured."""
+    global _cold_storage
+    if _cold_storage is None and COLD_STORAGE_BACKEND:
+        _cold_storage = create_storage(COLD_STORAGE_BACKEND, COLD_UPLOAD_DIR, COLD_S3_BUCKET)
+    return _cold_storage
+
+
+def get_storage(tier: str = StorageTier.HOT.value) -> Storage:
+    """Backend of a storage tier (Recording.storage_tier)."""
+    global _storage
+    if tier == StorageTier.COLD.value:
+        cold = get_cold_storage()
+        if cold is None:
+            raise RuntimeError("Recording is in cold storage but COLD_STORAGE_BACKEND is not configured")
+        return cold
+    if _storage is None:
+        _storage = create_storage()
+    return _storage
@@ -0,0 +1,38 @@
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Optional
+
+
+class TranscriptionSession(ABC):
+    """One answer being transcribed while it is recorded."""
+
+    @abstractmethod
+    async def send(self, chunk: bytes):
+        """Feed the next piece of audio."""
+
+    @abstractmethod
+    async def finish(self) -> str:
+        """Signal the end of the audio and return the final transcript."""
+
+    async def close(self):
+        """Release the session; called once, after finish() or on abort."""
+
+
+class StreamingTranscriber(ABC):
+    """Backend that returns partial transcripts while audio is still arriving.
+
+    open() starts a session; the backend reports partial transcripts by
+    awaiting on_partial(text) whenever its hypothesis changes.
+    """
+
+    @abstractmethod
+    async def open(self, on_partial: Callable[[str], Awaitable[None]]) -> TranscriptionSession:
+        """Start transcribing a new answer."""
+
+
+# Backend used for live answers. Without one, live audio is still stored
+# while it arrives and transcribed by the regular pipeline afterwards.
+streaming_transcriber: Optional[StreamingTranscriber] = None
+
+
+def get_streaming_transcriber() -> Optional[StreamingTranscriber]:
+    return streaming_transcriber
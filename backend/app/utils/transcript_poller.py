@@ -0,0 +1,187 @@
+import os
+import time
+import heapq
+import asyncio
+import itertools
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+from app.utils.resilience import is_retryable
+from app.utils.transcription import get_transcript, transcript_text
+
+
+@dataclass
+class PendingTranscript:
+    transcript_id: str
+    started: float
+    duration: Optional[float] = None
+    polls: int = 0
+    errors: int = 0
+    waiters: list = field(default_factory=list)
+
+
+class TranscriptPoller:
+    """Polls every pending transcript from a single background task.
+
+    The first poll is timed from the audio duration (providers finish in a
+    fraction of real time), later polls back off with the time already spent
+    waiting, and all polls share one requests-per-second budget. Outbound
+    traffic therefore follows the poll schedule, not the number of uploads.
+    A poll that fails with a transient error (is_retryable), including an
+    open circuit or a full bulkhead, is retried, the delay doubling with each
+    consecutive failure; only a failed transcript,
+    any other error or max_wait resolves the waiters with an error.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Awaitable[dict]],
+        max_requests_per_second: float = 5.0,
+        min_interval: float = 1.0,
+        max_interval: float = 30.0,
+        realtime_factor: float = 0.3,
+        backoff: float = 0.25,
+        max_wait: Optional[float] = None,
+        is_retryable: Callable[[Exception], bool] = is_retryable,
+    ):
+        self.fetch = fetch
+        self.max_requests_per_second = max_requests_per_second
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.realtime_factor = realtime_factor
+        self.backoff = backoff
+        self.max_wait = max_wait
+        self.is_retryable = is_retryable
+        self.pending: dict[str, PendingTranscript] = {}
+        self._schedule = []
+        self._seq = itertools.count()
+        self._next_slot = 0.0
+        self._wakeup = None
+        self._task = None
+        self._polls = set()
+
+    def start(self):
+        self.pending.clear()
+        self._schedule = []
+        self._next_slot = 0.0
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        for poll in list(self._polls):
+            poll.cancel()
+        await asyncio.gather(self._task, *self._polls, return_exceptions=True)
+        self._task = None
+        for pending in self.pending.values():
+            for waiter in pending.waiters:
+                if not waiter.done():
+                    waiter.cancel()
+        self.pending.clear()
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self.start()
+
+    def next_delay(self, pending: PendingTranscript, now: float) -> float:
+        if pending.polls == 0 and pending.duration:
+            delay = pending.duration * self.realtime_factor
+        else:
+            delay = (now - pending.started) * self.backoff
+        return min(self.max_interval, max(self.min_interval, delay) * 2 ** pending.errors)
+
+    async def wait(self, transcript_id: str, duration: Optional[float] = None) -> str:
+        """Wait until the transcript finishes and return its text.
+
+        Raises TimeoutError if it is still processing after max_wait seconds.
+        """
+        self._ensure_started()
+        waiter = asyncio.get_running_loop().create_future()
+        pending = self.pending.get(transcript_id)
+        if pending is None:
+            now = time.monotonic()
+            pending = PendingTranscript(transcript_id, started=now, duration=duration)
+            self.pending[transcript_id] = pending
+            self._push(pending, now + self.next_delay(pending, now))
+        pending.waiters.append(waiter)
+        if self.max_wait is None:
+            return await waiter
+        try:
+            return await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Transcript {transcript_id} still processing after {self.max_wait}s") from None
+
+    def _push(self, pending: PendingTranscript, due: float):
+        heapq.heappush(self._schedule, (due, next(self._seq), pending.transcript_id))
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            if not self._schedule:
+                await self._wakeup.wait()
+                continue
+            due = self._schedule[0][0]
+            delay = max(due, self._next_slot) - time.monotonic()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, _, transcript_id = heapq.heappop(self._schedule)
+            self._next_slot = time.monotonic() + 1 / self.max_requests_per_second
+            pending = self.pending.get(transcript_id)
+            if pending is None:
+                continue
+            poll = asyncio.create_task(self._poll(pending))
+            self._polls.add(poll)
+            poll.add_done_callback(self._polls.discard)
+
+    async def _poll(self, pending: PendingTranscript):
+        pending.polls += 1
+        try:
+            transcript = await self.fetch(pending.transcript_id)
+        except Exception as e:
+            if not self.is_retryable(e):
+                self._resolve(pending, exception=e)
+                return
+            pending.errors += 1  # provider trouble: try again later
+        else:
+            pending.errors = 0
+            try:
+                text = transcript_text(transcript)
+            except Exception as e:
+                self._resolve(pending, exception=e)
+                return
+            if text is not None:
+                self._resolve(pending, result=text)
+                return
+        pending.waiters = [w for w in pending.waiters if not w.done()]
+        if not pending.waiters:
+            self.pending.pop(pending.transcript_id, None)
+            return
+        now = time.monotonic()
+        self._push(pending, now + self.next_delay(pending, now))
+
+    def _resolve(self, pending: PendingTranscript, result=None, exception=None):
+        self.pending.pop(pending.transcript_id, None)
+        for waiter in pending.waiters:
+            if waiter.done():
+                continue
+            if exception is not None:
+                waiter.set_exception(exception)
+            else:
+                waiter.set_result(result)
+
+
+poller = TranscriptPoller(
+    fetch=get_transcript,
+    max_requests_per_second=float(os.getenv("TRANSCRIPT_POLL_MAX_RPS", "5")),
+    min_interval=float(os.getenv("TRANSCRIPT_POLL_MIN_INTERVAL", "1")),
+    max_interval=float(os.getenv("TRANSCRIPT_POLL_MAX_INTERVAL", "30")),
+    max_wait=float(os.getenv("TRANSCRIPT_MAX_WAIT", "900")),
+)
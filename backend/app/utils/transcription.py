@@ -1,7 +1,10 @@
-import httpx
-import time
 import os
+import asyncio
+from typing import Optional
 from dotenv import load_dotenv
+from app.utils.http_client import get_client
+from app.utils.bulkhead import Bulkhead
+from app.utils.resilience import ResilientProvider
 
 load_dotenv()
 
@@ -20,38 +23,101 @@ HEADERS = {
 # Endpoints
 UPLOAD_ENDPOINT = "https://api.assemblyai.com/v2/upload"
 TRANSCRIPT_ENDPOINT = "https://api.assemblyai.com/v2/transcript"
+UPLOAD_CHUNK_SIZE = 64 * 1024
 
+# Public URL of /recordings/transcription-callback. When set, transcripts are
+# requested with a webhook and polling is only used as a fallback.
+TRANSCRIPTION_WEBHOOK_URL = os.getenv("TRANSCRIPTION_WEBHOOK_URL")
+TRANSCRIPTION_WEBHOOK_SECRET = os.getenv("TRANSCRIPTION_WEBHOOK_SECRET")
+WEBHOOK_AUTH_HEADER = "x-transcription-webhook-secret"
 
-def upload_file(filepath: str) -> str:
+# Concurrent AssemblyAI calls; the limit adapts between 1 and ASSEMBLYAI_MAX_CONCURRENCY
+assemblyai_bulkhead = Bulkhead(
+    "assemblyai",
+    limit=int(os.getenv("ASSEMBLYAI_CONCURRENCY", "10")),
+    max_limit=int(os.getenv("ASSEMBLYAI_MAX_CONCURRENCY", "50")),
+    max_queue=int(os.getenv("ASSEMBLYAI_MAX_QUEUE", "100")),
+    queue_timeout=float(os.getenv("ASSEMBLYAI_QUEUE_TIMEOUT", "30")),
+    latency_target=float(os.getenv("ASSEMBLYAI_LATENCY_TARGET", "5")),
+)
+# Streamed uploads last as long as the client takes to send the audio, so
+# they get their own slots instead of starving polls and transcript requests
+assemblyai_upload_bulkhead = Bulkhead(
+    "assemblyai_uploads",
+    limit=int(os.getenv("ASSEMBLYAI_UPLOAD_CONCURRENCY", "20")),
+    max_limit=int(os.getenv("ASSEMBLYAI_UPLOAD_CONCURRENCY", "20")),
+    max_queue=int(os.getenv("ASSEMBLYAI_MAX_QUEUE", "100")),
+    queue_timeout=float(os.getenv("ASSEMBLYAI_QUEUE_TIMEOUT", "30")),
+)
+assemblyai = ResilientProvider(
+    "assemblyai",
+    assemblyai_bulkhead,
+    deadline=float(os.getenv("ASSEMBLYAI_DEADLINE", "30")),
+    failure_threshold=int(os.getenv("ASSEMBLYAI_BREAKER_FAILURES", "5")),
+    reset_timeout=float(os.getenv("ASSEMBLYAI_BREAKER_RESET", "30")),
+)
+
+
+def webhook_enabled() -> bool:
+    return bool(TRANSCRIPTION_WEBHOOK_URL)
+
+
+async def read_chunks(filepath: str):
     with open(filepath, 'rb') as f:
-        response = httpx.post(
+        while chunk := await asyncio.to_thread(f.read, UPLOAD_CHUNK_SIZE):
+            yield chunk
+
+
+async def upload_stream(chunks) -> str:
+    """Upload audio from an async iterator of byte chunks.
+
+    The body can only be read once, so unlike the other calls a 429 is not
+    retried. Holds a slot of the upload bulkhead, not the API's.
+    """
+    async with assemblyai.guard(assemblyai_upload_bulkhead):
+        response = await get_client().post(
             UPLOAD_ENDPOINT,
             headers={"authorization": ASSEMBLYAI_API_KEY},
-            content=f  # use `content=` not `files=`
+            content=chunks  # use `content=` not `files=`
         )
-    response.raise_for_status()
+        response.raise_for_status()
     return response.json()['upload_url']
 
 
-def transcribe_audio(upload_url: str) -> str:
-    # Step 1: Request transcription
-    response = httpx.post(
-        TRANSCRIPT_ENDPOINT,
-        json={"audio_url": upload_url},
-        headers=HEADERS
-    )
+async def upload_file(filepath: str) -> str:
+    return await upload_stream(read_chunks(filepath))
+
+
+async def request_transcript(upload_url: str) -> str:
+    """Start a transcription job and return its id."""
+    payload = {"audio_url": upload_url}
+    if webhook_enabled():
+        payload["webhook_url"] = TRANSCRIPTION_WEBHOOK_URL
+        if TRANSCRIPTION_WEBHOOK_SECRET:
+            payload["webhook_auth_header_name"] = WEBHOOK_AUTH_HEADER
+            payload["webhook_auth_header_value"] = TRANSCRIPTION_WEBHOOK_SECRET
+
+    # Not hedged: a duplicate would start a second (billed) transcription job
+    response = await assemblyai.call(send_checked, "POST", TRANSCRIPT_ENDPOINT, json=payload, headers=HEADERS)
+    return response.json()['id']
+
+
+async def get_transcript(transcript_id: str) -> dict:
+    response = await assemblyai.call(send_checked, "GET", f"{TRANSCRIPT_ENDPOINT}/{transcript_id}", headers=HEADERS, hedge=True)
+    return response.json()
+
+
+async def send_checked(method: str, url: str, **kwargs):
+    response = await get_client().request(method, url, **kwargs)
     response.raise_for_status()
-    transcript_id = response.json()['id']
+    return response
 
-    # Step 2: Poll for completion
-    while True:
-        polling_response = httpx.get(f"{TRANSCRIPT_ENDPOINT}/{transcript_id}", headers=HEADERS)
-        polling_response.raise_for_status()
-        status = polling_response.json()['status']
 
-        if status == 'completed':
-            return polling_response.json()['text']
-        elif status == 'error':
-            raise RuntimeError("Transcription failed:", polling_response.json())
+def transcript_text(transcript: dict) -> Optional[str]:
+    """Return the text of a finished transcript, None while it is still running."""
+    if transcript['status'] == 'completed':
+        return transcript['text']
+    elif transcript['status'] == 'error':
+        raise RuntimeError(f"Transcription failed: {transcript.get('error')}")
+    return None
 
-        time.sleep(3)  # Wait before polling again
@@ -0,0 +1,33 @@
+"""Time header-only duration parsing per file.
+
+WebM written by MediaRecorder has no Duration element, so the parser
+falls back to the last block timestamp; the file below is built that way.
+
+    cd backend && python -m benchmarks.audio_duration
+"""
+import os
+import tempfile
+import timeit
+from pathlib import Path
+from app.utils.audio_duration import audio_duration
+from tests.audio_fixtures import write_wav, write_webm
+
+RUNS = 2000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {
+            "wav (10 min)": write_wav(os.path.join(tmp, "answer.wav"), seconds=600, rate=16000, channels=1),
+            "webm (10 min, 50 ms blocks)": write_webm(
+                Path(tmp, "answer.webm"),
+                [(cluster * 5000, range(0, 5000, 50)) for cluster in range(120)],
+            ),
+        }
+        for name, path in files.items():
+            seconds = timeit.timeit(lambda: audio_duration(path), number=RUNS) / RUNS
+            print(f"{name}: {audio_duration(path):.2f}s of audio parsed in {seconds * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
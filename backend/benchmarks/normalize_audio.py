@@ -0,0 +1,53 @@
+"""Bytes saved and wall time of audio normalization per minute of audio.
+
+Synthesizes speech-like stereo recordings at browser sample rates and runs
+them through the same worker pool the pipeline uses.
+
+    cd backend && python -m benchmarks.normalize_audio [--minutes 1 3 10]
+"""
+import os
+import time
+import wave
+import asyncio
+import argparse
+import tempfile
+import numpy as np
+from app.utils import audio
+
+
+def synthesize(path: str, minutes: float, rate: int = 48000, channels: int = 2):
+    rng = np.random.default_rng(0)
+    t = np.arange(int(minutes * 60 * rate)) / rate
+    # Voiced harmonics with a syllable-rate envelope, plus a little noise
+    voice = sum(np.sin(2 * np.pi * f * t) / i for i, f in enumerate((140, 280, 420, 1100), 1))
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)
+    signal = 0.2 * voice * envelope + 0.01 * rng.standard_normal(len(t))
+    pcm = (np.clip(signal, -1, 1) * 32767).astype("<i2")
+    with wave.open(path, "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(np.repeat(pcm[:, None], channels, axis=1).tobytes())
+
+
+async def run(minutes_list):
+    codec = "opus (ffmpeg)" if audio.FFMPEG else "16 kHz PCM WAV (numpy)"
+    print(f"codec: {codec}, workers: {audio.NORMALIZE_WORKERS}")
+    print(f"{'minutes':>8} {'input MB':>10} {'output MB':>10} {'saved':>7} {'wall s':>8} {'s/min':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        await audio.normalize_audio(os.devnull)  # start the worker processes outside the timing
+        for minutes in minutes_list:
+            source = os.path.join(tmp, f"answer-{minutes}.wav")
+            synthesize(source, minutes)
+            started = time.perf_counter()
+            output = await audio.normalize_audio(source)
+            elapsed = time.perf_counter() - started
+            before, after = os.path.getsize(source), os.path.getsize(output.path)
+            print(f"{minutes:>8g} {before / 1e6:>10.2f} {after / 1e6:>10.2f} {1 - after / before:>7.1%} {elapsed:>8.2f} {elapsed / minutes:>7.2f}")
+    audio.shutdown_executor()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1, 3, 10])
+    asyncio.run(run(parser.parse_args().minutes))
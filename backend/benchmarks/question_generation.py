@@ -0,0 +1,63 @@
+"""Wall time of question generation with the types fanned out against one
+after another.
+
+Runs a question generator ("llm" answered by the fake LLM from the tests,
+with a lognormal per-request latency, or "mock") for all three question
+types, uncached.
+
+    cd backend && python -m benchmarks.question_generation [--generator llm] [--latency 0.5] [--runs 10]
+"""
+import time
+import asyncio
+import argparse
+import statistics
+import httpx
+from app.utils import http_client
+from app.utils.question_generation import QUESTION_TYPES, compute_generation, create_generator
+from tests import fake_latency
+from tests.fake_llm import FakeLLM
+
+JOB_DESCRIPTION = "Senior Backend Engineer\nPython, SQL and AWS; we run Kubernetes."
+
+
+async def run(generator_name: str, latency: float, runs: int, num_questions: int = 5):
+    fake = FakeLLM()
+    fake.latency = fake_latency.lognormal(latency, 0.5)
+
+    async def route(request):
+        await asyncio.sleep(fake.latency(request))
+        return fake.handle(request)
+
+    http_client.TRANSPORT = httpx.MockTransport(route)
+    generator = create_generator(generator_name)
+
+    async def sequential():
+        for question_type in QUESTION_TYPES:
+            await generator.generate(JOB_DESCRIPTION, question_type, num_questions)
+
+    async def fan_out():
+        await compute_generation(JOB_DESCRIPTION, QUESTION_TYPES, num_questions, generator)
+
+    backend = f", median LLM latency {latency * 1000:.0f} ms" if generator_name == "llm" else ""
+    print(f"{generator_name} generator, {len(QUESTION_TYPES)} types{backend}, {runs} runs")
+    for name, fn in (("sequential", sequential), ("fan-out", fan_out)):
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            await fn()
+            timings.append((time.perf_counter() - started) * 1000)
+        print(f"  {name:<11} median {statistics.median(timings):8.1f} ms   max {max(timings):8.1f} ms")
+    await http_client.close_client()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--generator", default="llm", choices=["llm", "mock"])
+    parser.add_argument("--latency", type=float, default=0.5, help="median fake LLM latency in seconds")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args.generator, args.latency, args.runs))
+
+
+if __name__ == "__main__":
+    main()
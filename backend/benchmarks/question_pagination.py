@@ -0,0 +1,83 @@
+"""Time of the first and a deep page of GET /questions against OFFSET paging.
+
+Fills an in-memory SQLite database (same schema and indexes as the app)
+and walks the listing with the keyset cursor.
+
+    cd backend && python -m benchmarks.question_pagination [--rows 200000]
+"""
+import time
+import argparse
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from app.models import models
+from fastapi import Response
+from app.models.models import Base
+from app.models.user import User  # noqa: F401 (registers the user table)
+from app.routers.question import get_questions
+from app.utils.pagination import encode_cursor
+from app.utils.job_descriptions import description_sha256
+
+CATEGORIES = ["technical", "behavioral", "cultural"]
+
+
+def fill(db, rows: int):
+    start = datetime(2024, 1, 1)
+    batch = 10_000
+    # Ten questions per posting, as generation produces them
+    postings = [description_sha256(f"Posting {i} " + "x" * 2000) for i in range(rows // 10 + 1)]
+    db.execute(insert(models.JobDescription), [
+        {"sha256": sha256, "description": f"Posting {i} " + "x" * 2000, "created_at": start} for i, sha256 in enumerate(postings)
+    ])
+    for offset in range(0, rows, batch):
+        db.execute(insert(models.Question), [
+            {"text": f"Question {i}", "category": CATEGORIES[i % 3], "job_title": f"Title {i % 100}", "is_generated": i % 2 == 0,
+             "job_description_sha256": postings[i // 10], "created_at": start + timedelta(seconds=i)}
+            for i in range(offset, min(rows, offset + batch))
+        ])
+    db.commit()
+
+
+def timed(fn, repeats: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def run(rows: int, limit: int = 50):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    fill(db, rows)
+
+    def page(cursor=None, category=None):
+        response = Response()
+        get_questions(response, limit=limit, cursor=cursor, category=category, job_title=None, is_generated=None, db=db)
+        db.expunge_all()
+        return response.headers.get("x-next-cursor")
+
+    # Cursor of a page ~90% of the way through the listing
+    deep = db.query(models.Question).order_by(models.Question.created_at.desc(), models.Question.id.desc()).offset(int(rows * 0.9)).first()
+    deep_cursor = encode_cursor(deep.created_at, deep.id)
+
+    def offset_page():
+        db.query(models.Question).order_by(models.Question.created_at.desc(), models.Question.id.desc()).offset(int(rows * 0.9)).limit(limit).all()
+        db.expunge_all()
+
+    print(f"{rows} rows, {limit} per page")
+    print(f"  first page          {timed(page):8.2f} ms")
+    print(f"  deep page (cursor)  {timed(lambda: page(deep_cursor)):8.2f} ms")
+    print(f"  deep page (offset)  {timed(offset_page):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    run(parser.parse_args().rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Latency percentiles of GET /questions/search (first page).
+
+Fills an in-memory SQLite database (same schema, FTS5 index and triggers
+as the tests) with questions drawn from a small vocabulary, then runs
+random one- and two-word searches.
+
+    cd backend && python -m benchmarks.question_search [--rows 200000] [--queries 300]
+"""
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+from fastapi import Response
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from app.models import models
+from app.models.models import Base
+from app.models.user import User  # noqa: F401 (registers the user table)
+from app.routers.question import search_questions
+
+CATEGORIES = ["technical", "behavioral", "cultural"]
+# Zipf-like: the first words are in most questions, the last in few
+WORDS = [f"word{i}" for i in range(2000)]
+WEIGHTS = [1 / (i + 1) for i in range(len(WORDS))]
+
+
+def fill(db, rows: int, rng: random.Random):
+    start = datetime(2024, 1, 1)
+    batch = 10_000
+    for offset in range(0, rows, batch):
+        db.execute(insert(models.Question), [
+            {"text": " ".join(rng.choices(WORDS, WEIGHTS, k=12)), "category": CATEGORIES[i % 3], "job_title": f"Title {i % 100}",
+             "is_generated": i % 2 == 0, "created_at": start + timedelta(seconds=i)}
+            for i in range(offset, min(rows, offset + batch))
+        ])
+    db.commit()
+
+
+def run(rows: int, queries: int, limit: int = 50):
+    rng = random.Random(0)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    fill(db, rows, rng)
+
+    timings = []
+    for _ in range(queries):
+        q = " ".join(rng.sample(WORDS[50:], rng.choice([1, 2])))
+        started = time.perf_counter()
+        search_questions(Response(), q=q, limit=limit, cursor=None, category=None, job_title=None, is_generated=None, db=db)
+        timings.append((time.perf_counter() - started) * 1000)
+        db.expunge_all()
+    timings.sort()
+
+    print(f"{rows} rows, {queries} searches, {limit} per page")
+    for name, quantile in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+        print(f"  {name}  {timings[min(len(timings) - 1, int(len(timings) * quantile))]:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args()
+    run(args.rows, args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Time of the voice activity / silence trimming pass on long answers.
+
+Synthesizes answers at 16 kHz (the rate normalization produces) made of
+speech bursts separated by pauses, and times trim_silence() on one core.
+
+    cd backend && python -m benchmarks.trim_silence [--minutes 1 5 10]
+"""
+import time
+import argparse
+import numpy as np
+from app.utils.audio import TARGET_SAMPLE_RATE, trim_silence
+
+
+def synthesize(minutes: float, rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    total = int(minutes * 60 * rate)
+    signal = 0.002 * rng.standard_normal(total).astype(np.float32)
+    position = int(rng.uniform(1, 4) * rate)  # dead air before the answer starts
+    while position < total:
+        burst = int(rng.uniform(2, 8) * rate)
+        t = np.arange(min(burst, total - position)) / rate
+        signal[position:position + len(t)] += 0.2 * np.sin(2 * np.pi * 180 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))
+        position += burst + int(rng.exponential(1.5) * rate)
+    return signal
+
+
+def run(minutes_list, repeats: int):
+    print(f"{'minutes':>8} {'kept s':>8} {'cut':>7} {'best ms':>9} {'ms/min':>8}")
+    for minutes in minutes_list:
+        samples = synthesize(minutes)
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            trimmed, _ = trim_silence(samples)
+            timings.append(time.perf_counter() - started)
+        best = min(timings) * 1000
+        kept = len(trimmed) / TARGET_SAMPLE_RATE
+        print(f"{minutes:>8g} {kept:>8.1f} {1 - len(trimmed) / len(samples):>7.1%} {best:>9.1f} {best / minutes:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    run(args.minutes, args.repeats)
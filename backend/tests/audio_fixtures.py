@@ -0,0 +1,56 @@
+"""Audio files for the tests and benchmarks: tones, answers with pauses and
+hand-built WebM and Ogg containers.
+"""
+import wave
+import struct
+import numpy as np
+
+UNKNOWN_SIZE = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+
+
+def write_wav(path, seconds=1.0, rate=48000, channels=2, frequency=440):
+    t = np.arange(int(seconds * rate)) / rate
+    tone = (np.sin(2 * np.pi * frequency * t) * 0.5 * 32767).astype("<i2")
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(np.repeat(tone[:, None], channels, axis=1).tobytes())
+    return str(path)
+
+
+def answer_with_pauses(rate=16000):
+    """2 s silence, 1 s speech, 3 s pause, 1 s speech, 2 s silence (with a little noise)."""
+    rng = np.random.default_rng(0)
+    t = np.arange(rate) / rate
+    tone = 0.3 * np.sin(2 * np.pi * 220 * t)
+    quiet = lambda seconds: np.zeros(int(seconds * rate))
+    signal = np.concatenate([quiet(2), tone, quiet(3), tone, quiet(2)])
+    return (signal + 0.001 * rng.standard_normal(len(signal))).astype(np.float32)
+
+
+def ebml(element_id: int, payload: bytes = b"", unknown_size: bool = False) -> bytes:
+    id_bytes = element_id.to_bytes((element_id.bit_length() + 7) // 8, "big")
+    size = UNKNOWN_SIZE if unknown_size else b"\x01" + len(payload).to_bytes(7, "big")
+    return id_bytes + size + payload
+
+
+def simple_block(relative_ms: int) -> bytes:
+    return ebml(0xA3, b"\x81" + struct.pack(">h", relative_ms) + b"\x80" + b"\x00" * 20)
+
+
+def write_webm(path, clusters, duration_ms=None):
+    """MediaRecorder-style WebM: unknown-size segment and clusters, optional Info/Duration."""
+    info = ebml(0x2AD7B1, (1_000_000).to_bytes(3, "big"))
+    if duration_ms is not None:
+        info += ebml(0x4489, struct.pack(">d", duration_ms))
+    body = ebml(0x1549A966, info) + ebml(0x1654AE6B, b"\x00" * 30)  # Info, Tracks
+    for timecode, blocks in clusters:
+        body += ebml(0x1F43B675, unknown_size=True) + ebml(0xE7, timecode.to_bytes(4, "big"))
+        body += b"".join(simple_block(ms) for ms in blocks)
+    path.write_bytes(ebml(0x1A45DFA3, ebml(0x4282, b"webm")) + ebml(0x18538067, unknown_size=True) + body)
+    return str(path)
+
+
+def ogg_page(granule: int, payload: bytes) -> bytes:
+    return b"OggS" + bytes([0, 0]) + struct.pack("<qIII", granule, 1, 0, 0) + bytes([1, len(payload)]) + payload
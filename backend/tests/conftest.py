@@ -1,12 +1,24 @@
+import asyncio
 import pytest
+from unittest.mock import patch
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
-from app.db.session import get_db
+from app.db.session import get_db, get_session_factory
 from app.models.models import Base
+from app.models.user import User
+from app.auth.users import current_active_user, current_active_user_ws
+import httpx
+from tests.fake_assemblyai import FakeAssemblyAI
+from tests.fake_llm import FakeLLM
+from tests.fake_s3 import FakeS3, FAKE_S3_ENDPOINT
+from app.utils import http_client, storage as storage_module
+from app.utils.feedback import feedback_cache
+from app.utils.question_generation import generation_cache, generation_flight, type_flight
+from app.utils.resilience import providers
 
 # Create test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -27,8 +39,88 @@ def db():
         db.close()
         Base.metadata.drop_all(bind=engine)
 
+@pytest.fixture(autouse=True)
+def clear_feedback_cache():
+    feedback_cache.clear()
+    yield
+    feedback_cache.clear()
+
+@pytest.fixture(autouse=True)
+def clear_generation_cache():
+    generation_cache.clear()
+    yield
+    generation_cache.clear()
+    # Generations still running belong to this test's event loop
+    generation_flight.clear()
+    type_flight.clear()
+
+@pytest.fixture(autouse=True)
+def reset_providers():
+    """Start every test with closed circuits and no latency history."""
+    for provider in providers.values():
+        provider.breaker.record_success()
+        provider.latency.samples.clear()
+    yield
+
+@pytest.fixture(scope="function")
+def fake_assemblyai():
+    return FakeAssemblyAI()
+
+@pytest.fixture(scope="function")
+def fake_llm():
+    return FakeLLM()
+
+@pytest.fixture(scope="function")
+def fake_s3():
+    return FakeS3()
+
+@pytest.fixture(autouse=True)
+def storage(tmp_path):
+    """Recordings go to a per-test directory instead of ./uploads."""
+    local = storage_module.LocalStorage(str(tmp_path / "uploads"))
+    with patch.object(storage_module, "_storage", local):
+        yield local
+
+@pytest.fixture(scope="function")
+def s3_storage(tmp_path, fake_s3):
+    """Store recordings in the fake S3 bucket instead (needs fake_providers)."""
+    s3 = storage_module.S3Storage(FAKE_S3_ENDPOINT, "recordings", "us-east-1", "test-key", "test-secret", spool_dir=str(tmp_path / "spool"))
+    with patch.object(storage_module, "_storage", s3):
+        yield s3
+
+@pytest.fixture(scope="function")
+def fake_providers(fake_assemblyai, fake_llm, fake_s3):
+    """Route outbound provider calls on the shared HTTP client to the fakes."""
+    async def route(request):
+        if request.url.host == httpx.URL(FAKE_S3_ENDPOINT).host:
+            return fake_s3.handle(request)
+        fake = fake_llm if request.url.host == "api.openai.com" else fake_assemblyai
+        if fake.latency is not None:
+            await asyncio.sleep(fake.latency(request))
+        return fake.handle(request)
+
+    with patch.object(http_client, "TRANSPORT", httpx.MockTransport(route)):
+        yield
+
+@pytest.fixture(scope="function")
+def test_user(db):
+    user = User(
+        email="test@example.com",
+        username="test_user",
+        hashed_password="not-a-real-hash",
+        is_active=True,
+        is_superuser=False,
+        is_verified=True,
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    # Detach so request-scoped commits don't expire the overridden user
+    db.expunge(user)
+    return user
+
 @pytest.fixture(scope="function")
-def client(db):
+def client(db, test_user, fake_providers):
     def override_get_db():
         try:
             yield db
@@ -36,6 +128,9 @@ def client(db):
             db.close()
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
+    app.dependency_overrides[current_active_user] = lambda: test_user
+    app.dependency_overrides[current_active_user_ws] = lambda: test_user
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear() 
\ No newline at end of file
@@ -0,0 +1,78 @@
+import itertools
+import json
+import httpx
+from app.utils.transcription import UPLOAD_ENDPOINT, TRANSCRIPT_ENDPOINT
+
+
+class FakeAssemblyAI:
+    """In-memory stand-in for the AssemblyAI REST API.
+
+    Transcripts stay "processing" until complete() or fail() is called,
+    unless auto_complete_text is set; fire_callbacks() then delivers the
+    webhooks registered for them.
+    """
+
+    def __init__(self):
+        self.uploads = {}
+        self.transcripts = {}
+        self.pending_callbacks = []
+        self.requests = []
+        # Seconds to wait before answering a request (see tests/fake_latency.py)
+        self.latency = None
+        self.upload_status = 200
+        # Statuses answered to transcript GETs, in turn, before the transcript
+        self.transcript_errors = []
+        self.auto_complete_text = None
+        self._ids = itertools.count(1)
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        url = str(request.url)
+        if request.method == "POST" and url == UPLOAD_ENDPOINT:
+            if self.upload_status != 200:
+                return httpx.Response(self.upload_status, json={"error": "upload failed"}, request=request)
+            upload_url = f"https://cdn.fake-assemblyai.test/{next(self._ids)}"
+            self.uploads[upload_url] = request.read()
+            return httpx.Response(200, json={"upload_url": upload_url}, request=request)
+        if request.method == "POST" and url == TRANSCRIPT_ENDPOINT:
+            payload = json.loads(request.read())
+            transcript_id = f"transcript-{next(self._ids)}"
+            self.transcripts[transcript_id] = {"id": transcript_id, "status": "processing", "text": None, **payload}
+            if self.auto_complete_text is not None:
+                self.complete(transcript_id, self.auto_complete_text)
+            return httpx.Response(200, json=self.transcripts[transcript_id], request=request)
+        if request.method == "GET" and url.startswith(TRANSCRIPT_ENDPOINT + "/"):
+            if self.transcript_errors:
+                return httpx.Response(self.transcript_errors.pop(0), json={"error": "unavailable"}, request=request)
+            transcript = self.transcripts.get(url.rsplit("/", 1)[1])
+            if transcript is None:
+                return httpx.Response(404, json={"error": "not found"}, request=request)
+            return httpx.Response(200, json=transcript, request=request)
+        return httpx.Response(404, json={"error": "unknown endpoint"}, request=request)
+
+    def complete(self, transcript_id: str, text: str):
+        self._finish(transcript_id, status="completed", text=text)
+
+    def fail(self, transcript_id: str, error: str):
+        self._finish(transcript_id, status="error", error=error)
+
+    def _finish(self, transcript_id: str, **fields):
+        transcript = self.transcripts[transcript_id]
+        transcript.update(fields)
+        if transcript.get("webhook_url"):
+            self.pending_callbacks.append(transcript_id)
+
+    def fire_callbacks(self, client):
+        """Deliver pending webhooks through a (test) HTTP client."""
+        responses = []
+        while self.pending_callbacks:
+            transcript = self.transcripts[self.pending_callbacks.pop(0)]
+            headers = {}
+            if transcript.get("webhook_auth_header_name"):
+                headers[transcript["webhook_auth_header_name"]] = transcript["webhook_auth_header_value"]
+            responses.append(client.post(
+                transcript["webhook_url"],
+                json={"transcript_id": transcript["id"], "status": transcript["status"]},
+                headers=headers,
+            ))
+        return responses
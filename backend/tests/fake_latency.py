@@ -0,0 +1,29 @@
+"""Latency distributions for the fake providers' `latency` attribute.
+
+Each returns a function of the request giving the seconds to wait before
+the fake answers.
+"""
+import math
+import random
+
+
+def constant(seconds: float):
+    return lambda request: seconds
+
+
+def sequence(*delays: float, then: float = 0.0):
+    """The given delays for the first requests, `then` for the rest."""
+    remaining = list(delays)
+    return lambda request: remaining.pop(0) if remaining else then
+
+
+def lognormal(median: float, sigma: float, seed: int = 0):
+    """Long-tailed latencies, like a real API under load."""
+    rng = random.Random(seed)
+    return lambda request: median * math.exp(rng.gauss(0, sigma))
+
+
+def stalls(fast: float, stall: float, fraction: float, seed: int = 0):
+    """Mostly `fast`, with `fraction` of requests stuck for `stall` seconds."""
+    rng = random.Random(seed)
+    return lambda request: stall if rng.random() < fraction else fast
@@ -0,0 +1,73 @@
+import json
+import httpx
+from app.utils.feedback import FEEDBACK_KEYS
+
+
+class FakeLLM:
+    """In-memory stand-in for an OpenAI-compatible chat completions API.
+
+    Answers batched feedback requests by scoring every item with
+    feedback_for(), question generation requests with questions_for(), streams single-transcript feedback as server-sent
+    chunks of stream_chunk_size characters, and records each request body.
+    """
+
+    def __init__(self):
+        self.requests = []
+        # Seconds to wait before answering a request (see tests/fake_latency.py)
+        self.latency = None
+        self.status = 200
+        self.stream_chunk_size = 7
+
+    def feedback_for(self, transcript: str) -> dict:
+        return {key: f"{key} feedback for: {transcript}" for key in FEEDBACK_KEYS}
+
+    def questions_for(self, question_type: str, num_questions: int) -> list:
+        return [{"text": f"{question_type} question {i + 1}", "reasoning": "fake"} for i in range(num_questions)]
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        if not request.url.path.endswith("/chat/completions"):
+            return httpx.Response(404, json={"error": {"message": "unknown endpoint"}}, request=request)
+        body = json.loads(request.read())
+        self.requests.append(body)
+        if self.status != 200:
+            return httpx.Response(self.status, json={"error": {"message": "fake LLM failure"}}, request=request)
+
+        if body.get("stream"):
+            return self.stream(body, request)
+        payload = json.loads(body["messages"][-1]["content"])
+        if isinstance(payload, dict) and "question_type" in payload:
+            content = {"questions": self.questions_for(payload["question_type"], payload["num_questions"])}
+        else:
+            content = {"results": [{"id": item["id"], **self.feedback_for(item["transcript"])} for item in payload]}
+        return httpx.Response(200, json={
+            "id": f"chatcmpl-fake-{len(self.requests)}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps(content)},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }, request=request)
+
+    def stream(self, body: dict, request: httpx.Request) -> httpx.Response:
+        content = json.dumps(self.feedback_for(body["messages"][-1]["content"]))
+        events = []
+        for i in range(0, len(content), self.stream_chunk_size):
+            chunk = {
+                "id": f"chatcmpl-fake-{len(self.requests)}",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": body["model"],
+                "choices": [{"index": 0, "delta": {"content": content[i:i + self.stream_chunk_size]}, "finish_reason": None}],
+            }
+            events.append(f"data: {json.dumps(chunk)}\n\n")
+        events.append("data: [DONE]\n\n")
+        return httpx.Response(
+            200,
+            content="".join(events).encode(),
+            headers={"content-type": "text/event-stream"},
+            request=request,
+        )
@@ -0,0 +1,36 @@
+import re
+import httpx
+
+FAKE_S3_ENDPOINT = "https://s3.fake-storage.test"
+AUTHORIZATION = re.compile(r"AWS4-HMAC-SHA256 Credential=\S+/\d{8}/[\w-]+/s3/aws4_request, SignedHeaders=[\w;-]+, Signature=[0-9a-f]{64}")
+
+
+class FakeS3:
+    """In-memory stand-in for an S3-compatible object store (path-style
+    PUT, GET, HEAD and DELETE on /<bucket>/<key>).
+
+    Requests without a SigV4 Authorization header get 403, like MinIO.
+    """
+
+    def __init__(self):
+        self.objects = {}
+        self.requests = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if not AUTHORIZATION.fullmatch(request.headers.get("authorization", "")) or "x-amz-date" not in request.headers:
+            return httpx.Response(403, text="SignatureDoesNotMatch", request=request)
+        path = request.url.path.lstrip("/")
+        if request.method == "PUT":
+            self.objects[path] = request.read()
+            return httpx.Response(200, request=request)
+        if path not in self.objects:
+            return httpx.Response(404, text="NoSuchKey", request=request)
+        if request.method == "GET":
+            return httpx.Response(200, content=self.objects[path], request=request)
+        if request.method == "HEAD":
+            return httpx.Response(200, headers={"content-length": str(len(self.objects[path]))}, request=request)
+        if request.method == "DELETE":
+            del self.objects[path]
+            return httpx.Response(204, request=request)
+        return httpx.Response(405, request=request)
@@ -0,0 +1,38 @@
+from app.utils.streaming_transcription import StreamingTranscriber, TranscriptionSession
+
+
+class FakeTranscriptionSession(TranscriptionSession):
+    def __init__(self, transcriber, on_partial):
+        self.transcriber = transcriber
+        self.on_partial = on_partial
+        self.text = ""
+        self.closed = False
+
+    async def send(self, chunk: bytes):
+        self.text += chunk.decode()
+        await self.on_partial(self.text.strip())
+
+    async def finish(self) -> str:
+        if self.transcriber.finish_error is not None:
+            raise RuntimeError(self.transcriber.finish_error)
+        return self.text.strip()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeStreamingTranscriber(StreamingTranscriber):
+    """Local stand-in for a streaming speech-to-text backend.
+
+    Treats the audio bytes as UTF-8 text: every chunk extends the partial
+    transcript, and the final transcript is everything that was sent.
+    """
+
+    def __init__(self):
+        self.sessions = []
+        self.finish_error = None
+
+    async def open(self, on_partial) -> FakeTranscriptionSession:
+        session = FakeTranscriptionSession(self, on_partial)
+        self.sessions.append(session)
+        return session
@@ -0,0 +1,89 @@
+import wave
+import numpy as np
+import pytest
+from app.utils import audio
+from tests.audio_fixtures import write_wav, answer_with_pauses
+
+
+def dominant_frequency(path):
+    samples, rate, _ = audio.read_wav(path)
+    spectrum = np.abs(np.fft.rfft(samples[:, 0]))
+    return np.fft.rfftfreq(len(samples), 1 / rate)[spectrum.argmax()]
+
+
+@pytest.mark.parametrize("rate", [48000, 44100])
+def test_wav_is_downmixed_and_resampled(tmp_path, monkeypatch, rate):
+    monkeypatch.setattr(audio, "FFMPEG", None)
+    source = write_wav(tmp_path / "answer.wav", rate=rate)
+
+    output = audio.normalize_file(source).path
+
+    assert output == str(tmp_path / "answer-16k.wav")
+    with wave.open(output, "rb") as f:
+        assert (f.getnchannels(), f.getframerate(), f.getsampwidth()) == (1, 16000, 2)
+        assert abs(f.getnframes() - 16000) <= 1
+    assert dominant_frequency(output) == pytest.approx(440, abs=2)
+
+
+def test_already_compact_wav_is_left_alone(tmp_path, monkeypatch):
+    monkeypatch.setattr(audio, "FFMPEG", None)
+    source = write_wav(tmp_path / "answer.wav", rate=16000, channels=1)
+    assert audio.normalize_file(source) == audio.NormalizedAudio(source)
+
+
+def test_undecodable_audio_keeps_the_original(tmp_path):
+    source = tmp_path / "answer.wav"
+    source.write_bytes(b"not really a wav")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(audio, "FFMPEG", None)
+        assert audio.normalize_file(str(source)).path == str(source)
+
+
+def test_only_decodable_and_unnormalized_files_qualify(monkeypatch):
+    monkeypatch.setattr(audio, "FFMPEG", None)
+    assert audio.can_normalize("uploads/abc.wav")
+    assert not audio.can_normalize("uploads/abc.webm")
+    assert not audio.can_normalize("uploads/abc-16k.wav")
+    monkeypatch.setattr(audio, "NORMALIZE_AUDIO", False)
+    assert not audio.can_normalize("uploads/abc.wav")
+
+
+@pytest.mark.asyncio
+async def test_normalization_runs_in_worker_process(tmp_path):
+    source = write_wav(tmp_path / "answer.wav", seconds=0.5)
+    try:
+        output = await audio.normalize_audio(source)
+    finally:
+        audio.shutdown_executor()
+    assert output.path.endswith("-16k.wav")
+
+
+def test_silence_is_trimmed_to_the_padding(monkeypatch):
+    monkeypatch.setattr(audio, "VAD_PADDING", 0.25)
+    samples = answer_with_pauses()
+
+    trimmed, segments = audio.trim_silence(samples)
+
+    assert len(segments) == 2
+    for (start, end), (speech_start, speech_end) in zip(segments, [(2, 3), (6, 7)]):
+        assert start == pytest.approx(speech_start - 0.25, abs=0.06)
+        assert end == pytest.approx(speech_end + 0.25, abs=0.06)
+    # 2 s of speech plus padding on both sides of each burst (8 s -> ~3 s)
+    assert len(trimmed) / 16000 == pytest.approx(3.1, abs=0.1)
+
+
+def test_continuous_speech_is_not_trimmed():
+    t = np.arange(16000 * 3) / 16000
+    samples = (0.3 * np.sin(2 * np.pi * 220 * t) * (1 + np.sin(2 * np.pi * 3 * t)) / 2).astype(np.float32)
+
+    trimmed, segments = audio.trim_silence(samples)
+
+    assert segments is None
+    assert len(trimmed) == len(samples)
+
+
+def test_trimmed_timestamps_map_back_to_the_original():
+    segments = [[1.75, 3.25], [5.75, 7.25]]
+    assert audio.original_time(0.25, segments) == pytest.approx(2.0)
+    assert audio.original_time(1.75, segments) == pytest.approx(6.0)
+    assert audio.original_time(0.5, None) == 0.5
@@ -0,0 +1,53 @@
+import struct
+import uuid
+from datetime import datetime, timezone
+import pytest
+from app.commands.backfill_durations import backfill_durations
+from app.models.models import Question, Recording
+from app.utils.audio_duration import audio_duration
+from app.utils.storage import LocalStorage
+from tests.audio_fixtures import write_wav, write_webm, ogg_page
+
+
+def test_wav_duration(tmp_path):
+    assert audio_duration(write_wav(tmp_path / "answer.wav", seconds=3.0)) == pytest.approx(3.0)
+
+
+def test_webm_duration_from_last_block_when_header_has_none(tmp_path):
+    path = write_webm(tmp_path / "answer.webm", [(0, [0, 20, 40]), (5000, [0, 7480])])
+    assert audio_duration(path) == pytest.approx(12.48)
+
+
+def test_webm_duration_from_info_element(tmp_path):
+    path = write_webm(tmp_path / "answer.webm", [(0, [0])], duration_ms=61250.0)
+    assert audio_duration(path) == pytest.approx(61.25)
+
+
+def test_ogg_opus_duration(tmp_path):
+    path = tmp_path / "answer.ogg"
+    head = b"OpusHead" + bytes([1, 1]) + struct.pack("<HIhB", 312, 48000, 0, 0)
+    path.write_bytes(ogg_page(0, head) + ogg_page(0, b"OpusTags") + ogg_page(48000 * 90 + 312, b"\x00" * 10))
+    assert audio_duration(str(path)) == pytest.approx(90.0)
+
+
+@pytest.mark.parametrize("content", [b"", b"not audio at all", b"RIFF\x00\x00\x00\x00WAVE"])
+def test_unknown_or_broken_files_have_no_duration(tmp_path, content):
+    path = tmp_path / "answer.bin"
+    path.write_bytes(content)
+    assert audio_duration(str(path)) is None
+
+
+@pytest.mark.asyncio
+async def test_backfill_fills_missing_durations(db, test_user, tmp_path):
+    question = Question(text="Q", category="technical")
+    db.add(question)
+    db.commit()
+    write_webm(tmp_path / "a.webm", [(0, [0, 2000])])
+    now = datetime.now(timezone.utc)
+    for url in ("a.webm", "missing.webm"):
+        db.add(Recording(id=uuid.uuid4(), question_id=question.id, user_id=test_user.id, recording_url=url, created_at=now, updated_at=now))
+    db.commit()
+
+    assert await backfill_durations(db, batch_size=1, storage=LocalStorage(str(tmp_path))) == 1
+    durations = {r.recording_url: r.duration_seconds for r in db.query(Recording)}
+    assert durations == {"a.webm": pytest.approx(2.0), "missing.webm": None}
@@ -0,0 +1,128 @@
+import asyncio
+import httpx
+import pytest
+from app.utils.bulkhead import Bulkhead, BulkheadFull
+
+
+def rate_limited(retry_after="0"):
+    request = httpx.Request("GET", "https://provider.test/")
+    response = httpx.Response(429, headers={"retry-after": retry_after}, request=request)
+    return httpx.HTTPStatusError("Too Many Requests", request=request, response=response)
+
+
+@pytest.mark.asyncio
+async def test_calls_past_the_limit_wait_in_line():
+    bulkhead = Bulkhead("test-queue", limit=2, max_limit=2)
+    running = 0
+    peak = 0
+
+    async def work():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    await asyncio.gather(*(bulkhead.call(work) for _ in range(6)))
+
+    stats = bulkhead.snapshot()
+    assert peak == 2
+    assert stats["calls"] == 6
+    assert stats["queued"] == 4
+    assert stats["in_flight"] == 0 and stats["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_instead_of_waiting():
+    bulkhead = Bulkhead("test-reject", limit=1, max_limit=1, max_queue=1)
+    release = asyncio.Event()
+
+    async def blocked():
+        await release.wait()
+
+    first = asyncio.create_task(bulkhead.call(blocked))
+    second = asyncio.create_task(bulkhead.call(blocked))
+    await asyncio.sleep(0)
+    assert bulkhead.is_full()
+    with pytest.raises(BulkheadFull):
+        await bulkhead.call(blocked)
+
+    release.set()
+    await asyncio.gather(first, second)
+    assert bulkhead.snapshot()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_rejects():
+    bulkhead = Bulkhead("test-timeout", limit=1, max_limit=1, queue_timeout=0.01)
+    release = asyncio.Event()
+    holder = asyncio.create_task(bulkhead.call(release.wait))
+    await asyncio.sleep(0)
+
+    with pytest.raises(BulkheadFull):
+        await bulkhead.call(release.wait)
+    assert bulkhead.snapshot()["queue_depth"] == 0
+
+    release.set()
+    await holder
+
+
+@pytest.mark.asyncio
+async def test_limit_grows_on_success_and_halves_on_rate_limit():
+    bulkhead = Bulkhead("test-aimd", limit=4, max_limit=10, retry_delay=0)
+    attempts = []
+
+    async def ok():
+        return "ok"
+
+    for _ in range(8):
+        await bulkhead.call(ok)
+    assert bulkhead.current_limit == 5
+
+    async def throttled_once():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise rate_limited()
+        return "ok"
+
+    assert await bulkhead.call(throttled_once) == "ok"
+    assert len(attempts) == 2
+    # ~5.6 halved to ~2.8, then the successful retry adds 1/limit back
+    assert bulkhead.current_limit == 3
+    assert bulkhead.snapshot()["rate_limited"] == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_calls_shrink_the_limit():
+    bulkhead = Bulkhead("test-latency", limit=8, latency_target=0.001)
+
+    await bulkhead.call(asyncio.sleep, 0.01)
+
+    assert bulkhead.current_limit == 4
+
+
+@pytest.mark.asyncio
+async def test_unmeasured_slots_leave_the_limit_alone():
+    bulkhead = Bulkhead("test-unmeasured", limit=4, max_limit=10, latency_target=0.001)
+
+    for _ in range(8):
+        async with bulkhead.slot(measure_latency=False):
+            await asyncio.sleep(0.002)
+    with pytest.raises(httpx.HTTPStatusError):
+        async with bulkhead.slot(measure_latency=False):
+            raise rate_limited()
+
+    assert bulkhead.limit == 4
+    assert bulkhead.snapshot()["rate_limited"] == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_is_raised_after_retries():
+    bulkhead = Bulkhead("test-retries", retries=1, retry_delay=0)
+
+    async def always_throttled():
+        raise rate_limited()
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await bulkhead.call(always_throttled)
+    assert bulkhead.snapshot()["rate_limited"] == 2
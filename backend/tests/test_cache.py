@@ -0,0 +1,67 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from app.utils.cache import SingleFlight, TTLCache
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(maxsize=10, ttl=5)
+    with patch("app.utils.cache.time.monotonic", return_value=100.0):
+        cache.set("a", 1)
+    with patch("app.utils.cache.time.monotonic", return_value=104.0):
+        assert cache.get("a") == 1
+    with patch("app.utils.cache.time.monotonic", return_value=106.0):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_one_call_per_key():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return key.upper()
+
+    results = await asyncio.gather(*(flight.do(key, lambda key=key: compute(key)) for key in ["a", "a", "b", "a"]))
+
+    assert results == ["A", "A", "B", "A"]
+    assert calls == ["a", "b"]
+    assert len(flight) == 0
+    # Done calls are forgotten: the next one computes again
+    assert await flight.do("a", lambda: compute("a")) == "A"
+    assert calls == ["a", "b", "a"]
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_failures_and_survives_cancelled_callers():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def broken():
+        await release.wait()
+        raise RuntimeError("generation failed")
+
+    first = asyncio.create_task(flight.do("k", broken))
+    second = asyncio.create_task(flight.do("k", broken))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    with pytest.raises(RuntimeError):
+        await second
+    assert first.cancelled()
+    assert len(flight) == 0
@@ -0,0 +1,67 @@
+import asyncio
+import httpx
+import pytest
+from unittest.mock import patch
+from app.utils import http_client
+from app.utils.feedback import generate_feedback_batch
+from app.utils.feedback_batcher import FeedbackBatcher
+from tests.fake_llm import FakeLLM
+
+
+class RecordingScorer:
+    def __init__(self):
+        self.batches = []
+
+    async def __call__(self, transcripts):
+        self.batches.append(list(transcripts))
+        return [{"Clarity": transcript.upper()} for transcript in transcripts]
+
+
+@pytest.mark.asyncio
+async def test_batcher_groups_submissions_within_window():
+    scorer = RecordingScorer()
+    batcher = FeedbackBatcher(scorer, max_batch_size=10, max_wait=0.01)
+
+    results = await asyncio.gather(*(batcher.submit(t) for t in ["a", "b", "c", "a"]))
+
+    assert results == [{"Clarity": "A"}, {"Clarity": "B"}, {"Clarity": "C"}, {"Clarity": "A"}]
+    assert scorer.batches == [["a", "b", "c"]]
+
+
+@pytest.mark.asyncio
+async def test_batcher_flushes_when_batch_is_full():
+    scorer = RecordingScorer()
+    batcher = FeedbackBatcher(scorer, max_batch_size=2, max_wait=60)
+
+    results = await asyncio.wait_for(asyncio.gather(batcher.submit("a"), batcher.submit("b")), timeout=1)
+
+    assert results == [{"Clarity": "A"}, {"Clarity": "B"}]
+    assert scorer.batches == [["a", "b"]]
+
+
+@pytest.mark.asyncio
+async def test_batcher_fails_every_caller_when_scoring_fails():
+    async def broken(transcripts):
+        raise RuntimeError("model unavailable")
+
+    batcher = FeedbackBatcher(broken, max_wait=0.001)
+    results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_batch_is_scored_with_one_request_to_the_llm():
+    fake_llm = FakeLLM()
+    with patch.object(http_client, "TRANSPORT", httpx.MockTransport(fake_llm.handle)), \
+            patch.object(http_client, "_client", None):
+        batcher = FeedbackBatcher(generate_feedback_batch, max_batch_size=10, max_wait=0.01)
+        try:
+            results = await asyncio.gather(*(batcher.submit(f"answer {i}") for i in range(5)))
+        finally:
+            await http_client.close_client()
+
+    assert results == [fake_llm.feedback_for(f"answer {i}") for i in range(5)]
+    assert len(fake_llm.requests) == 1
+    # The shared rubric is sent once as the system message
+    assert [m["role"] for m in fake_llm.requests[0]["messages"]] == ["system", "user"]
@@ -0,0 +1,62 @@
+import json
+import uuid
+import httpx
+import pytest
+from unittest.mock import patch
+from app.models.models import FeedbackCache
+from app.utils import http_client
+from app.utils.feedback_stream import FeedbackSectionParser, FeedbackBroadcast, stream_feedback, feedback_broadcast
+from tests.fake_llm import FakeLLM
+
+
+def feed_in_pieces(text, size):
+    parser = FeedbackSectionParser()
+    sections = []
+    for i in range(0, len(text), size):
+        sections.extend(parser.feed(text[i:i + size]))
+    return sections
+
+
+@pytest.mark.parametrize("size", [1, 3, 1000])
+def test_parser_emits_each_section_once_complete(size):
+    feedback = {"Clarity": 'Said "fine", then {braces}', "Structure": ["a", {"b": 1}], "Tone": 3, "Language": None}
+    assert feed_in_pieces(json.dumps(feedback), size) == list(feedback.items())
+
+
+def test_parser_waits_for_the_closing_quote():
+    parser = FeedbackSectionParser()
+    assert parser.feed('{"Clarity": "Vague and ') == []
+    assert parser.feed('rambling", "Tone"') == [("Clarity", "Vague and rambling")]
+
+
+def test_broadcast_only_reaches_subscribers_of_the_recording():
+    broadcast = FeedbackBroadcast()
+    queue = broadcast.subscribe("a")
+    broadcast.publish("a", "section", {"section": "Tone"})
+    broadcast.publish("b", "section", {"section": "Clarity"})
+    broadcast.unsubscribe("a", queue)
+
+    assert queue.get_nowait() == ("section", {"section": "Tone"})
+    assert queue.empty()
+    assert not broadcast.has_subscribers("a")
+
+
+@pytest.mark.asyncio
+async def test_stream_feedback_publishes_sections_and_caches_result(db):
+    fake_llm = FakeLLM()
+    recording_id = uuid.uuid4()
+    queue = feedback_broadcast.subscribe(recording_id)
+    with patch.object(http_client, "TRANSPORT", httpx.MockTransport(fake_llm.handle)), \
+            patch.object(http_client, "_client", None):
+        try:
+            feedback = await stream_feedback(db, recording_id, "My answer")
+        finally:
+            feedback_broadcast.unsubscribe(recording_id, queue)
+            await http_client.close_client()
+
+    expected = fake_llm.feedback_for("My answer")
+    assert feedback == expected
+    events = [queue.get_nowait() for _ in range(queue.qsize())]
+    assert events == [("section", {"section": key, "content": value}) for key, value in expected.items()]
+    assert fake_llm.requests[0]["stream"] is True
+    assert db.query(FeedbackCache).count() == 1
@@ -0,0 +1,42 @@
+import httpx
+import pytest
+from unittest.mock import patch
+from app.utils import http_client
+
+
+@pytest.mark.asyncio
+async def test_shared_client_is_reused_and_counts_requests():
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"ok": True}))
+    with patch.object(http_client, "TRANSPORT", transport), \
+            patch.dict(http_client.metrics, {"requests": 0, "connections_opened": 0}):
+        client = http_client.start_client()
+        try:
+            assert http_client.get_client() is client
+            await client.get("https://provider.test/a")
+            await http_client.get_client().get("https://provider.test/b")
+            assert http_client.pool_stats()["requests"] == 2
+        finally:
+            await http_client.close_client()
+        assert client.is_closed
+
+
+def test_client_uses_configured_limits():
+    with patch.object(http_client, "_client", None), \
+            patch.object(http_client, "HTTP_MAX_CONNECTIONS", 7), \
+            patch.object(http_client, "HTTP_MAX_KEEPALIVE_CONNECTIONS", 3):
+        client = http_client.start_client()
+    pool = client._transport._pool
+    assert pool._max_connections == 7
+    assert pool._max_keepalive_connections == 3
+
+
+def test_metrics_endpoint_reports_pool_stats(client):
+    response = client.get("/metrics/")
+    assert response.status_code == 200
+    assert {"requests", "connections_opened", "open_connections", "idle_connections"} <= response.json()["http_pool"].keys()
+
+
+def test_metrics_endpoint_reports_provider_bulkheads(client):
+    bulkheads = client.get("/metrics/").json()["bulkheads"]
+    assert {"assemblyai", "openai"} <= bulkheads.keys()
+    assert {"limit", "in_flight", "queue_depth", "rejected", "avg_wait_seconds"} <= bulkheads["openai"].keys()
@@ -1,15 +1,49 @@
 import pytest
 import os
+import uuid
+import shutil
+import asyncio
+import hashlib
+import json
+import wave
+import httpx
 from unittest.mock import patch, MagicMock
 from fastapi import UploadFile
-from app.models.models import Recording, Question
+from app.models.models import Recording, Question, TranscriptCache, FeedbackCache
+from app.models.user import User
+from app.utils.feedback import feedback_cache
+from app.utils.transcription import TRANSCRIPT_ENDPOINT, assemblyai
 from datetime import datetime, timezone
+from app.utils.transcript_poller import poller
+from app.utils import ingest, pipeline
+from app.utils.storage import storage_key
+from sqlalchemy.orm import sessionmaker
+from app.utils.streaming_transcription import get_streaming_transcriber
+from app.main import app
+from tests.fake_streaming_transcriber import FakeStreamingTranscriber
+from tests.audio_fixtures import write_wav, answer_with_pauses
+import time
+
+
+def parse_sse(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
 
 @pytest.fixture(autouse=True)
 def mock_env_vars():
     with patch.dict(os.environ, {"ASSEMBLYAI_API_KEY": "test_api_key"}):
         yield
 
+@pytest.fixture(autouse=True)
+def fast_polling():
+    with patch.object(poller, "min_interval", 0.0):
+        yield
+
 @pytest.fixture
 def test_question(db):
     question = Question(text="Test question", category="technical")
@@ -23,30 +57,9 @@ def test_get_recordings_empty(client):
     assert response.status_code == 200
     assert response.json() == []
 
-@patch('httpx.post')
-@patch('httpx.get')
-def test_create_recording(mock_get, mock_post, client, db, test_question, tmp_path):
+def test_create_recording(client, db, test_question, tmp_path, fake_assemblyai, fake_llm):
     question_id = test_question.id
     
-
-    mock_upload_response = MagicMock()
-    mock_upload_response.json.return_value = {"upload_url": "https://example.com/upload"}
-    mock_upload_response.raise_for_status = MagicMock()
-    
-    mock_transcript_response = MagicMock()
-    mock_transcript_response.json.return_value = {"id": "test_transcript_id"}
-    mock_transcript_response.raise_for_status = MagicMock()
-    
-    mock_polling_response = MagicMock()
-    mock_polling_response.json.return_value = {
-        "status": "completed",
-        "text": "Test transcript"
-    }
-    mock_polling_response.raise_for_status = MagicMock()
-    
-    mock_post.side_effect = [mock_upload_response, mock_transcript_response]
-    mock_get.return_value = mock_polling_response
-
     audio_content = b"fake audio content"
     audio_file = tmp_path / "test_audio.wav"
     audio_file.write_bytes(audio_content)
@@ -58,21 +71,222 @@ def test_create_recording(mock_get, mock_post, client, db, test_question, tmp_pa
         'question_id': question_id  
     }
     
+    fake_assemblyai.auto_complete_text = "Test transcript"
     response = client.post("/recordings/", files=files, data=data)
-    assert response.status_code == 200
+    assert response.status_code == 202
     data = response.json()
     assert data["question_id"] == question_id
+    assert data["status"] == "queued"
+    assert data["transcript"] is None
     assert "recording_url" in data
-    assert data["transcript"] == "Test transcript"
-    assert "feedback_json" in data
     assert "created_at" in data
     assert "updated_at" in data
 
-def test_get_recordings_with_data(client, db, test_question):
+    status_response = client.get(f"/recordings/{data['id']}/status")
+    assert status_response.status_code == 200
+    assert status_response.json()["status"] == "done"
+
+    recording = client.get(f"/recordings/{data['id']}").json()
+    assert recording["transcript"] == "Test transcript"
+    assert recording["feedback_json"] == fake_llm.feedback_for("Test transcript")
+    assert list(fake_assemblyai.uploads.values()) == [audio_content]
+    assert len(fake_llm.requests) == 1
+
+def test_create_recording_marks_failure(client, db, test_question, tmp_path, fake_assemblyai):
+    fake_assemblyai.upload_status = 503
+
+    audio_file = tmp_path / "test_audio.wav"
+    audio_file.write_bytes(b"fake audio content")
+    files = {'file': ('test_audio.wav', open(audio_file, 'rb'), 'audio/wav')}
+
+    response = client.post("/recordings/", files=files, data={'question_id': test_question.id})
+    assert response.status_code == 202
+
+    status_response = client.get(f"/recordings/{response.json()['id']}/status")
+    assert status_response.json()["status"] == "failed"
+    assert "503" in status_response.json()["error"]
+
+def test_recording_completes_when_circuit_opens_while_polling(client, test_question, tmp_path, fake_assemblyai, fake_llm):
+    # Enough failed polls to open the circuit; later polls fail fast until it half-opens
+    fake_assemblyai.transcript_errors = [503] * assemblyai.breaker.failure_threshold
+    fake_assemblyai.auto_complete_text = "Recovered transcript"
+    opened = assemblyai.breaker.stats["opened"]
+
+    audio_file = tmp_path / "test_audio.wav"
+    audio_file.write_bytes(b"fake audio content")
+    files = {'file': ('test_audio.wav', open(audio_file, 'rb'), 'audio/wav')}
+    with patch.object(assemblyai.breaker, "reset_timeout", 0.05), patch.object(poller, "max_interval", 0.02):
+        response = client.post("/recordings/", files=files, data={'question_id': test_question.id})
+    assert response.status_code == 202
+
+    recording = client.get(f"/recordings/{response.json()['id']}").json()
+    assert recording["status"] == "done"
+    assert recording["transcript"] == "Recovered transcript"
+    assert assemblyai.breaker.stats["opened"] == opened + 1
+    assert assemblyai.breaker.state == "closed"
+
+def test_stream_recording_forwards_body_and_records_checksum(client, db, test_question, fake_assemblyai, storage):
+    audio_content = b"RIFF" + bytes(range(256)) * 1000
+    fake_assemblyai.auto_complete_text = "Streamed transcript"
+
+    response = client.post(
+        "/recordings/stream",
+        params={"question_id": test_question.id, "filename": "answer.wav"},
+        content=audio_content,
+    )
+    assert response.status_code == 202
+    data = response.json()
+    assert data["audio_sha256"] == hashlib.sha256(audio_content).hexdigest()
+    sha = data["audio_sha256"]
+    # recording_url is a storage key, sharded by the content hash
+    assert data["recording_url"] == f"{sha[:2]}/{sha[2:4]}/{sha}.wav"
+
+    recording = client.get(f"/recordings/{data['id']}").json()
+    assert recording["status"] == "done"
+    assert recording["transcript"] == "Streamed transcript"
+    # The audio reached the provider once, from the streaming upload
+    assert list(fake_assemblyai.uploads.values()) == [audio_content]
+    with open(storage.path(data["recording_url"]), "rb") as f:
+        assert f.read() == audio_content
+    assert os.listdir(os.path.join(storage.root, ".incoming")) == []
+
+def test_stream_recording_rejects_oversized_upload(client, test_question, fake_assemblyai):
+    with patch('app.routers.recording.MAX_UPLOAD_BYTES', 10), patch('app.utils.ingest.MAX_UPLOAD_BYTES', 10):
+        response = client.post("/recordings/stream", params={"question_id": test_question.id}, content=b"x" * 11)
+        assert response.status_code == 413
+        files = {'file': ('big.wav', b"x" * 11, 'audio/wav')}
+        response = client.post("/recordings/", files=files, data={'question_id': test_question.id})
+        assert response.status_code == 413
+    assert fake_assemblyai.uploads == {}
+    assert client.get("/recordings/").json() == []
+
+@pytest.mark.asyncio
+async def test_ingest_stops_forwarding_when_provider_falls_behind(storage):
+    async def stalled_upload(chunks):
+        await asyncio.Event().wait()
+
+    async def chunks():
+        for i in range(5):
+            yield bytes([i]) * 10
+
+    with patch.object(ingest, "upload_stream", stalled_upload), patch.object(ingest, "FORWARD_QUEUE_CHUNKS", 2):
+        audio = await ingest.ingest_audio(chunks(), storage, ".wav")
+
+    # Stored as with forward=False; the pipeline uploads it from storage
+    assert audio.provider_upload is None
+    assert audio.size == 50
+    assert os.path.getsize(storage.path(audio.key)) == 50
+
+def test_resubmitted_audio_uses_transcript_cache(client, db, test_question, tmp_path, fake_assemblyai):
+    question_id = test_question.id
+    fake_assemblyai.auto_complete_text = "Cached transcript"
+    first = upload_recording(client, question_id, tmp_path)
+    requests_after_first = len(fake_assemblyai.requests)
+
+    second = upload_recording(client, question_id, tmp_path)
+    recording = client.get(f"/recordings/{second['id']}").json()
+    assert recording["status"] == "done"
+    assert recording["transcript"] == "Cached transcript"
+    assert second["recording_url"] == first["recording_url"]
+    # Only the streaming upload may have started; no transcript was requested
+    new_requests = fake_assemblyai.requests[requests_after_first:]
+    assert all(r.url != TRANSCRIPT_ENDPOINT for r in new_requests)
+    assert len(fake_assemblyai.transcripts) == 1
+    assert db.get(TranscriptCache, first["audio_sha256"]).transcript == "Cached transcript"
+
+def test_concurrent_identical_audio_shares_transcript_job(client, db, test_question, tmp_path, fake_assemblyai):
+    question_id = test_question.id
+    with patch('app.utils.transcription.TRANSCRIPTION_WEBHOOK_URL', "http://testserver/recordings/transcription-callback"), \
+            patch('app.utils.pipeline.WEBHOOK_FALLBACK_SECONDS', 0):
+        first = upload_recording(client, question_id, tmp_path)
+        second = upload_recording(client, question_id, tmp_path)
+        assert len(fake_assemblyai.transcripts) == 1
+
+        transcript_id = next(iter(fake_assemblyai.transcripts))
+        fake_assemblyai.complete(transcript_id, "Shared transcript")
+        fake_assemblyai.fire_callbacks(client)
+
+    for recording in (first, second):
+        recording = client.get(f"/recordings/{recording['id']}").json()
+        assert recording["status"] == "done"
+        assert recording["transcript"] == "Shared transcript"
+
+def test_identical_transcripts_reuse_cached_feedback(client, db, test_question, fake_assemblyai, fake_llm):
+    question_id = test_question.id
+    fake_assemblyai.auto_complete_text = "Same  answer"
+    first = client.post("/recordings/stream", params={"question_id": question_id}, content=b"first take").json()
+    fake_assemblyai.auto_complete_text = "Same answer "
+    # Drop the in-process tier so the second lookup has to hit the database
+    feedback_cache.clear()
+    second = client.post("/recordings/stream", params={"question_id": question_id}, content=b"second take").json()
+
+    assert len(fake_llm.requests) == 1
+    for recording in (first, second):
+        recording = client.get(f"/recordings/{recording['id']}").json()
+        assert recording["feedback_json"] == fake_llm.feedback_for("Same  answer")
+    assert db.query(FeedbackCache).count() == 1
+
+def test_get_recording_status_not_found(client):
+    response = client.get("/recordings/00000000-0000-0000-0000-000000000000/status")
+    assert response.status_code == 404
+
+def upload_recording(client, question_id, tmp_path):
+    audio_file = tmp_path / "test_audio.wav"
+    audio_file.write_bytes(b"fake audio content")
+    files = {'file': ('test_audio.wav', open(audio_file, 'rb'), 'audio/wav')}
+    response = client.post("/recordings/", files=files, data={'question_id': question_id})
+    assert response.status_code == 202
+    return response.json()
+
+def test_create_recording_with_transcription_webhook(client, db, test_question, tmp_path, fake_assemblyai, fake_llm):
+    with patch('app.utils.transcription.TRANSCRIPTION_WEBHOOK_URL', "http://testserver/recordings/transcription-callback"), \
+            patch('app.utils.transcription.TRANSCRIPTION_WEBHOOK_SECRET', "hook-secret"), \
+            patch('app.utils.pipeline.WEBHOOK_FALLBACK_SECONDS', 0):
+        recording = upload_recording(client, test_question.id, tmp_path)
+
+        status = client.get(f"/recordings/{recording['id']}/status").json()
+        assert status["status"] == "transcribing"
+        # Webhook mode never polls the transcript before the callback
+        assert [r.method for r in fake_assemblyai.requests] == ["POST", "POST"]
+
+        transcript_id = next(iter(fake_assemblyai.transcripts))
+        assert fake_assemblyai.transcripts[transcript_id]["webhook_url"].endswith("/recordings/transcription-callback")
+        fake_assemblyai.complete(transcript_id, "Webhook transcript")
+        responses = fake_assemblyai.fire_callbacks(client)
+        assert [r.status_code for r in responses] == [200]
+
+    recording = client.get(f"/recordings/{recording['id']}").json()
+    assert recording["status"] == "done"
+    assert recording["transcript"] == "Webhook transcript"
+    assert recording["feedback_json"] == fake_llm.feedback_for("Webhook transcript")
+
+def test_transcription_webhook_failure_marks_recording_failed(client, db, test_question, tmp_path, fake_assemblyai):
+    with patch('app.utils.transcription.TRANSCRIPTION_WEBHOOK_URL', "http://testserver/recordings/transcription-callback"), \
+            patch('app.utils.pipeline.WEBHOOK_FALLBACK_SECONDS', 0):
+        recording = upload_recording(client, test_question.id, tmp_path)
+        transcript_id = next(iter(fake_assemblyai.transcripts))
+        fake_assemblyai.fail(transcript_id, "audio too short")
+        fake_assemblyai.fire_callbacks(client)
+
+    status = client.get(f"/recordings/{recording['id']}/status").json()
+    assert status["status"] == "failed"
+    assert "audio too short" in status["error"]
+
+def test_transcription_callback_rejects_bad_secret(client):
+    with patch('app.utils.transcription.TRANSCRIPTION_WEBHOOK_SECRET', "hook-secret"):
+        response = client.post(
+            "/recordings/transcription-callback",
+            json={"transcript_id": "whatever", "status": "completed"},
+            headers={"x-transcription-webhook-secret": "wrong"},
+        )
+    assert response.status_code == 401
+
+def test_get_recordings_with_data(client, db, test_question, test_user):
     question_id = test_question.id
     
     recording = Recording(
         question_id=question_id,
+        user_id=test_user.id,
         recording_url="test_url.wav",
         transcript="Test transcript",
         feedback_json={"score": 8.5},
@@ -90,4 +304,241 @@ def test_get_recordings_with_data(client, db, test_question):
     assert data[0]["question_id"] == question_id
     assert data[0]["recording_url"] == recording.recording_url
     assert data[0]["transcript"] == recording.transcript
-    assert data[0]["feedback_json"] == recording.feedback_json 
\ No newline at end of file
+    assert data[0]["feedback_json"] == recording.feedback_json 
+def test_audio_supports_ranges_and_conditional_get(client, test_question, fake_assemblyai):
+    fake_assemblyai.auto_complete_text = "Playback"
+    audio_content = bytes(range(256)) * 40
+    recording = client.post("/recordings/stream", params={"question_id": test_question.id, "filename": "answer.webm"}, content=audio_content).json()
+    url = f"/recordings/{recording['id']}/audio"
+
+    full = client.get(url)
+    assert full.status_code == 200
+    assert full.content == audio_content
+    assert full.headers["content-type"] == "audio/webm"
+    assert full.headers["accept-ranges"] == "bytes"
+
+    # Seeking fetches only the requested bytes
+    seek = client.get(url, headers={"Range": "bytes=1000-1999"})
+    assert seek.status_code == 206
+    assert seek.content == audio_content[1000:2000]
+    assert seek.headers["content-range"] == f"bytes 1000-1999/{len(audio_content)}"
+
+    assert client.get(url, headers={"If-None-Match": full.headers["etag"]}).status_code == 304
+    assert client.get(url, headers={"If-Modified-Since": full.headers["last-modified"]}).status_code == 304
+    assert client.get(url, headers={"If-None-Match": '"stale"'}).status_code == 200
+    head = client.head(url)
+    assert head.status_code == 200 and head.content == b""
+    assert head.headers["content-length"] == str(len(audio_content))
+
+def test_audio_of_another_users_recording_is_not_found(client, db, test_question):
+    other = User(email="other@example.com", username="other", hashed_password="x", is_active=True, is_superuser=False, is_verified=True)
+    db.add(other)
+    db.commit()
+    now = datetime.now(timezone.utc)
+    recording = Recording(question_id=test_question.id, user_id=other.id, recording_url="ab/cd/abcd.wav", created_at=now, updated_at=now)
+    db.add(recording)
+    db.commit()
+
+    assert client.get(f"/recordings/{recording.id}/audio").status_code == 404
+
+def test_audio_is_handed_to_nginx_when_configured(client, test_question, fake_assemblyai):
+    fake_assemblyai.auto_complete_text = "Playback"
+    recording = client.post("/recordings/stream", params={"question_id": test_question.id, "filename": "answer.webm"}, content=b"audio").json()
+    with patch("app.routers.recording.AUDIO_ACCEL_REDIRECT_PREFIX", "/protected-audio/"):
+        response = client.get(f"/recordings/{recording['id']}/audio")
+    assert response.headers["x-accel-redirect"] == "/protected-audio/" + recording["recording_url"]
+    assert response.content == b""
+
+def test_audio_in_s3_redirects_to_presigned_url(client, test_question, fake_assemblyai, s3_storage):
+    fake_assemblyai.auto_complete_text = "Playback"
+    recording = client.post("/recordings/stream", params={"question_id": test_question.id, "filename": "answer.webm"}, content=b"audio").json()
+    response = client.get(f"/recordings/{recording['id']}/audio", follow_redirects=False)
+    assert response.status_code == 307
+    location = httpx.URL(response.headers["location"])
+    assert location.path == f"/recordings/{recording['recording_url']}"
+    assert "X-Amz-Signature" in location.params
+
+def test_feedback_stream_replays_finished_feedback(client, db, test_question, fake_assemblyai, fake_llm):
+    fake_assemblyai.auto_complete_text = "Streamed answer"
+    recording = client.post("/recordings/stream", params={"question_id": test_question.id}, content=b"audio").json()
+
+    response = client.get(f"/recordings/{recording['id']}/feedback/stream")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    feedback = fake_llm.feedback_for("Streamed answer")
+    events = parse_sse(response.text)
+    assert events[:-1] == [("section", {"section": key, "content": value}) for key, value in feedback.items()]
+    assert events[-1] == ("done", feedback)
+
+def test_feedback_stream_reports_failed_recording(client, db, test_question, fake_assemblyai):
+    fake_assemblyai.upload_status = 500
+    recording = client.post("/recordings/stream", params={"question_id": test_question.id}, content=b"audio").json()
+
+    events = parse_sse(client.get(f"/recordings/{recording['id']}/feedback/stream").text)
+    assert [event for event, _ in events] == ["error"]
+
+@pytest.fixture
+def streaming_transcriber():
+    transcriber = FakeStreamingTranscriber()
+    app.dependency_overrides[get_streaming_transcriber] = lambda: transcriber
+    yield transcriber
+    app.dependency_overrides.pop(get_streaming_transcriber, None)
+
+def receive_until_done(websocket):
+    messages = []
+    while not messages or messages[-1]["event"] not in ("done", "error"):
+        messages.append(websocket.receive_json())
+    return messages
+
+def test_live_recording_streams_partials_and_scores_on_end(client, db, test_question, fake_assemblyai, fake_llm, streaming_transcriber, storage):
+    with client.websocket_connect(f"/recordings/live?question_id={test_question.id}") as websocket:
+        websocket.send_bytes(b"I led ")
+        assert websocket.receive_json() == {"event": "partial", "data": {"text": "I led"}}
+        websocket.send_bytes(b"the migration")
+        assert websocket.receive_json() == {"event": "partial", "data": {"text": "I led the migration"}}
+        websocket.send_json({"type": "end"})
+        messages = receive_until_done(websocket)
+
+    recording = messages[0]
+    assert recording["event"] == "recording"
+    with open(storage.path(recording["data"]["recording_url"]), "rb") as f:
+        assert f.read() == b"I led the migration"
+    feedback = fake_llm.feedback_for("I led the migration")
+    assert [m["data"]["section"] for m in messages[1:-1]] == list(feedback)
+    assert messages[-1] == {"event": "done", "data": feedback}
+    # The streamed transcript is used as is; nothing goes to the batch provider
+    assert fake_assemblyai.requests == []
+    assert streaming_transcriber.sessions[0].closed
+
+    stored = client.get(f"/recordings/{recording['data']['id']}").json()
+    assert stored["transcript"] == "I led the migration"
+    assert stored["status"] == "done"
+
+def test_live_recording_without_streaming_backend_uses_pipeline(client, db, test_question, fake_assemblyai, fake_llm):
+    fake_assemblyai.auto_complete_text = "Batch transcript"
+    with client.websocket_connect(f"/recordings/live?question_id={test_question.id}") as websocket:
+        websocket.send_bytes(b"chunk one ")
+        websocket.send_bytes(b"chunk two")
+        websocket.send_json({"type": "end"})
+        messages = receive_until_done(websocket)
+
+    assert messages[-1] == {"event": "done", "data": fake_llm.feedback_for("Batch transcript")}
+    assert list(fake_assemblyai.uploads.values()) == [b"chunk one chunk two"]
+
+def test_live_recording_is_processed_when_socket_closes(client, db, test_question, fake_assemblyai, fake_llm, streaming_transcriber):
+    streaming_transcriber.finish_error = "stream dropped"
+    fake_assemblyai.auto_complete_text = "Recovered transcript"
+    with client.websocket_connect(f"/recordings/live?question_id={test_question.id}") as websocket:
+        websocket.send_bytes(b"partial answer")
+        websocket.receive_json()
+
+    deadline = time.monotonic() + 5
+    recordings = []
+    while time.monotonic() < deadline:
+        recordings = client.get("/recordings/").json()
+        if recordings and recordings[0]["status"] == "done":
+            break
+        time.sleep(0.01)
+    # The failed stream falls back to uploading the stored audio
+    assert recordings[0]["status"] == "done"
+    assert recordings[0]["transcript"] == "Recovered transcript"
+    assert list(fake_assemblyai.uploads.values()) == [b"partial answer"]
+
+@pytest.mark.parametrize("bulkhead", ["assemblyai_bulkhead", "assemblyai_upload_bulkhead"])
+def test_upload_is_rejected_with_503_when_transcription_is_saturated(client, test_question, bulkhead):
+    with patch(f'app.utils.transcription.{bulkhead}.is_full', return_value=True):
+        response = client.post("/recordings/stream", params={"question_id": test_question.id}, content=b"audio")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "5"
+
+def test_wav_upload_is_normalized_before_transcription(client, db, test_question, tmp_path, fake_assemblyai, fake_llm, storage):
+    fake_assemblyai.auto_complete_text = "Normalized"
+    source = write_wav(tmp_path / "stereo.wav", seconds=0.5)
+    with open(source, "rb") as f:
+        response = client.post("/recordings/", files={"file": ("stereo.wav", f, "audio/wav")}, data={"question_id": test_question.id})
+
+    recording = client.get(f"/recordings/{response.json()['id']}").json()
+    assert recording["status"] == "done"
+    # Read from the WAV header at ingest, before normalization
+    assert recording["duration_seconds"] == pytest.approx(0.5)
+    # Opus when the workers have ffmpeg, 16 kHz WAV otherwise
+    assert "-16k." in recording["recording_url"]
+    assert os.path.dirname(recording["recording_url"]) == os.path.dirname(response.json()["recording_url"])
+    assert not os.path.exists(storage.path(response.json()["recording_url"]))
+    with open(storage.path(recording["recording_url"]), "rb") as f:
+        normalized = f.read()
+    assert list(fake_assemblyai.uploads.values()) == [normalized]
+    assert len(normalized) < os.path.getsize(source) / 5
+
+def test_normalized_upload_records_kept_segments(client, db, test_question, tmp_path, fake_assemblyai):
+    fake_assemblyai.auto_complete_text = "Trimmed"
+    source = tmp_path / "pauses.wav"
+    with wave.open(str(source), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(16000)
+        f.writeframes((answer_with_pauses() * 32767).astype("<i2").tobytes())
+    with open(source, "rb") as f:
+        response = client.post("/recordings/", files={"file": ("pauses.wav", f, "audio/wav")}, data={"question_id": test_question.id})
+
+    recording = client.get(f"/recordings/{response.json()['id']}").json()
+    assert recording["status"] == "done"
+    assert len(recording["audio_segments"]) == 2
+    assert recording["audio_segments"][0][0] == pytest.approx(1.75, abs=0.06)
+
+@pytest.mark.asyncio
+async def test_identical_uploads_are_normalized_once(db, test_user, test_question, tmp_path, storage):
+    source = write_wav(tmp_path / "answer.wav", seconds=0.5)
+    with open(source, "rb") as f:
+        sha256 = hashlib.sha256(f.read()).hexdigest()
+    original = storage_key(sha256, ".wav")
+    await storage.commit(shutil.copy(source, storage.incoming_path()), original)
+
+    def add(session):
+        now = datetime.now(timezone.utc)
+        recording = Recording(id=uuid.uuid4(), question_id=test_question.id, user_id=test_user.id, recording_url=original,
+                              audio_sha256=sha256, created_at=now, updated_at=now, status="uploading")
+        session.add(recording)
+        session.commit()
+        return recording
+
+    sessions = [sessionmaker(bind=db.get_bind())() for _ in range(2)]
+    recordings = [add(session) for session in sessions]
+    with patch.object(pipeline, "normalize_audio", wraps=pipeline.normalize_audio) as normalize:
+        await asyncio.gather(*(pipeline.normalize_recording(session, recording) for session, recording in zip(sessions, recordings)))
+
+    assert normalize.call_count == 1
+    normalized = recordings[0].recording_url
+    assert "-16k." in normalized and recordings[1].recording_url == normalized
+    assert os.path.exists(storage.path(normalized))
+    assert not os.path.exists(storage.path(original))
+    assert os.listdir(storage.spool_dir) == []
+
+    # An identical upload stored before the original was removed reuses the re-encode
+    late = add(db)
+    await pipeline.normalize_recording(db, late)
+    assert late.recording_url == normalized
+    for session in sessions:
+        session.close()
+
+def test_recordings_are_stored_in_s3(client, test_question, fake_assemblyai, fake_s3, s3_storage):
+    fake_assemblyai.auto_complete_text = "Stored remotely"
+    response = client.post("/recordings/stream", params={"question_id": test_question.id, "filename": "answer.webm"}, content=b"webm audio")
+    key = response.json()["recording_url"]
+
+    assert client.get(f"/recordings/{response.json()['id']}").json()["status"] == "done"
+    assert fake_s3.objects == {f"recordings/{key}": b"webm audio"}
+    assert os.listdir(s3_storage.spool_dir) == []
+
+def test_s3_recordings_are_normalized_through_a_local_copy(client, test_question, tmp_path, fake_assemblyai, fake_s3, s3_storage):
+    fake_assemblyai.auto_complete_text = "Normalized remotely"
+    with open(write_wav(tmp_path / "answer.wav", seconds=0.5), "rb") as f:
+        response = client.post("/recordings/", files={"file": ("answer.wav", f, "audio/wav")}, data={"question_id": test_question.id})
+
+    recording = client.get(f"/recordings/{response.json()['id']}").json()
+    assert recording["status"] == "done"
+    # The original object was replaced by the normalized one, which is what the provider got
+    assert list(fake_s3.objects) == [f"recordings/{recording['recording_url']}"]
+    assert list(fake_assemblyai.uploads.values()) == list(fake_s3.objects.values())
+    assert os.listdir(s3_storage.spool_dir) == []
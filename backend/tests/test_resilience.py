@@ -0,0 +1,164 @@
+import asyncio
+from datetime import datetime, timezone
+import httpx
+import pytest
+from unittest.mock import patch
+from app.models.models import FeedbackCache
+from app.utils import http_client
+from app.utils.bulkhead import Bulkhead
+from app.utils.feedback import get_feedback, feedback_key, openai_provider
+from app.utils.resilience import ResilientProvider, CircuitBreaker, CircuitOpen, DeadlineExceeded
+from app.utils.transcription import get_transcript, upload_stream, assemblyai, assemblyai_bulkhead, assemblyai_upload_bulkhead
+from app.utils.transcript_poller import TranscriptPoller
+from tests.fake_latency import sequence
+
+
+def provider(name, **kwargs):
+    return ResilientProvider(name, Bulkhead(name), **kwargs)
+
+
+def server_error():
+    request = httpx.Request("GET", "https://provider.test/")
+    return httpx.HTTPStatusError("boom", request=request, response=httpx.Response(503, request=request))
+
+
+def test_breaker_opens_after_consecutive_failures_and_recovers():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    # reset_timeout=0 goes straight to half open: one trial call is let through
+    assert breaker.state == "half_open"
+    breaker.before_call()
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast():
+    guarded = provider("test-breaker", failure_threshold=2, reset_timeout=60)
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        raise server_error()
+
+    for _ in range(2):
+        with pytest.raises(httpx.HTTPStatusError):
+            await guarded.call(failing)
+    with pytest.raises(CircuitOpen):
+        await guarded.call(failing)
+    assert len(calls) == 2
+    assert guarded.snapshot()["circuit"] == "open"
+
+
+@pytest.mark.asyncio
+async def test_client_errors_do_not_open_the_circuit():
+    guarded = provider("test-client-errors", failure_threshold=1)
+
+    async def bad_request():
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError):
+        await guarded.call(bad_request)
+    assert guarded.breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_deadline_cancels_stuck_calls():
+    guarded = provider("test-deadline", deadline=0.01)
+
+    with pytest.raises(DeadlineExceeded):
+        await guarded.call(asyncio.sleep, 10)
+    assert guarded.snapshot()["deadline_exceeded"] == 1
+    assert guarded.breaker.failures == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_and_fast_duplicate_wins():
+    guarded = provider("test-hedge", min_hedge_samples=3, min_hedge_delay=0.01)
+    for _ in range(3):
+        guarded.latency.add(0.01)
+    delays = sequence(10, 0)
+
+    async def fetch():
+        await asyncio.sleep(delays(None))
+        return "ok"
+
+    assert await asyncio.wait_for(guarded.call(fetch, hedge=True), 1) == "ok"
+    stats = guarded.snapshot()
+    assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+    assert guarded.bulkhead.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_get_transcript_is_hedged_against_a_stalled_provider(fake_providers, fake_assemblyai):
+    fake_assemblyai.transcripts["t1"] = {"id": "t1", "status": "completed", "text": "Hello"}
+    for _ in range(assemblyai.min_hedge_samples):
+        assemblyai.latency.add(0.01)
+    fake_assemblyai.latency = sequence(10, then=0)
+    hedge_wins = assemblyai.stats["hedge_wins"]
+    with patch.object(http_client, "_client", None):
+        try:
+            transcript = await asyncio.wait_for(get_transcript("t1"), 2)
+        finally:
+            await http_client.close_client()
+
+    assert transcript["text"] == "Hello"
+    # The stalled first request was abandoned before the fake answered it
+    assert assemblyai.stats["hedge_wins"] == hedge_wins + 1
+
+
+@pytest.mark.asyncio
+async def test_stream_upload_holds_an_upload_slot_not_an_api_slot(fake_providers, fake_assemblyai):
+    sending = asyncio.Event()
+    resume = asyncio.Event()
+
+    async def slow_client():
+        yield b"RIFF"
+        sending.set()
+        await resume.wait()
+        yield b"rest"
+
+    with patch.object(http_client, "_client", None):
+        try:
+            upload = asyncio.ensure_future(upload_stream(slow_client()))
+            await asyncio.wait_for(sending.wait(), 2)
+            assert assemblyai_upload_bulkhead.in_flight == 1
+            assert assemblyai_bulkhead.in_flight == 0
+            resume.set()
+            upload_url = await asyncio.wait_for(upload, 2)
+        finally:
+            await http_client.close_client()
+
+    assert fake_assemblyai.uploads[upload_url] == b"RIFFrest"
+    assert assemblyai_upload_bulkhead.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_feedback_falls_back_to_older_feedback_when_model_is_down(db):
+    transcript = "An answer"
+    db.add(FeedbackCache(transcript_sha256=feedback_key(transcript)[0], prompt_version="1", model="older-model", feedback_json={"Clarity": "old"}, created_at=datetime.now(timezone.utc)))
+    db.commit()
+    openai_provider.breaker.opened_at = float("inf")  # open for good
+
+    assert await get_feedback(db, transcript) == {"Clarity": "old"}
+    assert db.query(FeedbackCache).count() == 1
+
+    with pytest.raises(CircuitOpen):
+        await get_feedback(db, "Never scored before")
+
+
+@pytest.mark.asyncio
+async def test_poller_gives_up_after_max_wait():
+    async def fetch(transcript_id):
+        return {"status": "processing"}
+
+    poller = TranscriptPoller(fetch, min_interval=0.001, max_wait=0.05)
+    try:
+        with pytest.raises(TimeoutError):
+            await poller.wait("stuck")
+    finally:
+        await poller.stop()
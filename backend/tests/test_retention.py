@@ -0,0 +1,142 @@
+import os
+import uuid
+import errno
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+import pytest
+from app.commands.retention import RetentionReport, apply_retention, archive_key
+from app.models.models import Question, Recording
+from app.utils import storage as storage_module
+from tests.audio_fixtures import write_wav
+
+
+@pytest.fixture
+def question(db):
+    question = Question(text="Q", category="technical")
+    db.add(question)
+    db.commit()
+    return question
+
+
+async def store_wav(storage, tmp_path, name: str) -> str:
+    key = f"ab/cd/{name}.wav"
+    await storage.commit(write_wav(tmp_path / f"{name}.wav", seconds=1.0), key)
+    return key
+
+
+def add_recording(db, question, user, key: str, age_days: float, status: str = "done") -> Recording:
+    created = datetime.now(timezone.utc) - timedelta(days=age_days)
+    recording = Recording(id=uuid.uuid4(), question_id=question.id, user_id=user.id, recording_url=key, created_at=created, updated_at=created, status=status)
+    db.add(recording)
+    db.commit()
+    return recording
+
+
+@pytest.mark.asyncio
+async def test_old_recordings_are_reencoded_in_place(db, test_user, question, storage, tmp_path):
+    old_key = await store_wav(storage, tmp_path, "old")
+    new_key = await store_wav(storage, tmp_path, "new")
+    first = add_recording(db, question, test_user, old_key, age_days=40)
+    # An identical upload shares the file; both move together
+    second = add_recording(db, question, test_user, old_key, age_days=35)
+    recent = add_recording(db, question, test_user, new_key, age_days=1)
+    size_before = os.path.getsize(storage.path(old_key))
+
+    report = await apply_retention(db, days=30)
+
+    assert (report.files, report.recordings, report.failed) == (1, 2, 0)
+    db.expire_all()
+    archived_key = db.get(Recording, first.id).recording_url
+    assert archived_key.startswith("ab/cd/old-archive.")
+    assert db.get(Recording, second.id).recording_url == archived_key
+    assert db.get(Recording, first.id).archived_at is not None
+    assert db.get(Recording, recent.id).recording_url == new_key
+    assert not os.path.exists(storage.path(old_key))
+    assert report.bytes_before == size_before
+    assert report.bytes_after == os.path.getsize(storage.path(archived_key))
+    assert report.bytes_reclaimed == size_before - report.bytes_after > 0
+
+    # Nothing left to do on the next run
+    assert (await apply_retention(db, days=30)).files == 0
+
+
+@pytest.mark.asyncio
+async def test_old_recordings_move_to_cold_storage_and_still_play(client, db, test_user, question, storage, tmp_path):
+    cold = storage_module.LocalStorage(str(tmp_path / "cold"))
+    key = await store_wav(storage, tmp_path, "old")
+    recording = add_recording(db, question, test_user, key, age_days=40)
+
+    with patch.object(storage_module, "_cold_storage", cold):
+        report = await apply_retention(db, days=30)
+        db.expire_all()
+        archived = db.get(Recording, recording.id)
+        assert archived.storage_tier == "cold"
+        assert os.listdir(os.path.join(storage.root, "ab", "cd")) == []
+        assert report.bytes_reclaimed == report.bytes_before
+
+        response = client.get(f"/recordings/{recording.id}/audio", headers={"Range": "bytes=0-3"})
+        # nginx only knows where the hot tier is unless told about the cold one
+        with patch("app.routers.recording.AUDIO_ACCEL_REDIRECT_PREFIX", "/protected-audio/"):
+            unaccelerated = client.get(f"/recordings/{recording.id}/audio")
+            with patch("app.routers.recording.COLD_AUDIO_ACCEL_REDIRECT_PREFIX", "/protected-cold-audio/"):
+                accelerated = client.get(f"/recordings/{recording.id}/audio")
+    assert response.status_code == 206
+    assert response.content == b"RIFF"
+    assert "x-accel-redirect" not in unaccelerated.headers
+    assert unaccelerated.content[:4] == b"RIFF"
+    assert accelerated.headers["x-accel-redirect"] == "/protected-cold-audio/" + archived.recording_url
+
+
+@pytest.mark.asyncio
+async def test_cold_storage_on_another_filesystem(db, test_user, question, storage, tmp_path):
+    cold = storage_module.LocalStorage(str(tmp_path / "cold"))
+    key = await store_wav(storage, tmp_path, "old")
+    recording = add_recording(db, question, test_user, key, age_days=40)
+    rename = os.replace
+
+    def rename_within_filesystem(src, dst):
+        if str(src).startswith(cold.root) != str(dst).startswith(cold.root):
+            raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+        rename(src, dst)
+
+    with patch.object(storage_module, "_cold_storage", cold), patch("os.replace", rename_within_filesystem):
+        report = await apply_retention(db, days=30)
+
+    assert (report.files, report.failed) == (1, 0)
+    db.expire_all()
+    archived = db.get(Recording, recording.id)
+    assert archived.storage_tier == "cold"
+    assert os.path.exists(cold.path(archived.recording_url))
+    assert os.listdir(cold.spool_dir) == []
+    assert os.listdir(os.path.join(storage.root, "ab", "cd")) == []
+
+
+@pytest.mark.asyncio
+async def test_files_of_unfinished_recordings_are_left_alone(db, test_user, question, storage, tmp_path):
+    key = await store_wav(storage, tmp_path, "old")
+    add_recording(db, question, test_user, key, age_days=40)
+    # A retry of an old recording is transcribing from the same file
+    stuck = add_recording(db, question, test_user, key, age_days=40, status="transcribing")
+
+    report = await apply_retention(db, days=30)
+
+    assert (report.files, report.recordings) == (0, 0)
+    db.expire_all()
+    assert db.get(Recording, stuck.id).recording_url == key
+    assert os.path.exists(storage.path(key))
+
+
+@pytest.mark.asyncio
+async def test_archive_rechecks_recordings_before_repointing_them(db, test_user, question, storage, tmp_path):
+    key = await store_wav(storage, tmp_path, "old")
+    old = add_recording(db, question, test_user, key, age_days=40)
+    # Recorded again between the scan and the archive
+    add_recording(db, question, test_user, key, age_days=0)
+    report = RetentionReport()
+
+    await archive_key(db, key, datetime.now(timezone.utc) - timedelta(days=30), report)
+
+    assert (report.files, report.skipped) == (0, 1)
+    db.expire_all()
+    assert db.get(Recording, old.id).recording_url == key
+    assert os.listdir(os.path.join(storage.root, "ab", "cd")) == ["old.wav"]
@@ -0,0 +1,149 @@
+import asyncio
+import time
+import httpx
+import pytest
+from app.utils.bulkhead import BulkheadFull
+from app.utils.resilience import CircuitOpen, DeadlineExceeded
+from app.utils.transcript_poller import TranscriptPoller, PendingTranscript
+
+
+class FakeTranscripts:
+    def __init__(self, polls_until_done):
+        self.polls_until_done = dict(polls_until_done)
+        self.calls = []
+
+    async def fetch(self, transcript_id):
+        self.calls.append((transcript_id, time.monotonic()))
+        self.polls_until_done[transcript_id] -= 1
+        if self.polls_until_done[transcript_id] > 0:
+            return {"id": transcript_id, "status": "processing"}
+        if transcript_id.startswith("bad"):
+            return {"id": transcript_id, "status": "error", "error": "corrupt audio"}
+        return {"id": transcript_id, "status": "completed", "text": f"text of {transcript_id}"}
+
+
+def http_error(status_code):
+    request = httpx.Request("GET", "https://provider.test/transcript")
+    return httpx.HTTPStatusError("boom", request=request, response=httpx.Response(status_code, request=request))
+
+
+def failing_first(fetch, errors):
+    """fetch that raises each of errors in turn before delegating."""
+    errors = list(errors)
+
+    async def flaky(transcript_id):
+        if errors:
+            raise errors.pop(0)
+        return await fetch(transcript_id)
+    return flaky
+
+
+@pytest.mark.asyncio
+async def test_poller_resolves_all_pending_transcripts():
+    transcripts = FakeTranscripts({"a": 1, "b": 3, "c": 2})
+    poller = TranscriptPoller(transcripts.fetch, max_requests_per_second=1000, min_interval=0, backoff=0)
+    poller.start()
+    try:
+        results = await asyncio.gather(poller.wait("a"), poller.wait("b"), poller.wait("c"))
+    finally:
+        await poller.stop()
+
+    assert results == ["text of a", "text of b", "text of c"]
+    assert len(transcripts.calls) == 6
+    assert poller.pending == {}
+
+
+@pytest.mark.asyncio
+async def test_poller_shares_one_poll_between_waiters_of_same_transcript():
+    transcripts = FakeTranscripts({"a": 2})
+    poller = TranscriptPoller(transcripts.fetch, max_requests_per_second=1000, min_interval=0, backoff=0)
+    poller.start()
+    try:
+        results = await asyncio.gather(poller.wait("a"), poller.wait("a"))
+    finally:
+        await poller.stop()
+
+    assert results == ["text of a", "text of a"]
+    assert len(transcripts.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_poller_caps_request_rate():
+    transcripts = FakeTranscripts({f"t{i}": 1 for i in range(5)})
+    poller = TranscriptPoller(transcripts.fetch, max_requests_per_second=50, min_interval=0)
+    poller.start()
+    try:
+        await asyncio.gather(*(poller.wait(f"t{i}") for i in range(5)))
+    finally:
+        await poller.stop()
+
+    times = [t for _, t in transcripts.calls]
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    assert min(gaps) >= 1 / 50 * 0.9
+
+
+@pytest.mark.asyncio
+async def test_poller_propagates_transcription_errors():
+    transcripts = FakeTranscripts({"bad": 1})
+    poller = TranscriptPoller(transcripts.fetch, min_interval=0)
+    poller.start()
+    try:
+        with pytest.raises(RuntimeError, match="corrupt audio"):
+            await poller.wait("bad")
+    finally:
+        await poller.stop()
+
+
+@pytest.mark.asyncio
+async def test_poller_retries_transport_and_server_errors():
+    transcripts = FakeTranscripts({"a": 2})
+    fetch = failing_first(transcripts.fetch, [httpx.ConnectError("refused"), http_error(503), http_error(429)])
+    poller = TranscriptPoller(fetch, max_requests_per_second=1000, min_interval=0, backoff=0)
+    poller.start()
+    try:
+        assert await poller.wait("a") == "text of a"
+    finally:
+        await poller.stop()
+
+    assert len(transcripts.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_poller_retries_calls_refused_by_the_provider_guard():
+    transcripts = FakeTranscripts({"a": 1})
+    fetch = failing_first(transcripts.fetch, [CircuitOpen("open"), BulkheadFull("full"), DeadlineExceeded("slow")])
+    poller = TranscriptPoller(fetch, max_requests_per_second=1000, min_interval=0, backoff=0)
+    poller.start()
+    try:
+        assert await poller.wait("a") == "text of a"
+    finally:
+        await poller.stop()
+
+
+@pytest.mark.asyncio
+async def test_poller_propagates_client_errors():
+    transcripts = FakeTranscripts({"a": 1})
+    poller = TranscriptPoller(failing_first(transcripts.fetch, [http_error(404)]), min_interval=0)
+    poller.start()
+    try:
+        with pytest.raises(httpx.HTTPStatusError):
+            await poller.wait("a")
+    finally:
+        await poller.stop()
+
+    assert transcripts.calls == []
+
+
+def test_next_delay_follows_duration_then_elapsed_time():
+    poller = TranscriptPoller(fetch=None, min_interval=1, max_interval=30, realtime_factor=0.3, backoff=0.25)
+    pending = PendingTranscript("a", started=100.0, duration=60.0)
+    assert poller.next_delay(pending, now=100.0) == pytest.approx(18.0)
+
+    pending.polls = 1
+    assert poller.next_delay(pending, now=120.0) == pytest.approx(5.0)
+    assert poller.next_delay(pending, now=101.0) == 1
+    assert poller.next_delay(pending, now=1000.0) == 30
+
+    pending.errors = 2
+    assert poller.next_delay(pending, now=120.0) == pytest.approx(20.0)
+    assert poller.next_delay(pending, now=1000.0) == 30
@@ -1,6 +1,7 @@
 import React, { useState } from 'react';
 import { FileText, Upload, Wand2, X, Download, Copy, CheckCircle, AlertCircle } from 'lucide-react';
 import { questionStorage } from '../services/questionStorage';
+import { questionsAPI } from '../services/api';
 
 const JobDescriptionPage = () => {
     const [jobDescription, setJobDescription] = useState('');
@@ -37,73 +38,41 @@ const JobDescriptionPage = () => {
         if (!jobDescription.trim()) return;
 
         setIsGenerating(true);
+        setGeneratedQuestions([]);
 
-        // Use provided role name or extract from job description
-        let finalRole = roleName.trim();
-        if (!finalRole) {
-            const roleMatch = jobDescription.match(/(?:position|role|job)\s+(?:of\s+)?(?:a\s+)?([A-Z][a-zA-Z\s]+?)(?:\s|,|\.|$)/i);
-            finalRole = roleMatch ? roleMatch[1].trim() : 'General Role';
+        // Questions are shown one by one as the server streams them
+        let role = roleName.trim();
+        const company = companyName.trim() || 'This Company';
+        try {
+            await questionsAPI.generateStream({
+                job_description: jobDescription,
+                question_types: ['technical', 'behavioral', 'cultural'],
+                num_questions_per_type: 2,
+                job_title: role || null,
+            }, (record) => {
+                if (record.type === 'header') {
+                    role = record.job_title;
+                    setExtractedRole(role);
+                } else if (record.type === 'question') {
+                    setGeneratedQuestions(questions => [...questions, {
+                        id: `${Date.now()}-${questions.length}`,
+                        question_text: record.text,
+                        category: record.category,
+                        reasoning: record.reasoning,
+                        role,
+                        company,
+                        is_generated: true
+                    }]);
+                } else if (record.type === 'error') {
+                    console.error(`Could not generate ${record.question_type} questions:`, record.detail);
+                }
+            });
+        } catch (error) {
+            console.error('Failed to generate questions:', error);
+            alert('Failed to generate questions. Please try again.');
+        } finally {
+            setIsGenerating(false);
         }
-        setExtractedRole(finalRole);
-
-        // Simulate API call
-        await new Promise(resolve => setTimeout(resolve, 3000));
-
-        const mockQuestions = [
-            {
-                id: Date.now() + 1,
-                question_text: "Can you walk me through your experience with the technologies mentioned in this role?",
-                category: "technical",
-                difficulty_level: "medium",
-                reasoning: "Tests technical knowledge relevant to the job",
-                role: finalRole,
-                company: companyName.trim() || 'This Company',
-                is_generated: true
-            },
-            {
-                id: Date.now() + 2,
-                question_text: "How would you approach solving a complex problem in this domain?",
-                category: "situational",
-                difficulty_level: "hard",
-                reasoning: "Evaluates problem-solving approach",
-                role: finalRole,
-                company: companyName.trim() || 'This Company',
-                is_generated: true
-            },
-            {
-                id: Date.now() + 3,
-                question_text: "Tell me about a time you had to work with a difficult team member.",
-                category: "behavioral",
-                difficulty_level: "medium",
-                reasoning: "Assesses interpersonal skills",
-                role: finalRole,
-                company: companyName.trim() || 'This Company',
-                is_generated: true
-            },
-            {
-                id: Date.now() + 4,
-                question_text: "What interests you most about this position and our company?",
-                category: "behavioral",
-                difficulty_level: "easy",
-                reasoning: "Tests motivation and cultural fit",
-                role: finalRole,
-                company: companyName.trim() || 'This Company',
-                is_generated: true
-            },
-            {
-                id: Date.now() + 5,
-                question_text: "How do you stay updated with industry trends and best practices?",
-                category: "behavioral",
-                difficulty_level: "easy",
-                reasoning: "Evaluates continuous learning mindset",
-                role: finalRole,
-                company: companyName.trim() || 'This Company',
-                is_generated: true
-            }
-        ];
-
-        setGeneratedQuestions(mockQuestions);
-        setIsGenerating(false);
     };
 
     const handleCopyQuestion = async (questionText, index) => {
@@ -126,7 +95,7 @@ const JobDescriptionPage = () => {
 
     const handleDownloadQuestions = () => {
         const questionsText = generatedQuestions.map((q, index) =>
-            `${index + 1}. ${q.question_text}\n   Category: ${q.category}\n   Difficulty: ${q.difficulty_level}\n   Reasoning: ${q.reasoning}\n`
+            `${index + 1}. ${q.question_text}\n   Category: ${q.category}\n${q.difficulty_level ? `   Difficulty: ${q.difficulty_level}\n` : ''}   Reasoning: ${q.reasoning}\n`
         ).join('\n');
 
         const blob = new Blob([questionsText], { type: 'text/plain' });
@@ -174,6 +143,7 @@ const JobDescriptionPage = () => {
         switch (category) {
             case 'behavioral': return '👥';
             case 'technical': return '⚙️';
+            case 'cultural': return '🤝';
             case 'situational': return '🎯';
             case 'leadership': return '👑';
             default: return '❓';
@@ -342,9 +312,11 @@ const JobDescriptionPage = () => {
                                                 <span className="px-2 py-1 bg-blue-100 text-blue-800 text-xs font-medium rounded-full">
                                                     {question.category}
                                                 </span>
-                                                <span className={`px-2 py-1 text-xs font-medium rounded-full ${getDifficultyColor(question.difficulty_level)}`}>
-                                                    {question.difficulty_level}
-                                                </span>
+                                                {question.difficulty_level && (
+                                                    <span className={`px-2 py-1 text-xs font-medium rounded-full ${getDifficultyColor(question.difficulty_level)}`}>
+                                                        {question.difficulty_level}
+                                                    </span>
+                                                )}
                                             </div>
                                         </div>
                                     </div>
@@ -60,8 +60,6 @@ const RecordingsPage = () => {
             setPlayingId(null);
         } else {
             setPlayingId(recording.id);
-            // In a real app, you would play the audio file
-            console.log('Playing recording:', recording);
         }
     };
 
@@ -207,6 +205,17 @@ const RecordingsPage = () => {
                                             {recording.transcript}
                                         </p>
                                     )}
+
+                                    {playingId === recording.id && (
+                                        <audio
+                                            src={recordingsAPI.audioUrl(recording.id)}
+                                            controls
+                                            autoPlay
+                                            preload="metadata"
+                                            onEnded={() => setPlayingId(null)}
+                                            className="w-full"
+                                        />
+                                    )}
                                 </div>
 
                                 <div className="flex items-center space-x-2 ml-4">
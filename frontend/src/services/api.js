@@ -1,4 +1,6 @@
 const API_BASE_URL = 'http://localhost:8000/api';
+// Largest page GET /questions/ serves (MAX_QUESTION_PAGE_SIZE)
+const QUESTION_PAGE_SIZE = 200;
 
 const apiClient = {
   async request(endpoint, options = {}) {
@@ -19,7 +21,7 @@ const apiClient = {
       }
 
       const data = await response.json();
-      return { data, status: response.status };
+      return { data, status: response.status, headers: response.headers };
     } catch (error) {
       console.error('API request failed:', error);
       throw error;
@@ -58,9 +60,20 @@ const apiClient = {
 };
 
 export const questionsAPI = {
+  // The list is paginated: follow X-Next-Cursor until the last page so
+  // callers still get every question.
   async getAll() {
     try {
-      return await apiClient.get('/questions/');
+      const questions = [];
+      let cursor = null;
+      do {
+        const query = new URLSearchParams({ limit: QUESTION_PAGE_SIZE });
+        if (cursor) query.set('cursor', cursor);
+        const response = await apiClient.get(`/questions/?${query}`);
+        questions.push(...response.data);
+        cursor = response.headers.get('X-Next-Cursor');
+      } while (cursor);
+      return { data: questions, status: 200 };
     } catch (error) {
       console.error('Failed to fetch questions:', error);
       // Return mock data for development
@@ -105,6 +118,34 @@ export const questionsAPI = {
     return await apiClient.get(`/questions/${id}`);
   },
 
+  // Questions arrive as newline-delimited JSON while they are generated: a
+  // `header` record (job_summary, job_title), one `question` record each,
+  // `error` records for question types that failed, and `done` last.
+  async generateStream(request, onRecord) {
+    const response = await fetch(`${API_BASE_URL}/questions/generate/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(request),
+    });
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffered = '';
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffered += value;
+      const lines = buffered.split('\n');
+      buffered = lines.pop();
+      lines.filter(line => line.trim()).forEach(line => onRecord(JSON.parse(line)));
+    }
+    if (buffered.trim()) {
+      onRecord(JSON.parse(buffered));
+    }
+  },
+
   async create(questionData) {
     return await apiClient.post('/questions/', questionData);
   },
@@ -132,9 +173,35 @@ export const recordingsAPI = {
     return await apiClient.get(`/recordings/${id}`);
   },
 
+  async getStatus(id) {
+    return await apiClient.get(`/recordings/${id}/status`);
+  },
+
+  // Streamed with Range requests, so an <audio> element can seek without
+  // downloading the whole answer
+  audioUrl(id) {
+    return `${API_BASE_URL}/recordings/${id}/audio`;
+  },
+
+  // The backend accepts the upload with 202 and processes it in the background,
+  // so poll the status endpoint until the recording is scored.
+  async waitUntilProcessed(id, intervalMs = 1000) {
+    for (;;) {
+      const { data } = await this.getStatus(id);
+      if (data.status === 'done') {
+        return await this.getById(id);
+      }
+      if (data.status === 'failed') {
+        throw new Error(data.error || 'Recording processing failed');
+      }
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    }
+  },
+
   async create(formData) {
     try {
-      return await apiClient.postFormData('/recordings/', formData);
+      const { data } = await apiClient.postFormData('/recordings/', formData);
+      return await this.waitUntilProcessed(data.id);
     } catch (error) {
       console.error('Failed to create recording:', error);
       // Return mock response for development